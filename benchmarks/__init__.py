@@ -0,0 +1,8 @@
+"""
+Performance benchmarks for token generation, key derivation, decryption,
+data cleaning and chart rendering.
+
+Run them with ``python main.py bench`` (see benchmarks.suite). All inputs
+come from benchmarks.synthetic with fixed seeds, so two runs measure the
+same work.
+"""
@@ -0,0 +1,318 @@
+"""
+Benchmark suite: measure, save as JSON, and compare against a baseline.
+
+Each benchmark has a setup that builds its synthetic input (not timed) and
+returns the operation count and the function to time, optionally followed by
+a teardown that removes whatever the setup created. The function is run
+`repeat` times and the fastest run is kept, which is the least disturbed by
+whatever else the machine is doing.
+
+    python main.py bench                          # everything, JSON to benchmarks/results.json
+    python main.py bench --only cleaning --sizes 1k,1m
+    python main.py bench --save-baseline          # store the run as benchmarks/baseline.json
+    python main.py bench --compare                # flag regressions against the baseline
+
+Compare mode exits with status 1 when any benchmark's throughput dropped by
+more than the threshold, so it can gate CI.
+"""
+
+import argparse
+import fnmatch
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from collections import namedtuple
+from datetime import datetime, timezone
+
+from benchmarks import synthetic
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_RESULTS_PATH = os.path.join(BENCH_DIR, "results.json")
+DEFAULT_BASELINE_PATH = os.path.join(BENCH_DIR, "baseline.json")
+DEFAULT_SIZES = ("1k", "1m", "10m")
+DEFAULT_THRESHOLD = 0.10
+VENDING_KEY = bytes.fromhex("0123456789ABCDEF")
+KEY_PARAMETERS = ("2", "123456", "7", "1")
+CHART_ROWS = 2000
+CHART_WIDTH = 800
+
+# repeat caps the runner's repeat count for benchmarks too slow to run more than once
+Benchmark = namedtuple("Benchmark", ["name", "unit", "setup", "repeat"])
+
+def parse_size(size):
+    """
+    Parse a line count such as "1k", "1m" or "250000".
+
+    Args:
+        size (str): The size
+
+    Returns:
+        int: The number of lines
+    """
+    size = str(size).strip().lower()
+    multiplier = {"k": 1000, "m": 1000000}.get(size[-1:], 1)
+    return int(float(size.rstrip("km")) * multiplier)
+
+# ---------------------------
+# Benchmarks
+# ---------------------------
+def _demo_tokens(count, seed):
+    from src.Token import generate_demo_token
+
+    data = synthetic.purchases(count, seed=seed)
+    pairs = list(zip(data["Mtr"].tolist(), data["Amt"].tolist()))
+
+    def run():
+        for meter_number, amount in pairs:
+            generate_demo_token(meter_number, amount)
+    return len(pairs), run
+
+def _encode_tokens(count, seed, batch):
+    from src.TokenEncoder import TokenEncoder
+
+    meter_number = synthetic.meter_numbers(1, seed)[0]
+    amounts = synthetic.purchases(count, seed=seed)["Units"].tolist()
+    encoder = TokenEncoder(meter_number, *KEY_PARAMETERS, vending_key=VENDING_KEY)
+
+    def run():
+        if batch:
+            encoder.encode_tokens(amounts, tids=1000)
+        else:
+            for amount in amounts:
+                encoder.encode_token(amount, tid=1000)
+    return len(amounts), run
+
+def _decoder_keys(count, seed):
+    from src.DKGA02 import DecoderKeyGenerator
+
+    meters = synthetic.meter_numbers(count, seed)
+
+    def run():
+        for meter_number in meters:
+            DecoderKeyGenerator(*KEY_PARAMETERS, meter_number, vending_key=VENDING_KEY).generate_decoder_key()
+    return len(meters), run
+
+def _decrypt_tokens(count, seed):
+    from src.TokenDecrypter import TokenDecrypter
+    from src.TokenEncoder import TokenEncoder
+
+    meter_number = synthetic.meter_numbers(1, seed)[0]
+    amounts = synthetic.purchases(count, seed=seed)["Units"].tolist()
+    tokens = TokenEncoder(meter_number, *KEY_PARAMETERS, vending_key=VENDING_KEY).encode_tokens(
+        amounts, tids=1000, random_numbers=7)
+    decrypter = TokenDecrypter(meter_number, *KEY_PARAMETERS, vending_key=VENDING_KEY)
+
+    def run():
+        for token in tokens:
+            decrypter.decrypt_token(token)
+    return len(tokens), run
+
+def _parse_raw_export(line_count, seed):
+    from src.data_cleaning import iter_cleaned_records
+
+    path = synthetic.raw_sms_file(line_count, seed)
+
+    def run():
+        for _ in iter_cleaned_records(path):
+            pass
+    return line_count, run
+
+def _clean_raw_data(line_count, seed):
+    from src.data_cleaning import clean_raw_data
+
+    path = synthetic.raw_sms_file(line_count, seed)
+    out_dir = tempfile.TemporaryDirectory(prefix="utility-token-bench-")
+
+    def run():
+        clean_raw_data(path, os.path.join(out_dir.name, "cleaned.csv"), os.path.join(out_dir.name, "cleaned.xlsx"))
+    return line_count, run, out_dir.cleanup
+
+def _chart(name, seed):
+    from src.TokenVisualizer import CHARTS, render_figure
+
+    _, builder, _ = CHARTS[name]
+    df = synthetic.token_frame(CHART_ROWS, seed)
+
+    def run():
+        render_figure(builder(df), width=CHART_WIDTH)
+    return 1, run
+
+def build_benchmarks(sizes=DEFAULT_SIZES, seed=synthetic.DEFAULT_SEED):
+    """
+    List the benchmarks for a set of cleaning sizes.
+
+    Cleaning is measured end to end (parse, CSV and Excel) at 1K lines; the
+    larger sizes measure the streaming parser alone, since an Excel sheet
+    cannot hold millions of rows.
+
+    Args:
+        sizes (iterable): Raw export sizes for the cleaning benchmarks
+        seed (int): Random seed for the synthetic data
+
+    Returns:
+        list: Benchmark tuples
+    """
+    from src.TokenVisualizer import CHARTS
+
+    benchmarks = [
+        Benchmark("token.generate_demo_token", "tokens", lambda: _demo_tokens(20000, seed), None),
+        Benchmark("token.encode_token", "tokens", lambda: _encode_tokens(5000, seed, batch=False), None),
+        Benchmark("token.encode_tokens", "tokens", lambda: _encode_tokens(50000, seed, batch=True), None),
+        Benchmark("key.generate_decoder_key", "keys", lambda: _decoder_keys(2000, seed), None),
+        Benchmark("decrypt.decrypt_token", "tokens", lambda: _decrypt_tokens(5000, seed), None),
+        Benchmark("cleaning.clean_raw_data_1k", "lines", lambda: _clean_raw_data(1000, seed), None),
+    ]
+    for size in sizes:
+        line_count = parse_size(size)
+        benchmarks.append(Benchmark(f"cleaning.parse_{str(size).lower()}", "lines",
+                                    lambda line_count=line_count: _parse_raw_export(line_count, seed),
+                                    1 if line_count >= 1000000 else None))
+    for name in CHARTS:
+        benchmarks.append(Benchmark(f"chart.{name}", "charts", lambda name=name: _chart(name, seed), None))
+    return benchmarks
+
+# ---------------------------
+# Running and comparing
+# ---------------------------
+def run_benchmarks(benchmarks, repeat=3, progress=None):
+    """
+    Run benchmarks and collect their best times.
+
+    Args:
+        benchmarks (list): Benchmark tuples
+        repeat (int): Timed runs per benchmark (the fastest is kept)
+        progress (callable): Called as progress(name, result) after each benchmark
+
+    Returns:
+        dict: {"meta": machine and run details, "results": {name: result}}
+    """
+    import numpy as np
+
+    results = {}
+    for benchmark in benchmarks:
+        count, run, *teardown = benchmark.setup()
+        times = []
+        try:
+            for _ in range(min(repeat, benchmark.repeat or repeat)):
+                start = time.perf_counter()
+                run()
+                times.append(time.perf_counter() - start)
+        finally:
+            for cleanup in teardown:
+                cleanup()
+        best = min(times)
+        results[benchmark.name] = {
+            "unit": benchmark.unit,
+            "count": count,
+            "runs": len(times),
+            "seconds": best,
+            "per_second": count / best if best > 0 else float("inf"),
+        }
+        if progress:
+            progress(benchmark.name, results[benchmark.name])
+
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+
+def compare(report, baseline, threshold=DEFAULT_THRESHOLD):
+    """
+    Compare a run's throughput with a baseline's.
+
+    Args:
+        report (dict): Output of run_benchmarks
+        baseline (dict): An earlier run_benchmarks output
+        threshold (float): Fractional throughput drop counted as a regression
+
+    Returns:
+        list: {"name", "baseline", "current", "change", "regression"} per
+            benchmark present in both, where change is the fractional
+            throughput change (negative is slower)
+    """
+    rows = []
+    for name, result in report["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if base is None or not base["per_second"]:
+            continue
+        change = result["per_second"] / base["per_second"] - 1
+        rows.append({
+            "name": name,
+            "baseline": base["per_second"],
+            "current": result["per_second"],
+            "change": change,
+            "regression": change < -threshold,
+        })
+    return rows
+
+def save_report(report, path):
+    """Write a report as JSON."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+def load_report(path):
+    """Read a report written by save_report."""
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+def main(argv=None):
+    """Main function to run the benchmark suite."""
+    parser = argparse.ArgumentParser(prog="main.py bench", description="Run the performance benchmarks")
+    parser.add_argument("--only", action="append", default=None,
+                        help="Run benchmarks whose name contains this text or matches this glob (repeatable)")
+    parser.add_argument("--sizes", default=",".join(DEFAULT_SIZES),
+                        help=f"Raw export sizes for the cleaning benchmarks (default: {','.join(DEFAULT_SIZES)})")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per benchmark, best kept (default: 3)")
+    parser.add_argument("--seed", type=int, default=synthetic.DEFAULT_SEED, help="Seed for the synthetic data")
+    parser.add_argument("--output", default=DEFAULT_RESULTS_PATH,
+                        help="Where to write the JSON results (default: benchmarks/results.json)")
+    parser.add_argument("--save-baseline", nargs="?", const=DEFAULT_BASELINE_PATH, default=None, metavar="PATH",
+                        help="Also store the results as the baseline (default: benchmarks/baseline.json)")
+    parser.add_argument("--compare", nargs="?", const=DEFAULT_BASELINE_PATH, default=None, metavar="PATH",
+                        help="Compare against a baseline (default: benchmarks/baseline.json)")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help=f"Throughput drop flagged as a regression (default: {DEFAULT_THRESHOLD:.0%})")
+    args = parser.parse_args(argv)
+
+    benchmarks = build_benchmarks([size for size in args.sizes.split(",") if size.strip()], args.seed)
+    if args.only:
+        benchmarks = [benchmark for benchmark in benchmarks
+                      if any(pattern in benchmark.name or fnmatch.fnmatch(benchmark.name, pattern)
+                             for pattern in args.only)]
+    if not benchmarks:
+        print("No benchmarks match")
+        return
+
+    def show(name, result):
+        print(f"  {name:34s} {result['per_second']:14,.1f} {result['unit']}/s  ({result['seconds']:.3f}s best "
+              f"of {result['runs']})", flush=True)
+
+    print(f"Running {len(benchmarks)} benchmarks:")
+    report = run_benchmarks(benchmarks, args.repeat, progress=show)
+    save_report(report, args.output)
+    print(f"Results written to {os.path.abspath(args.output)}")
+    if args.save_baseline:
+        save_report(report, args.save_baseline)
+        print(f"Baseline written to {os.path.abspath(args.save_baseline)}")
+
+    if args.compare:
+        rows = compare(report, load_report(args.compare), args.threshold)
+        print(f"\nCompared with {args.compare} (regression: more than {args.threshold:.0%} slower):")
+        for row in rows:
+            flag = "  REGRESSION" if row["regression"] else ""
+            print(f"  {row['name']:34s} {row['change']:+8.1%}{flag}")
+        regressions = [row["name"] for row in rows if row["regression"]]
+        if regressions:
+            print(f"{len(regressions)} regression(s): {', '.join(regressions)}")
+            sys.exit(1)
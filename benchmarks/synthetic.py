@@ -0,0 +1,131 @@
+"""
+Synthetic data for the benchmarks.
+
+Everything is generated from numpy's default_rng with a fixed seed, so the
+same seed always gives the same meters, amounts, SMS export and DataFrame.
+The raw SMS export mimics resources/data/Raw-SMS-Meter-tokens.txt: a
+timestamp line (which the cleaner skips) before every token line.
+"""
+
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_SEED = 0
+AMOUNTS = np.array([20, 50, 100, 200, 500, 1000, 2000], dtype=float)
+START = np.datetime64("2023-01-01T00:00")
+
+def meter_numbers(count, seed=DEFAULT_SEED):
+    """
+    Generate 11-digit meter numbers.
+
+    Args:
+        count (int): Number of meter numbers
+        seed (int): Random seed
+
+    Returns:
+        list: Meter numbers as strings
+    """
+    rng = np.random.default_rng(seed)
+    return [str(number) for number in rng.integers(10 ** 10, 10 ** 11, size=count)]
+
+def purchases(count, meter_count=500, seed=DEFAULT_SEED):
+    """
+    Generate token purchases spread over a pool of meters.
+
+    Args:
+        count (int): Number of purchases
+        meter_count (int): Number of distinct meters buying
+        seed (int): Random seed
+
+    Returns:
+        dict: Numpy arrays Mtr, Token, Units, Amt, TknAmt, OtherCharges and Datetime
+    """
+    rng = np.random.default_rng(seed)
+    meters = np.array(meter_numbers(meter_count, seed), dtype=object)
+    amounts = rng.choice(AMOUNTS, size=count)
+    # Roughly 58% of the amount buys units, at around 25 KSh a unit
+    token_amounts = np.round(amounts * rng.uniform(0.55, 0.61, size=count), 2)
+    digits = rng.integers(0, 10 ** 10, size=(count, 2))
+    tokens = [f"{hi:010d}{lo:010d}" for hi, lo in digits.tolist()]
+    return {
+        "Mtr": meters[rng.integers(0, meter_count, size=count)],
+        "Token": np.array(["-".join(token[i:i + 4] for i in range(0, 20, 4)) for token in tokens], dtype=object),
+        "Units": np.round(token_amounts / rng.uniform(22, 28, size=count), 2),
+        "Amt": amounts,
+        "TknAmt": token_amounts,
+        "OtherCharges": np.round(amounts - token_amounts, 2),
+        "Datetime": START + np.cumsum(rng.integers(1, 720, size=count)).astype("timedelta64[m]"),
+    }
+
+def token_frame(count, seed=DEFAULT_SEED):
+    """
+    Generate a DataFrame shaped like TokenVisualizer.load_data's.
+
+    Args:
+        count (int): Number of rows
+        seed (int): Random seed
+
+    Returns:
+        pd.DataFrame: Cleaned token data
+    """
+    df = pd.DataFrame(purchases(count, seed=seed))
+    df["Mtr"] = df["Mtr"].astype("int64")
+    return df
+
+def write_raw_sms(path, line_count, seed=DEFAULT_SEED, chunk_size=100000):
+    """
+    Write a synthetic raw SMS export.
+
+    Args:
+        path (str): Destination text file
+        line_count (int): Number of lines, half of them token lines
+        seed (int): Random seed
+        chunk_size (int): Token lines generated and written at a time
+
+    Returns:
+        str: The path
+    """
+    records = line_count // 2
+    with open(path, "w", encoding="utf-8") as f:
+        for chunk, start in enumerate(range(0, records, chunk_size)):
+            data = purchases(min(chunk_size, records - start), seed=seed + chunk)
+            lines = []
+            for meter, token, units, amt, tkn_amt, other, when in zip(
+                    data["Mtr"], data["Token"], data["Units"], data["Amt"], data["TknAmt"],
+                    data["OtherCharges"], data["Datetime"].astype(str)):
+                day, time = when.split("T")
+                date = day.replace("-", "")
+                lines.append(f"{day} · {time} \n"
+                             f"Mtr:{meter} Token:{token} Date:{date} {time} Units:{units:.2f} Amt:{amt:.2f} "
+                             f"TknAmt:{tkn_amt:.2f} OtherCharges:{other:.2f} For Details dial *977#\n")
+            f.write("".join(lines))
+        if line_count % 2:
+            f.write("\n")
+    return path
+
+def raw_sms_file(line_count, seed=DEFAULT_SEED, cache_dir=None):
+    """
+    Return a synthetic raw SMS export, generating it on first use.
+
+    Large exports take a while to write, so they are kept in a cache
+    directory and reused by later runs with the same size and seed.
+
+    Args:
+        line_count (int): Number of lines
+        seed (int): Random seed
+        cache_dir (str): Cache directory (default: utility-token-bench in the temp directory)
+
+    Returns:
+        str: Path to the export
+    """
+    cache_dir = cache_dir or os.path.join(tempfile.gettempdir(), "utility-token-bench")
+    os.makedirs(cache_dir, exist_ok=True)
+    path = os.path.join(cache_dir, f"raw_sms_{line_count}_{seed}.txt")
+    if not os.path.exists(path):
+        # Write under a temporary name so an interrupted run leaves no partial file
+        write_raw_sms(f"{path}.tmp", line_count, seed)
+        os.replace(f"{path}.tmp", path)
+    return path
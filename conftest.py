@@ -0,0 +1,18 @@
+"""
+Shared pytest setup: keep the vending key the tests generate out of resources/data
+"""
+
+import os
+
+import pytest
+
+@pytest.fixture(scope="session", autouse=True)
+def vending_key_path(tmp_path_factory):
+    """Point VENDING_KEY_PATH (inherited by worker processes) at a temporary file"""
+    previous = os.environ.get("VENDING_KEY_PATH")
+    os.environ["VENDING_KEY_PATH"] = str(tmp_path_factory.mktemp("keys") / "VendingKey.key")
+    yield os.environ["VENDING_KEY_PATH"]
+    if previous is None:
+        del os.environ["VENDING_KEY_PATH"]
+    else:
+        os.environ["VENDING_KEY_PATH"] = previous
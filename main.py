@@ -9,6 +9,8 @@ It launches the GUI interface by default or allows command-line selection of com
 import os
 import sys
 import argparse
+import subprocess
+import time
 
 # Ensure the src directory is in the Python path
 script_dir = os.path.dirname(os.path.abspath(__file__))
@@ -28,17 +30,123 @@ def print_help():
     print("  decrypt     - Decrypt a token")
     print("  clean       - Process raw token data")
     print("  visualize   - Visualize token data")
+    print("  fleet       - Per-meter fleet analytics")
+    print("  summary     - Streaming summary statistics")
+    print("  serve       - Run the local HTTP token vending service")
+    print("  loadtest    - Load test the running token service")
+    print("  rollover    - Generate key-change tokens for a list of meters")
+    print("  reconcile   - Check SMS Units against what each token decrypts to")
+    print("  bench       - Run the performance benchmarks")
     print("  test        - Run component tests")
     print("  gui         - Launch GUI interface (default)")
     print("")
+    print("Options:")
+    print("  --profile-startup  Report the per-import startup cost of a component")
+    print("  serve/loadtest/rollover/reconcile/bench accept their own options, e.g. --port, --workers, --rate")
+    print("  token/key/decrypt read NDJSON or CSV requests from piped stdin (--batch-size, --format)")
+    print("    instead of prompting whenever stdin is not a terminal (e.g. an IDE run")
+    print("    configuration or a subprocess without stdin); run them from a terminal to be prompted")
+    print("")
     print("Examples:")
     print("  python main.py token     # Run token generator")
     print("  python main.py gui       # Launch GUI interface")
     print("  python main.py           # Launch GUI interface (default)")
+    print("  python main.py gui --profile-startup")
+    print("  python main.py serve --port 8087 --workers 4")
+    print("  python main.py loadtest --rate 500 --duration 10")
+    print("  python main.py rollover meters.csv key_change.csv --old 123456,7,1 --new 123456,7,2")
+    print("  python main.py reconcile cleaned_meter_data.csv mismatches.csv --workers 4")
+    print("  python main.py decrypt --batch-size 5000 < requests.ndjson > results.ndjson")
+    print("  python main.py bench --sizes 1k,1m --compare")
+
+# Module imported by each component, used for startup profiling
+COMPONENT_MODULES = {
+    "token": "src.Token",
+    "key": "src.DKGA02",
+    "decrypt": "src.TokenDecrypter",
+    "clean": "src.data_cleaning",
+    "visualize": "src.TokenVisualizer",
+    "fleet": "src.TokenVisualizer",
+    "summary": "src.summary_statistics",
+    "serve": "src.token_service",
+    "loadtest": "src.load_test",
+    "rollover": "src.key_rollover",
+    "reconcile": "src.reconciliation",
+    "bench": "benchmarks.suite",
+    "test": "src.test_components",
+    "gui": "src.UtilityTokenGUI",
+}
+
+def profile_startup(component, top=15):
+    """
+    Report what importing a component costs, import by import.
+    
+    The component's module is imported in a fresh interpreter with
+    ``-X importtime`` so nothing already loaded in this process skews the
+    numbers.
+    
+    Args:
+        component (str): Component name (see COMPONENT_MODULES)
+        top (int): Number of most expensive imports to list
+    """
+    module_name = COMPONENT_MODULES.get(component)
+    if module_name is None:
+        print(f"Unknown component: {component}")
+        return
+    
+    code = f"import sys; sys.path.insert(0, {script_dir!r}); import {module_name}"
+    start = time.perf_counter()
+    completed = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                               capture_output=True, text=True)
+    wall_time = time.perf_counter() - start
+    
+    if completed.returncode != 0:
+        print(completed.stderr.splitlines()[-1] if completed.stderr else "Import failed")
+        return
+    
+    # Lines look like "import time:  self [us] | cumulative | <indent>module",
+    # with two spaces of indent per nesting level
+    imports = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        imports.append((int(self_us), int(cumulative_us), depth, name.strip()))
+    
+    # The component's direct imports are the depth-1 entries listed just
+    # before its own depth-0 entry
+    direct = []
+    for entry in reversed(imports):
+        if entry[3] == module_name:
+            continue
+        if entry[2] == 0:
+            break
+        if entry[2] == 1:
+            direct.append(entry)
+    total_us = next((entry[1] for entry in imports if entry[3] == module_name), 0)
+    
+    print(f"Startup profile for '{component}' ({module_name})")
+    print(f"Interpreter start + import wall time: {wall_time * 1000:.1f} ms")
+    print(f"Import {module_name}: {total_us / 1000:.1f} ms across {len(imports)} modules")
+    print("")
+    print("Direct imports by cumulative cost:")
+    for _, cumulative_us, _, name in sorted(direct, key=lambda entry: entry[1], reverse=True):
+        print(f"{cumulative_us / 1000:9.1f} ms  {name}")
+    print("")
+    print(f"Top {top} modules by self cost:")
+    for self_us, _, _, name in sorted(imports, key=lambda entry: entry[0], reverse=True)[:top]:
+        print(f"{self_us / 1000:9.1f} ms  {name}")
 
-def run_component(component):
+def run_component(component, extra_args=None):
     """Run the specified component."""
-    if component == "token":
+    piped = sys.stdin is not None and not sys.stdin.isatty()  # stdin is None under pythonw
+    if component in ("token", "key", "decrypt") and (extra_args or piped):
+        # Piped input or streaming options: read requests from stdin instead of prompting
+        from src.stream_cli import main as stream_main
+        stream_main(component, extra_args)
+    
+    elif component == "token":
         from src.Token import main as token_main
         token_main()
     
@@ -58,6 +166,34 @@ def run_component(component):
         from src.TokenVisualizer import main as visualize_main
         visualize_main()
     
+    elif component == "fleet":
+        from src.TokenVisualizer import fleet_main
+        fleet_main()
+    
+    elif component == "summary":
+        from src.summary_statistics import main as summary_main
+        summary_main()
+    
+    elif component == "serve":
+        from src.token_service import main as serve_main
+        serve_main(extra_args)
+    
+    elif component == "loadtest":
+        from src.load_test import main as loadtest_main
+        loadtest_main(extra_args)
+    
+    elif component == "rollover":
+        from src.key_rollover import main as rollover_main
+        rollover_main(extra_args)
+    
+    elif component == "reconcile":
+        from src.reconciliation import main as reconcile_main
+        reconcile_main(extra_args)
+    
+    elif component == "bench":
+        from benchmarks.suite import main as bench_main
+        bench_main(extra_args)
+    
     elif component == "test":
         from src.test_components import main as test_main
         test_main()
@@ -78,16 +214,24 @@ def main():
     """Main function."""
     parser = argparse.ArgumentParser(description="Utility Token Generation Project", add_help=False)
     parser.add_argument('component', nargs='?', default='gui', 
-                        help='Component to run (token, key, decrypt, clean, visualize, test, gui)')
+                        help='Component to run (token, key, decrypt, clean, visualize, fleet, summary, serve, loadtest, rollover, reconcile, bench, test, gui)')
     parser.add_argument('-h', '--help', action='store_true', help='Show help')
+    parser.add_argument('--profile-startup', action='store_true',
+                        help='Report the per-import startup cost of the component')
     
-    args = parser.parse_args()
+    # Unrecognised options are passed on to components that take their own (serve, loadtest, rollover, reconcile, bench,
+    # and token/key/decrypt in streaming mode)
+    args, extra_args = parser.parse_known_args()
     
     if args.help:
         print_help()
         return
     
-    run_component(args.component)
+    if args.profile_startup:
+        profile_startup(args.component)
+        return
+    
+    run_component(args.component, extra_args)
 
 if __name__ == "__main__":
     main()
@@ -3,15 +3,23 @@ import os
 from Crypto.Cipher import DES
 from Crypto.Random import get_random_bytes
 
+def vending_key_path():
+    """
+    Returns the path of 'VendingKey.key': the VENDING_KEY_PATH environment
+    variable if set, otherwise resources/data/VendingKey.key.
+    """
+    return os.environ.get("VENDING_KEY_PATH") or os.path.join(
+        os.path.dirname(os.path.dirname(__file__)), "resources", "data", "VendingKey.key")
+
 def generate_vending_key():
     """
     Generates an 8-byte DES vending key and writes it to 'VendingKey.key'
     in Base64 encoding.
     """
     key = get_random_bytes(8)  # DES key is 8 bytes
-    vending_key_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "resources", "data", "VendingKey.key")
-    os.makedirs(os.path.dirname(vending_key_path), exist_ok=True)
-    with open(vending_key_path, "w") as f:
+    path = vending_key_path()
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w") as f:
         f.write(base64.b64encode(key).decode("utf-8"))
     return key
 
@@ -19,11 +27,20 @@ def read_vending_key():
     """
     Reads the vending key from the file 'VendingKey.key' and returns it as bytes.
     """
-    vending_key_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "resources", "data", "VendingKey.key")
-    with open(vending_key_path, "r") as f:
+    with open(vending_key_path(), "r") as f:
         key_b64 = f.read().strip()
     return base64.b64decode(key_b64)
 
+def load_vending_key():
+    """
+    Reads the vending key from 'VendingKey.key', generating and saving a new
+    one first if the file does not exist yet.
+    """
+    try:
+        return read_vending_key()
+    except FileNotFoundError:
+        return generate_vending_key()
+
 def xor_bytes(a: bytes, b: bytes) -> bytes:
     """
     Returns the byte-wise XOR of two byte strings.
@@ -37,7 +54,10 @@ class DecoderKeyGenerator:
     IIN_1 = "0000"
     IIN_2 = "600727"
     
-    def __init__(self, key_type, supply_group_code, tariff_index, key_revision_number, decoder_reference_number):
+    def __init__(self, key_type, supply_group_code, tariff_index, key_revision_number, decoder_reference_number,
+                 vending_key=None, key_store=None):
+        self.vending_key = vending_key  # Read from VendingKey.key when not given
+        self.key_store = key_store      # VendingKeyStore to look the key up in by SGC and KRN
         self.key_type = key_type
         self.supply_group_code = supply_group_code
         self.tariff_index = tariff_index
@@ -71,14 +91,18 @@ class DecoderKeyGenerator:
         if len(self.decoder_reference_number) == 11:
             self.pan_block = self.IIN_2[1:] + self.decoder_reference_number
         else:
-            self.pan_block = self.IIN_1 + self.decoder_reference_number    def get_vending_key(self):
+            self.pan_block = self.IIN_1 + self.decoder_reference_number
+
+    def get_vending_key(self):
         """
-        Reads and returns the vending key from the file.
+        Returns the vending key given to the constructor, the key store's key
+        for this supply group and key revision, or reads it from the file.
         """
-        try:
-            return read_vending_key()
-        except FileNotFoundError:
-            return generate_vending_key()
+        if self.vending_key is not None:
+            return self.vending_key
+        if self.key_store is not None:
+            return self.key_store.get(self.supply_group_code, self.key_revision_number)
+        return load_vending_key()
 
     def generate_decoder_key(self):
         """
@@ -116,6 +140,78 @@ class DecoderKeyGenerator:
     def get_decoder_key_hex(self):
         return self.decoder_key_hex
 
+def derive_decoder_key(key_type, supply_group_code, tariff_index, key_revision_number, decoder_reference_number,
+                       vending_key=None, key_store=None):
+    """
+    Derive a decoder key with DKGA02 and return it as an uppercase hex string.
+    
+    Args:
+        key_type (str): The key type
+        supply_group_code (str): The supply group code
+        tariff_index (str): The tariff index
+        key_revision_number (str): The key revision number
+        decoder_reference_number (str): The decoder reference (meter) number
+        vending_key (bytes): The vending key (default: read from file)
+        key_store (VendingKeyStore): Store to take the vending key from instead of the file
+    
+    Returns:
+        str: The 16-digit decoder key in hex
+    """
+    dkg = DecoderKeyGenerator(key_type, supply_group_code, tariff_index, key_revision_number, decoder_reference_number,
+                              vending_key=vending_key, key_store=key_store)
+    dkg.generate_decoder_key()
+    return dkg.get_decoder_key_hex()
+
+def derive_many(key_type, supply_group_code, tariff_index, key_revision_number, decoder_reference_numbers,
+                vending_key=None, key_store=None):
+    """
+    Derive DKGA02 decoder keys for many meters sharing one parameter set.
+    
+    The control block and vending key are prepared once, the XOR steps run on
+    numpy arrays, and every block is DES-encrypted in a single ECB call, so
+    the cost per meter is a small fraction of a DecoderKeyGenerator.
+    
+    Args:
+        key_type (str): The key type
+        supply_group_code (str): The supply group code
+        tariff_index (str): The tariff index
+        key_revision_number (str): The key revision number
+        decoder_reference_numbers (list): Decoder reference (meter) numbers
+        vending_key (bytes): The vending key (default: read from file)
+        key_store (VendingKeyStore): Store to take the vending key from instead of the file
+    
+    Returns:
+        list: 16-digit uppercase hex decoder keys, in input order
+    
+    Raises:
+        ValueError: If a decoder reference number does not give a 16-digit PAN block
+    """
+    import numpy as np
+    
+    dkg = DecoderKeyGenerator(key_type, supply_group_code, tariff_index, key_revision_number, "",
+                              vending_key=vending_key, key_store=key_store)
+    vending_key = dkg.get_vending_key()
+    if not len(decoder_reference_numbers):
+        return []
+    
+    dkg.build_control_block()
+    control = np.uint64(int(dkg.control_block, 16))
+    vending = np.uint64(int.from_bytes(vending_key, "big"))
+    
+    pans = []
+    for drn in decoder_reference_numbers:
+        dkg.decoder_reference_number = str(drn)
+        dkg.build_pan_block()
+        if len(dkg.pan_block) != 16 or not dkg.pan_block.isdigit():
+            raise ValueError(f"Invalid decoder reference number: {drn}")
+        pans.append(int(dkg.pan_block, 16))
+    pans = np.array(pans, dtype=np.uint64)
+    pan_control_xor = pans ^ control
+    encrypted = np.frombuffer(DES.new(vending_key, DES.MODE_ECB).encrypt(pan_control_xor.astype(">u8").tobytes()),
+                              dtype=">u8").astype(np.uint64)
+    keys = pan_control_xor ^ encrypted ^ vending
+    return [f"{int(key):016X}" for key in keys]
+
 # ---------------------------
 # Example Usage
 # ---------------------------
@@ -0,0 +1,135 @@
+"""
+DKGA04 decoder key generation.
+
+DKGA04 replaces DKGA02's DES construction with an HMAC-SHA-256 key
+derivation function in counter mode (NIST SP 800-108): the vending key keys
+the HMAC, and the message binds the key type, supply group code, tariff
+index, key revision number and decoder reference number. The first
+key_length bytes of the output are the decoder key (8 for EA07, 16 for EA11).
+
+Every meter in a supply group shares the same HMAC key and message prefix,
+so the keyed HMAC state with that prefix already absorbed is cached per
+parameter set. Deriving a key is then one copy of that state plus hashing
+the meter number.
+"""
+
+import hashlib
+import hmac
+from functools import lru_cache
+
+from src.DKGA02 import load_vending_key
+
+LABEL = b"STS-DKGA04"
+
+def _load_vending_key(vending_key, key_store=None, supply_group_code=None, key_revision_number=None):
+    if vending_key is not None:
+        return vending_key
+    if key_store is not None:
+        return key_store.get(supply_group_code, key_revision_number)
+    return load_vending_key()
+
+@lru_cache(maxsize=1024)
+def _prefix_state(vending_key, key_type, supply_group_code, tariff_index, key_revision_number):
+    # [i]_32 || Label || 0x00 || Context (without the meter number)
+    state = hmac.new(vending_key, digestmod=hashlib.sha256)
+    state.update((1).to_bytes(4, "big") + LABEL + b"\x00")
+    state.update(f"{key_type}|{supply_group_code}|{tariff_index}|{key_revision_number}|".encode("ascii"))
+    return state
+
+def _finish(prefix, decoder_reference_number, key_length):
+    state = prefix.copy()
+    state.update(str(decoder_reference_number).encode("ascii"))
+    state.update((key_length * 8).to_bytes(4, "big"))
+    return state.digest()[:key_length]
+
+class DKGA04KeyGenerator:
+    """
+    Implements DKGA04 for decoder key generation.
+    """
+
+    def __init__(self, key_type, supply_group_code, tariff_index, key_revision_number, decoder_reference_number,
+                 vending_key=None, key_length=8, key_store=None):
+        """
+        Args:
+            key_type (str): The key type
+            supply_group_code (str): The supply group code
+            tariff_index (str): The tariff index
+            key_revision_number (str): The key revision number
+            decoder_reference_number (str): The decoder reference (meter) number
+            vending_key (bytes): The vending key (default: read from file)
+            key_length (int): Decoder key length in bytes, 8 or 16
+            key_store (VendingKeyStore): Store to take the vending key from instead of the file
+        """
+        if key_length not in (8, 16):
+            raise ValueError("DKGA04 key length must be 8 or 16 bytes")
+        self.key_type = key_type
+        self.supply_group_code = supply_group_code
+        self.tariff_index = tariff_index
+        self.key_revision_number = key_revision_number
+        self.decoder_reference_number = decoder_reference_number
+        self.vending_key = vending_key
+        self.key_length = key_length
+        self.key_store = key_store
+
+        self.decoder_key_hex = None
+
+    def generate_decoder_key(self):
+        """
+        Derives the decoder key and stores it as an uppercase hex string in self.decoder_key_hex.
+        """
+        vending_key = _load_vending_key(self.vending_key, self.key_store, self.supply_group_code,
+                                        self.key_revision_number)
+        prefix = _prefix_state(vending_key, str(self.key_type), str(self.supply_group_code),
+                               str(self.tariff_index), str(self.key_revision_number))
+        self.decoder_key_hex = _finish(prefix, self.decoder_reference_number, self.key_length).hex().upper()
+
+    def get_decoder_key_hex(self):
+        return self.decoder_key_hex
+
+def derive_decoder_key(key_type, supply_group_code, tariff_index, key_revision_number, decoder_reference_number,
+                       vending_key=None, key_length=8, key_store=None):
+    """
+    Derive a decoder key with DKGA04 and return it as an uppercase hex string.
+
+    Args:
+        key_type (str): The key type
+        supply_group_code (str): The supply group code
+        tariff_index (str): The tariff index
+        key_revision_number (str): The key revision number
+        decoder_reference_number (str): The decoder reference (meter) number
+        vending_key (bytes): The vending key (default: read from file)
+        key_length (int): Decoder key length in bytes, 8 or 16
+        key_store (VendingKeyStore): Store to take the vending key from instead of the file
+
+    Returns:
+        str: The decoder key in hex
+    """
+    dkg = DKGA04KeyGenerator(key_type, supply_group_code, tariff_index, key_revision_number,
+                             decoder_reference_number, vending_key, key_length, key_store)
+    dkg.generate_decoder_key()
+    return dkg.get_decoder_key_hex()
+
+def derive_many(key_type, supply_group_code, tariff_index, key_revision_number, decoder_reference_numbers,
+                vending_key=None, key_length=8, key_store=None):
+    """
+    Derive DKGA04 decoder keys for many meters sharing one parameter set.
+
+    Args:
+        key_type (str): The key type
+        supply_group_code (str): The supply group code
+        tariff_index (str): The tariff index
+        key_revision_number (str): The key revision number
+        decoder_reference_numbers (list): Decoder reference (meter) numbers
+        vending_key (bytes): The vending key (default: read from file)
+        key_length (int): Decoder key length in bytes, 8 or 16
+        key_store (VendingKeyStore): Store to take the vending key from instead of the file
+
+    Returns:
+        list: Uppercase hex decoder keys, in input order
+    """
+    if key_length not in (8, 16):
+        raise ValueError("DKGA04 key length must be 8 or 16 bytes")
+    vending_key = _load_vending_key(vending_key, key_store, supply_group_code, key_revision_number)
+    prefix = _prefix_state(vending_key, str(key_type), str(supply_group_code),
+                           str(tariff_index), str(key_revision_number))
+    return [_finish(prefix, drn, key_length).hex().upper() for drn in decoder_reference_numbers]
@@ -0,0 +1,269 @@
+"""
+EA11 token cipher based on the MISTY1 block cipher (RFC 2994).
+
+MISTY1 encrypts 64-bit blocks with a 128-bit key in 8 Feistel rounds built
+from the FO/FI functions and the S7/S9 substitution boxes, with FL layers
+every two rounds. A 64-bit decoder key is repeated to fill the 128-bit key.
+
+FI(x, k) is split around its key XOR into two key-independent 64K lookup
+tables, so each FI call is two table lookups: FI_OUT[FI_IN[x] ^ k]. Key
+expansion runs once per decoder key and is cached, and the same round code
+runs on Python integers for single blocks or on numpy arrays for batches.
+"""
+
+import time
+from functools import lru_cache
+
+import numpy as np
+
+MASK32 = 0xFFFFFFFF
+
+S7 = [
+     27,  50,  51,  90,  59,  16,  23,  84,  91,  26, 114, 115, 107,  44, 102,  73,
+     31,  36,  19, 108,  55,  46,  63,  74,  93,  15,  64,  86,  37,  81,  28,   4,
+     11,  70,  32,  13, 123,  53,  68,  66,  43,  30,  65,  20,  75, 121,  21, 111,
+     14,  85,   9,  54, 116,  12, 103,  83,  40,  10, 126,  56,   2,   7,  96,  41,
+     25,  18, 101,  47,  48,  57,   8, 104,  95, 120,  42,  76, 100,  69, 117,  61,
+     89,  72,   3,  87, 124,  79,  98,  60,  29,  33,  94,  39, 106, 112,  77,  58,
+      1, 109, 110,  99,  24, 119,  35,   5,  38, 118,   0,  49,  45, 122, 127,  97,
+     80,  34,  17,   6,  71,  22,  82,  78, 113,  62, 105,  67,  52,  92,  88, 125,
+]
+
+S9 = [
+    451, 203, 339, 415, 483, 233, 251,  53, 385, 185, 279, 491, 307,   9,  45, 211,
+    199, 330,  55, 126, 235, 356, 403, 472, 163, 286,  85,  44,  29, 418, 355, 280,
+    331, 338, 466,  15,  43,  48, 314, 229, 273, 312, 398,  99, 227, 200, 500,  27,
+      1, 157, 248, 416, 365, 499,  28, 326, 125, 209, 130, 490, 387, 301, 244, 414,
+    467, 221, 482, 296, 480, 236,  89, 145,  17, 303,  38, 220, 176, 396, 271, 503,
+    231, 364, 182, 249, 216, 337, 257, 332, 259, 184, 340, 299, 430,  23, 113,  12,
+     71,  88, 127, 420, 308, 297, 132, 349, 413, 434, 419,  72, 124,  81, 458,  35,
+    317, 423, 357,  59,  66, 218, 402, 206, 193, 107, 159, 497, 300, 388, 250, 406,
+    481, 361, 381,  49, 384, 266, 148, 474, 390, 318, 284,  96, 373, 463, 103, 281,
+    101, 104, 153, 336,   8,   7, 380, 183,  36,  25, 222, 295, 219, 228, 425,  82,
+    265, 144, 412, 449,  40, 435, 309, 362, 374, 223, 485, 392, 197, 366, 478, 433,
+    195, 479,  54, 238, 494, 240, 147,  73, 154, 438, 105, 129, 293,  11,  94, 180,
+    329, 455, 372,  62, 315, 439, 142, 454, 174,  16, 149, 495,  78, 242, 509, 133,
+    253, 246, 160, 367, 131, 138, 342, 155, 316, 263, 359, 152, 464, 489,   3, 510,
+    189, 290, 137, 210, 399,  18,  51, 106, 322, 237, 368, 283, 226, 335, 344, 305,
+    327,  93, 275, 461, 121, 353, 421, 377, 158, 436, 204,  34, 306,  26, 232,   4,
+    391, 493, 407,  57, 447, 471,  39, 395, 198, 156, 208, 334, 108,  52, 498, 110,
+    202,  37, 186, 401, 254,  19, 262,  47, 429, 370, 475, 192, 267, 470, 245, 492,
+    269, 118, 276, 427, 117, 268, 484, 345,  84, 287,  75, 196, 446, 247,  41, 164,
+     14, 496, 119,  77, 378, 134, 139, 179, 369, 191, 270, 260, 151, 347, 352, 360,
+    215, 187, 102, 462, 252, 146, 453, 111,  22,  74, 161, 313, 175, 241, 400,  10,
+    426, 323, 379,  86, 397, 358, 212, 507, 333, 404, 410, 135, 504, 291, 167, 440,
+    321,  60, 505, 320,  42, 341, 282, 417, 408, 213, 294, 431,  97, 302, 343, 476,
+    114, 394, 170, 150, 277, 239,  69, 123, 141, 325,  83,  95, 376, 178,  46,  32,
+    469,  63, 457, 487, 428,  68,  56,  20, 177, 363, 171, 181,  90, 386, 456, 468,
+     24, 375, 100, 207, 109, 256, 409, 304, 346,   5, 288, 443, 445, 224,  79, 214,
+    319, 452, 298,  21,   6, 255, 411, 166,  67, 136,  80, 351, 488, 289, 115, 382,
+    188, 194, 201, 371, 393, 501, 116, 460, 486, 424, 405,  31,  65,  13, 442,  50,
+     61, 465, 128, 168,  87, 441, 354, 328, 217, 261,  98, 122,  33, 511, 274, 264,
+    448, 169, 285, 432, 422, 205, 243,  92, 258,  91, 473, 324, 502, 173, 165,  58,
+    459, 310, 383,  70, 225,  30, 477, 230, 311, 506, 389, 140, 143,  64, 437, 190,
+    120,   0, 172, 272, 350, 292,   2, 444, 162, 234, 112, 508, 278, 348,  76, 450,
+]
+
+def _build_fi_tables():
+    fi_in = []
+    fi_out = []
+    for x in range(1 << 16):
+        # First half of FI (before the key XOR), packed as d7 << 9 | d9
+        d9 = S9[x >> 7] ^ (x & 0x7F)
+        d7 = S7[x & 0x7F] ^ (d9 & 0x7F)
+        fi_in.append(d7 << 9 | d9)
+        # Second half of FI (after the key XOR)
+        d7, d9 = x >> 9, x & 0x1FF
+        fi_out.append(d7 << 9 | (S9[d9] ^ d7))
+    return fi_in, fi_out
+
+FI_IN, FI_OUT = _build_fi_tables()
+FI_IN_ARRAY = np.array(FI_IN, dtype=np.int64)
+FI_OUT_ARRAY = np.array(FI_OUT, dtype=np.int64)
+
+def _key_bytes(key):
+    if isinstance(key, str):
+        key = bytes.fromhex(key)
+    elif isinstance(key, int):
+        key = key.to_bytes(16 if key >> 64 else 8, "big")
+    key = bytes(key)
+    if len(key) == 8:
+        key = key * 2
+    if len(key) != 16:
+        raise ValueError("EA11 keys must be 64 or 128 bits")
+    return key
+
+@lru_cache(maxsize=4096)
+def key_schedule(key):
+    """
+    Expand a 128-bit MISTY1 key.
+
+    Args:
+        key (bytes): The 16-byte key
+
+    Returns:
+        tuple: The 16 extended key words EK[0..15] (K1..K8 then K'1..K'8)
+    """
+    words = [int.from_bytes(key[2 * i:2 * i + 2], "big") for i in range(8)]
+    return tuple(words + [FI_OUT[FI_IN[words[i]] ^ words[(i + 1) % 8]] for i in range(8)])
+
+def _fo(x, k, ek, fi_in, fi_out):
+    t0 = x >> 16
+    t1 = x & 0xFFFF
+    t0 = fi_out[fi_in[t0 ^ ek[k]] ^ ek[(k + 5) % 8 + 8]] ^ t1
+    t1 = fi_out[fi_in[t1 ^ ek[(k + 2) % 8]] ^ ek[(k + 1) % 8 + 8]] ^ t0
+    t0 = fi_out[fi_in[t0 ^ ek[(k + 7) % 8]] ^ ek[(k + 3) % 8 + 8]] ^ t1
+    t1 ^= ek[(k + 4) % 8]
+    return t1 << 16 | t0
+
+def _fl_keys(k, ek):
+    if k % 2 == 0:
+        return ek[k // 2], ek[(k // 2 + 6) % 8 + 8]
+    return ek[((k - 1) // 2 + 2) % 8 + 8], ek[((k - 1) // 2 + 4) % 8]
+
+def _fl(x, k, ek):
+    and_key, or_key = _fl_keys(k, ek)
+    d0 = x >> 16
+    d1 = x & 0xFFFF
+    d1 ^= d0 & and_key
+    d0 ^= d1 | or_key
+    return d0 << 16 | d1
+
+def _fl_inverse(x, k, ek):
+    and_key, or_key = _fl_keys(k, ek)
+    d0 = x >> 16
+    d1 = x & 0xFFFF
+    d0 ^= d1 | or_key
+    d1 ^= d0 & and_key
+    return d0 << 16 | d1
+
+def _encrypt(d0, d1, ek, fi_in, fi_out):
+    for r in range(0, 8, 2):
+        d0 = _fl(d0, r, ek)
+        d1 = _fl(d1, r + 1, ek)
+        d1 ^= _fo(d0, r, ek, fi_in, fi_out)
+        d0 ^= _fo(d1, r + 1, ek, fi_in, fi_out)
+    return _fl(d1, 9, ek), _fl(d0, 8, ek)
+
+def _decrypt(d1, d0, ek, fi_in, fi_out):
+    d0 = _fl_inverse(d0, 8, ek)
+    d1 = _fl_inverse(d1, 9, ek)
+    for r in range(6, -1, -2):
+        d0 ^= _fo(d1, r + 1, ek, fi_in, fi_out)
+        d1 ^= _fo(d0, r, ek, fi_in, fi_out)
+        d0 = _fl_inverse(d0, r, ek)
+        d1 = _fl_inverse(d1, r + 1, ek)
+    return d0, d1
+
+class EA11Cipher:
+    """
+    EA11 (MISTY1) encryption and decryption with one decoder key.
+    """
+
+    def __init__(self, key):
+        """
+        Args:
+            key (bytes | int | str): The 64- or 128-bit key (bytes, integer or hex string)
+        """
+        self.key = _key_bytes(key)
+        self.schedule = key_schedule(self.key)
+
+    def encrypt_block(self, block):
+        """
+        Encrypt one 64-bit block.
+
+        Args:
+            block (int): The plaintext block
+
+        Returns:
+            int: The encrypted block
+        """
+        left, right = _encrypt(block >> 32, block & MASK32, self.schedule, FI_IN, FI_OUT)
+        return left << 32 | right
+
+    def decrypt_block(self, block):
+        """
+        Decrypt one 64-bit block.
+
+        Args:
+            block (int): The encrypted block
+
+        Returns:
+            int: The plaintext block
+        """
+        left, right = _decrypt(block >> 32, block & MASK32, self.schedule, FI_IN, FI_OUT)
+        return left << 32 | right
+
+    def _apply(self, function, blocks):
+        blocks = np.asarray(blocks, dtype=np.uint64)
+        high = (blocks >> np.uint64(32)).astype(np.int64)
+        low = (blocks & np.uint64(MASK32)).astype(np.int64)
+        left, right = function(high, low, self.schedule, FI_IN_ARRAY, FI_OUT_ARRAY)
+        return left.astype(np.uint64) << np.uint64(32) | right.astype(np.uint64)
+
+    def encrypt_blocks(self, blocks):
+        """
+        Encrypt an array of 64-bit blocks.
+
+        Args:
+            blocks (np.ndarray): Plaintext blocks as uint64
+
+        Returns:
+            np.ndarray: Encrypted blocks as uint64
+        """
+        return self._apply(_encrypt, blocks)
+
+    def decrypt_blocks(self, blocks):
+        """
+        Decrypt an array of 64-bit blocks.
+
+        Args:
+            blocks (np.ndarray): Encrypted blocks as uint64
+
+        Returns:
+            np.ndarray: Plaintext blocks as uint64
+        """
+        return self._apply(_decrypt, blocks)
+
+def benchmark(n_blocks=100000, seed=0):
+    """
+    Compare block decryption throughput of EA11, EA07 and DES.
+
+    Args:
+        n_blocks (int): Number of blocks per batch measurement
+        seed (int): Seed for the random key and blocks
+
+    Returns:
+        dict: Blocks per second for each cipher and API
+    """
+    from Crypto.Cipher import DES
+    from src.EA07 import EA07Cipher
+
+    rng = np.random.default_rng(seed)
+    key = int(rng.integers(0, 2 ** 63)).to_bytes(8, "big")
+    blocks = rng.integers(0, 2 ** 63, size=n_blocks, dtype=np.uint64)
+    scalar_blocks = [int(block) for block in blocks[:max(1, n_blocks // 10)]]
+    des = DES.new(key, DES.MODE_ECB)
+
+    def rate(run, count):
+        start = time.perf_counter()
+        run()
+        elapsed = time.perf_counter() - start
+        return count / elapsed if elapsed > 0 else float("inf")
+
+    results = {}
+    for name, cipher in (("EA11", EA11Cipher(key)), ("EA07", EA07Cipher(key))):
+        results[f"{name} scalar"] = rate(lambda: [cipher.decrypt_block(b) for b in scalar_blocks], len(scalar_blocks))
+        results[f"{name} batch"] = rate(lambda: cipher.decrypt_blocks(blocks), n_blocks)
+    results["DES scalar"] = rate(lambda: [des.decrypt(b.to_bytes(8, "big")) for b in scalar_blocks], len(scalar_blocks))
+    results["DES batch"] = rate(lambda: des.decrypt(blocks.astype(">u8").tobytes()), n_blocks)
+    return results
+
+def main():
+    """Main function to benchmark EA11 against EA07 and DES."""
+    print("Block decryption throughput (blocks/sec):")
+    for name, value in benchmark().items():
+        print(f"  {name:12s} {value:12,.0f}")
+
+if __name__ == "__main__":
+    main()
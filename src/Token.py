@@ -1,28 +1,134 @@
 """
- Simple script to generate a 20-digit numeric electricity token for demo purposes.
+ Simple script to generate a 20-digit numeric electricity token.
+
+generate_token(s) build STS tokens with TokenEncoder, which the meter's
+TokenDecrypter accepts. generate_demo_token(s) are the original hash-based
+demo tokens: they look like tokens but carry no data and fail the
+decrypter's CRC check.
 """
 
 import hashlib
+import math
 import os
+from functools import lru_cache
+
+TOKEN_MODULUS = 10 ** 20
+
+def _demo_digits(meter_number, amount, legacy=False):
+    seed = f"{meter_number}-{int(amount * 100)}-demo-key" # Unique seed for hashing
+    digest = hashlib.sha256(seed.encode()).digest() # Hash the seed
+    if legacy:
+        # Original derivation: the decimal characters of the hex digest, which
+        # can come up short of 20 digits
+        return ''.join(filter(str.isdigit, digest.hex()))[:20]
+    # The 256-bit digest reduced mod 10**20 always gives exactly 20 digits
+    return f"{int.from_bytes(digest, 'big') % TOKEN_MODULUS:020d}"
+
+def _check_amount(amount):
+    if not math.isfinite(amount):
+        raise ValueError(f"Amount must be a finite number: {amount}")
+    if amount < 5:
+        raise ValueError("Amount must be at least KSh 5")
+
+@lru_cache(maxsize=1024)
+def _encoder(meter_number, vending_key):
+    # Deriving a meter's decoder key costs more than encoding a token
+    from src.TokenEncoder import TokenEncoder
+
+    return TokenEncoder(meter_number, vending_key=vending_key)
+
+def generate_token(meter_number: str, amount: float, vending_key: bytes = None) -> str:
+    """
+    Generate an STS token carrying the amount for a meter.
+
+    Args:
+        meter_number (str): The KPLC meter number (e.g., '37194275246')
+        amount (float): The amount paid in KSh (minimum 5), carried as the token's units
+        vending_key (bytes): The vending key (default: read from VendingKey.key)
+
+    Returns:
+        str: A formatted 20-digit token that TokenDecrypter decrypts for the meter
+
+    Raises:
+        ValueError: If the amount is too small, not finite or too large for a token
+    """
+    _check_amount(amount)
+    return _encoder(str(meter_number), vending_key).encode_token(amount)
+
+def generate_tokens(meter_numbers, amounts, vending_key=None):
+    """
+    Generate STS tokens for many meter/amount pairs, one vectorized batch per meter.
 
-def generate_demo_token(meter_number: str, amount: float) -> str:
+    Args:
+        meter_numbers (list): Meter numbers
+        amounts (list): Amounts paid in KSh (minimum 5), one per meter number
+        vending_key (bytes): The vending key (default: read from VendingKey.key)
+
+    Returns:
+        list: Formatted 20-digit tokens, in input order
+
+    Raises:
+        ValueError: If an amount is too small, not finite or too large for a token
+    """
+    for amount in amounts:
+        _check_amount(amount)
+
+    positions = {}
+    for i, meter_number in enumerate(meter_numbers):
+        positions.setdefault(str(meter_number), []).append(i)
+    tokens = [None] * len(meter_numbers)
+    for meter_number, indices in positions.items():
+        encoded = _encoder(meter_number, vending_key).encode_tokens([amounts[i] for i in indices])
+        for i, token in zip(indices, encoded):
+            tokens[i] = token
+    return tokens
+
+def generate_demo_token(meter_number: str, amount: float, legacy: bool = False) -> str:
     """
     Simulates generation of a 20-digit numeric electricity token for demo purposes.
 
+    The digits are a hash of the meter number and amount, not encrypted
+    token data, so TokenDecrypter rejects them; use generate_token for
+    tokens a meter accepts.
+
     Args:
         meter_number (str): The KPLC meter number (e.g., '37194275246')
         amount (float): The amount paid in KSh (minimum 5)
+        legacy (bool): Reproduce tokens from the original digit-filtering
+            derivation instead of the digest mod 10**20
 
     Returns:
         str: A 20-digit numeric token
+
+    Raises:
+        ValueError: If the amount is too small or not finite
     """
-    if amount < 5:
+    _check_amount(amount)
+
+    return format_token(_demo_digits(meter_number, amount, legacy))
+
+def generate_demo_tokens(meter_numbers, amounts, legacy=False):
+    """
+    Generate demo tokens for many meter/amount pairs (see generate_demo_token).
+
+    Args:
+        meter_numbers (list): Meter numbers
+        amounts (list): Amounts paid in KSh (minimum 5), one per meter number
+        legacy (bool): Reproduce tokens from the original digit-filtering derivation
+
+    Returns:
+        list: Formatted 20-digit tokens, in input order
+
+    Raises:
+        ValueError: If an amount is too small or not finite
+    """
+    if not all(math.isfinite(amount) for amount in amounts):
+        raise ValueError("Amounts must be finite numbers")
+    if any(amount < 5 for amount in amounts):
         raise ValueError("Amount must be at least KSh 5")
 
-    seed = f"{meter_number}-{int(amount * 100)}-demo-key" # Unique seed for hashing
-    hashed = hashlib.sha256(seed.encode()).hexdigest() # Hash the seed
-    token = ''.join(filter(str.isdigit, hashed))[:20] # Extract digits and limit to 20 characters
-    return format_token(token)
+    return [format_token(_demo_digits(meter_number, amount, legacy))
+            for meter_number, amount in zip(meter_numbers, amounts)]
 
 def format_token(token: str) -> str:
     """
@@ -42,7 +148,7 @@ def main():
     amount = float(input("Enter Amount (min KSh 5): "))
 
     try:
-        token = generate_demo_token(meter, amount)
+        token = generate_token(meter, amount)
         print(f"\nGenerated Token: {token}")
     except ValueError as ve:
         print(f"Error: {ve}")
@@ -6,17 +6,48 @@ https://mwangi-patrick.medium.com/lets-demystify-that-20-digit-utility-token-par
 
 import base64
 import os
-from Crypto.Cipher import DES
-from src.DKGA02 import DecoderKeyGenerator, read_vending_key, xor_bytes
+import threading
+import time
+from collections import OrderedDict
+import numpy as np
+from src.crc16 import check_token_crc, check_token_crcs
+from src.DKGA02 import DecoderKeyGenerator, load_vending_key, xor_bytes
+from src.EA07 import EA07Cipher
+from src.EA11 import EA11Cipher
+
+# Token encryption algorithms, by STS name
+CIPHERS = {
+    "EA07": EA07Cipher,
+    "EA11": EA11Cipher,
+}
+
+def create_cipher(algorithm, decoder_key):
+    """
+    Create a block cipher for a decoder key.
+    
+    Args:
+        algorithm (str): "EA07" or "EA11"
+        decoder_key (bytes): The decoder key
+    
+    Returns:
+        The cipher, with encrypt_block/decrypt_block and encrypt_blocks/decrypt_blocks
+    """
+    try:
+        cipher_class = CIPHERS[algorithm.upper()]
+    except KeyError:
+        raise ValueError(f"Unknown encryption algorithm: {algorithm} (expected one of {', '.join(CIPHERS)})")
+    return cipher_class(decoder_key)
 
 class TokenDecrypter:
     """
-    Implements token decryption according to EA07 (Encryption Algorithm 7) of the STS.
+    Implements token decryption according to EA07 (Encryption Algorithm 7) of the STS,
+    or EA11 (MISTY1) for meters that use it.
     This simulates how a meter would decrypt a token to extract the information.
     """
     
     def __init__(self, meter_number, key_type="2", supply_group_code="123456", 
-                 tariff_index="7", key_revision_number="1"):
+                 tariff_index="7", key_revision_number="1", vending_key=None, redeemed_index=None,
+                 algorithm="EA07", decoder_key=None):
         """
         Initialize the decrypter with the meter's information.
         
@@ -26,30 +57,45 @@ class TokenDecrypter:
             supply_group_code (str): The supply group code (default: "123456")
             tariff_index (str): The tariff index (default: "7")
             key_revision_number (str): The key revision number (default: "1")
+            vending_key (bytes): The vending key, if already loaded (default: read from file)
+            redeemed_index (TokenIndex): Optional index of redeemed tokens; a token
+                already in it is rejected, and each decrypted token is recorded
+            algorithm (str): Token encryption algorithm, "EA07" or "EA11" (default: "EA07")
+            decoder_key (str): The meter's decoder key in hex, if already derived
+                (e.g. from a SharedKeyTable); skips DKGA02
         """
         self.meter_number = meter_number
         self.key_type = key_type
         self.supply_group_code = supply_group_code
         self.tariff_index = tariff_index
         self.key_revision_number = key_revision_number
+        self.vending_key = vending_key
+        self.redeemed_index = redeemed_index
+        self.algorithm = algorithm.upper()
         
         # Generate the decoder key for this meter
-        self._generate_decoder_key()
+        self._generate_decoder_key(decoder_key)
     
-    def _generate_decoder_key(self):
+    def _generate_decoder_key(self, decoder_key_hex=None):
         """
-        Generate the decoder key for this meter using DKGA02.
+        Generate the decoder key for this meter using DKGA02, unless it is given.
         """
-        dkg = DecoderKeyGenerator(
-            self.key_type, 
-            self.supply_group_code, 
-            self.tariff_index, 
-            self.key_revision_number, 
-            self.meter_number
-        )
-        dkg.generate_decoder_key()
-        self.decoder_key_hex = dkg.get_decoder_key_hex()
+        if decoder_key_hex is None:
+            dkg = DecoderKeyGenerator(
+                self.key_type, 
+                self.supply_group_code, 
+                self.tariff_index, 
+                self.key_revision_number, 
+                self.meter_number,
+                vending_key=self.vending_key
+            )
+            dkg.generate_decoder_key()
+            decoder_key_hex = dkg.get_decoder_key_hex()
+        self.decoder_key_hex = decoder_key_hex
         self.decoder_key = bytes.fromhex(self.decoder_key_hex)
+        
+        # The cipher only depends on the decoder key, so set it up once
+        self._cipher = create_cipher(self.algorithm, self.decoder_key)
     
     def _extract_token_bits(self, token_number):
         """
@@ -76,20 +122,27 @@ class TokenDecrypter:
         """
         Extract and remove the class bits from the binary token.
         
+        The encoder transposes the class bits with bits 28 and 27 of the
+        encrypted block, moving those two bits to the top of the token, so
+        this swaps them back.
+        
         Args:
             binary_token (str): The 66-bit binary token
         
         Returns:
             tuple: (class_bits, 64-bit_encrypted_block)
+        
+        Raises:
+            ValueError: If the token needs more than 66 bits
         """
-        # Extract the class bits (first 2 bits)
-        class_bits = binary_token[:2]
+        if len(binary_token) > 66:
+            raise ValueError("Token is out of range for a 66-bit token")
         
-        # The rest is the encrypted block
-        encrypted_block = binary_token[2:]
+        # Bit n of the token is character 65 - n of the string
+        class_bits = binary_token[37:39]
         
-        # Detranspose the class bits if needed (in a real implementation)
-        # This would involve swapping with bits at positions 28 and 27
+        # Put the top 2 bits back in positions 28 and 27
+        encrypted_block = binary_token[2:37] + binary_token[:2] + binary_token[39:]
         
         return class_bits, encrypted_block
     
@@ -103,22 +156,17 @@ class TokenDecrypter:
         Returns:
             str: The decrypted binary block
         """
-        # Convert binary string to bytes
-        encrypted_bytes = int(encrypted_block, 2).to_bytes(8, byteorder='big')
+        # Convert binary string to an integer
+        encrypted_value = int(encrypted_block, 2)
+        if encrypted_value >> 64:
+            raise ValueError("Token is out of range for a 66-bit token")
         
-        # In a real implementation, this would involve:
-        # 1. Multiple rounds of inverse permutation
-        # 2. Inverse substitution
-        # 3. Key rotation
-        # For simplicity, we'll use DES decryption as an approximation
-        
-        cipher = DES.new(self.decoder_key, DES.MODE_ECB)
-        decrypted_bytes = cipher.decrypt(encrypted_bytes)
+        # EA07: 16 rounds of inverse permutation and inverse substitution,
+        # with the key rotated between rounds (or the MISTY1 rounds for EA11)
+        decrypted_value = self._cipher.decrypt_block(encrypted_value)
         
         # Convert back to binary string
-        decrypted_block = ''.join(format(byte, '08b') for byte in decrypted_bytes)
-        
-        return decrypted_block
+        return format(decrypted_value, '064b')
     
     def _parse_token_data(self, decrypted_block, class_bits):
         """
@@ -186,7 +234,13 @@ class TokenDecrypter:
         
         Returns:
             dict: The extracted token information
+        
+        Raises:
+            ValueError: If the token is malformed or has already been redeemed
         """
+        if self.redeemed_index is not None and token_number in self.redeemed_index:
+            raise ValueError(f"Token already redeemed: {token_number}")
+        
         # Extract token bits
         binary_token = self._extract_token_bits(token_number)
         
@@ -196,29 +250,281 @@ class TokenDecrypter:
         # Decrypt the block
         decrypted_block = self._decrypt_block(encrypted_block)
         
+        # Reject corrupted or forged tokens before parsing anything
+        if not check_token_crc(int(class_bits, 2), int(decrypted_block, 2)):
+            raise ValueError(f"Token failed CRC check: {token_number}")
+        
         # Parse the decrypted data
         token_data = self._parse_token_data(decrypted_block, class_bits)
-          # Calculate the actual units amount
+        
+        # Calculate the actual units amount
         token_data["units"] = self._calculate_amount(token_data["amount_bits"])
         
+        if self.redeemed_index is not None:
+            self.redeemed_index.add(token_number)
+        
         return token_data
+    
+    def decrypt_tokens(self, token_numbers, return_exceptions=False):
+        """
+        Decrypt many tokens for this meter in one pass.
+        
+        All blocks are decrypted together with the cipher's batch API and their
+        CRCs are checked together, which is much cheaper than calling
+        decrypt_token once per token.
+        
+        Args:
+            token_numbers (list): 20-digit token numbers (with or without separators)
+            return_exceptions (bool): If True, a token that cannot be decrypted
+                gets its exception in the result list instead of failing the batch
+        
+        Returns:
+            list: Token information dicts in the same order as token_numbers
+        """
+        results = [None] * len(token_numbers)
+        pending = []
+        redeemed = set()
+        for i, token_number in enumerate(token_numbers):
+            try:
+                if self.redeemed_index is not None:
+                    # Reject tokens seen before, including earlier in this batch
+                    if token_number in self.redeemed_index or token_number.replace("-", "") in redeemed:
+                        raise ValueError(f"Token already redeemed: {token_number}")
+                    redeemed.add(token_number.replace("-", ""))
+                class_bits, encrypted_block = self._extract_class_bits(self._extract_token_bits(token_number))
+                encrypted_value = int(encrypted_block, 2)
+                if encrypted_value >> 64:
+                    raise ValueError("Token is out of range for a 66-bit token")
+            except (ValueError, AttributeError) as e:
+                if not return_exceptions:
+                    raise
+                results[i] = e
+                continue
+            pending.append((i, class_bits, encrypted_value))
+        
+        blocks = self._cipher.decrypt_blocks(np.array([value for _, _, value in pending], dtype=np.uint64))
+        classes = np.array([int(class_bits, 2) for _, class_bits, _ in pending], dtype=np.uint8)
+        crc_ok = check_token_crcs(classes, blocks)
+        
+        valid = []
+        for n, (i, class_bits, _) in enumerate(pending):
+            if not crc_ok[n]:
+                error = ValueError(f"Token failed CRC check: {token_numbers[i]}")
+                if not return_exceptions:
+                    raise error
+                results[i] = error
+                continue
+            valid.append(i)
+            decrypted_block = format(int(blocks[n]), '064b')
+            token_data = self._parse_token_data(decrypted_block, class_bits)
+            token_data["units"] = self._calculate_amount(token_data["amount_bits"])
+            results[i] = token_data
+        
+        if self.redeemed_index is not None:
+            self.redeemed_index.add_many(token_numbers[i] for i in valid)
+        
+        return results
+
+class DecrypterRegistry:
+    """
+    Thread-safe pool of ready-to-use TokenDecrypter instances.
+    
+    Building a decrypter derives the meter's decoder key (DKGA02), so the
+    registry keeps decrypters for recently used meters, can be pre-warmed
+    with known meters, and evicts the least recently used ones beyond
+    max_entries or after idle_seconds without use. The vending key is read
+    once and shared by every decrypter it builds, and meters found in an
+    attached SharedKeyTable skip key derivation altogether.
+    """
+    
+    def __init__(self, max_entries=10000, idle_seconds=None, vending_key=None, key_table=None, key_store=None):
+        """
+        Args:
+            max_entries (int): Most decrypters kept at once (the memory cap)
+            idle_seconds (float): Evict decrypters unused for this long (None: never)
+            vending_key (bytes): The vending key (default: read from file on first use)
+            key_table (SharedKeyTable): Pre-derived decoder keys to use where they match
+            key_store (VendingKeyStore): Per supply group and key revision vending
+                keys, used instead of the single vending key
+        """
+        self.max_entries = max_entries
+        self.idle_seconds = idle_seconds
+        self.vending_key = vending_key
+        self.key_table = key_table
+        self.key_store = key_store
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        
+        self._entries = OrderedDict()  # key -> (decrypter, last used)
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def _key(meter_number, key_type, supply_group_code, tariff_index, key_revision_number, algorithm):
+        return (str(meter_number), str(key_type), str(supply_group_code), str(tariff_index), str(key_revision_number),
+                str(algorithm).upper())
+    
+    def _vending_key(self, supply_group_code, key_revision_number):
+        if self.key_store is not None:
+            return self.key_store.get(supply_group_code, key_revision_number)
+        if self.vending_key is None:
+            self.vending_key = load_vending_key()
+        return self.vending_key
+    
+    def get(self, meter_number, key_type="2", supply_group_code="123456", tariff_index="7", key_revision_number="1",
+            algorithm="EA07"):
+        """
+        Return a decrypter for a meter, building and caching it on first use.
+        
+        Args:
+            meter_number (str): The meter number (decoder reference number)
+            key_type (str): The key type
+            supply_group_code (str): The supply group code
+            tariff_index (str): The tariff index
+            key_revision_number (str): The key revision number
+            algorithm (str): Token encryption algorithm, "EA07" or "EA11"
+        
+        Returns:
+            TokenDecrypter: A ready decrypter
+        """
+        key = self._key(meter_number, key_type, supply_group_code, tariff_index, key_revision_number, algorithm)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self.hits += 1
+                self._entries[key] = (entry[0], now)
+                self._entries.move_to_end(key)
+                return entry[0]
+            self.misses += 1
+        
+        decoder_key = None
+        if self.key_table is not None and self.key_table.matches(*key[1:5]):
+            decoder_key = self.key_table.lookup(key[0])
+        if decoder_key is None:
+            with self._lock:
+                vending_key = self._vending_key(key[2], key[4])
+        else:
+            vending_key = self.vending_key
+        
+        # Derive outside the lock so other meters are not held up
+        decrypter = TokenDecrypter(*key[:5], vending_key=vending_key, algorithm=key[5], decoder_key=decoder_key)
+        with self._lock:
+            self._entries[key] = (decrypter, now)
+            self._entries.move_to_end(key)
+            self._evict(now)
+        return decrypter
+    
+    def prewarm(self, meter_numbers, **key_parameters):
+        """
+        Build decrypters for known meters ahead of their first token.
+        
+        Args:
+            meter_numbers (iterable): Meter numbers to warm
+            **key_parameters: Key parameters shared by these meters
+        
+        Returns:
+            int: Number of distinct meters now warm
+        """
+        warmed = set()
+        for meter_number in meter_numbers:
+            meter_number = str(meter_number).strip()
+            if meter_number and meter_number not in warmed:
+                self.get(meter_number, **key_parameters)
+                warmed.add(meter_number)
+        return len(warmed)
+    
+    def prewarm_from_frame(self, df, column='Mtr', **key_parameters):
+        """
+        Pre-warm every distinct meter in a DataFrame column.
+        
+        Args:
+            df (pd.DataFrame): Token data, e.g. the cleaned meter data
+            column (str): Column holding meter numbers
+        
+        Returns:
+            int: Number of distinct meters now warm
+        """
+        return self.prewarm(df[column].dropna().astype(str).unique(), **key_parameters)
+    
+    def prewarm_from_csv(self, csv_path=None, column='Mtr', **key_parameters):
+        """
+        Pre-warm every distinct meter in a cleaned data CSV.
+        
+        Args:
+            csv_path (str): Path to the CSV (default: resources/data/cleaned_meter_data.csv)
+            column (str): Column holding meter numbers
+        
+        Returns:
+            int: Number of distinct meters now warm
+        """
+        import pandas as pd
+        
+        if csv_path is None:
+            base_dir = os.path.dirname(os.path.dirname(__file__))
+            csv_path = os.path.join(base_dir, "resources", "data", "cleaned_meter_data.csv")
+        df = pd.read_csv(csv_path, usecols=[column], dtype={column: str})
+        return self.prewarm_from_frame(df, column, **key_parameters)
+    
+    def _evict(self, now):
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+        if self.idle_seconds is not None:
+            # Entries are in last-used order, so idle ones are at the front
+            while self._entries:
+                key, (_, last_used) = next(iter(self._entries.items()))
+                if now - last_used <= self.idle_seconds:
+                    break
+                del self._entries[key]
+                self.evictions += 1
+    
+    def evict_idle(self):
+        """Drop decrypters that have been idle longer than idle_seconds."""
+        with self._lock:
+            self._evict(time.monotonic())
+    
+    def clear(self):
+        """Drop every cached decrypter."""
+        with self._lock:
+            self._entries.clear()
+    
+    def __len__(self):
+        return len(self._entries)
+    
+    def __contains__(self, meter_number):
+        return any(key[0] == str(meter_number) for key in list(self._entries))
+
+def describe_token(result):
+    """
+    Format decrypted token information for display.
+    
+    Args:
+        result (dict): The output of TokenDecrypter.decrypt_token
+    
+    Returns:
+        str: A human-readable, multi-line description
+    """
+    return "\n".join([
+        "Decrypted Token Information:",
+        f"Token Class: {result['token_class']}",
+        f"Subclass: {result['subclass']}",
+        f"Random Number: {result['random_number']}",
+        f"Token Identifier (TID): {result['tid']}",
+        f"Calculated Units: {result['units']:.2f}",
+    ])
 
 def main():
     """Main function to run the token decrypter."""
-    # Example token from the raw data file
     meter_number = input("Enter Meter Number (e.g., 37194275246): ")
-    token = input("Enter Token (e.g., 1865-3776-4842-2132-9404): ")
+    # Tokens only decrypt with the vending key they were generated with
+    token = input("Enter a Token generated for this meter (20 digits, dashes optional): ")
     
     decrypter = TokenDecrypter(meter_number)
     
     try:
         result = decrypter.decrypt_token(token)
-        print("\nDecrypted Token Information:")
-        print(f"Token Class: {result['token_class']}")
-        print(f"Subclass: {result['subclass']}")
-        print(f"Random Number: {result['random_number']}")
-        print(f"Token Identifier (TID): {result['tid']}")
-        print(f"Calculated Units: {result['units']:.2f}")
+        print("\n" + describe_token(result))
     except Exception as e:
         print(f"Error decrypting token: {e}")
 
@@ -5,11 +5,13 @@ This addresses the "Future Enhancement" mentioned in the README:
 """
 
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
+from matplotlib import rcParams
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
 import numpy as np
 from datetime import datetime
 import os
+from src.summary_statistics import SummaryAccumulator, write_summary_report
 
 def load_data(file_path=None):
     """
@@ -36,89 +38,155 @@ def load_data(file_path=None):
     
     return df
 
-def plot_units_over_time(df):
+def _image_path(file_name):
     """
-    Plot the number of units purchased over time.
+    Build the output path for a chart image and make sure its directory exists.
     
     Args:
-        df (pd.DataFrame): The token data DataFrame
+        file_name (str): Image file name relative to resources/images
+        
+    Returns:
+        str: The absolute output path
     """
     base_dir = os.path.dirname(os.path.dirname(__file__))
-    output_path = os.path.join(base_dir, "resources", "images", "units_over_time.png")
+    output_path = os.path.join(base_dir, "resources", "images", file_name)
     os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    return output_path
+
+def new_figure(figsize, nrows=1, ncols=1, **kwargs):
+    """
+    Create a figure backed by an Agg canvas without touching pyplot state.
     
-    plt.figure(figsize=(12, 6))
-    plt.plot(df['Datetime'], df['Units'], marker='o', linestyle='-', color='#1f77b4')
-    plt.title('Units Purchased Over Time', fontsize=16)
-    plt.xlabel('Date', fontsize=12)
-    plt.ylabel('Units', fontsize=12)
-    plt.grid(True, alpha=0.3)
-    plt.tight_layout()
-    plt.savefig(output_path)
-    print(f"Saved chart to: {os.path.abspath(output_path)}")
-    plt.close()
+    Figures built this way are safe to create from worker threads and can be
+    rendered either to a file or straight into memory.
+    
+    Args:
+        figsize (tuple): Figure size in inches
+        nrows (int): Number of subplot rows
+        ncols (int): Number of subplot columns
+        
+    Returns:
+        tuple: (Figure, axes)
+    """
+    fig = Figure(figsize=figsize)
+    FigureCanvasAgg(fig)
+    axes = fig.subplots(nrows, ncols, **kwargs)
+    return fig, axes
 
-def plot_amount_distribution(df):
+def save_figure(fig, output_path, message="Saved chart to"):
     """
-    Plot a histogram showing the distribution of purchase amounts.
+    Save a figure to disk.
     
     Args:
-        df (pd.DataFrame): The token data DataFrame
+        fig (Figure): The figure to save
+        output_path (str): Destination image path
+        message (str): Prefix for the confirmation message
+        
+    Returns:
+        str: The output path
     """
-    base_dir = os.path.dirname(os.path.dirname(__file__))
-    output_path = os.path.join(base_dir, "resources", "images", "amount_distribution.png")
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    fig.savefig(output_path)
+    print(f"{message}: {os.path.abspath(output_path)}")
+    return output_path
+
+def render_figure(fig, width=None):
+    """
+    Render a figure into an in-memory RGBA image.
     
-    plt.figure(figsize=(10, 6))
-    sns.histplot(df['Amt'], bins=10, kde=True, color='#2ca02c')
-    plt.title('Distribution of Purchase Amounts', fontsize=16)
-    plt.xlabel('Amount (KSh)', fontsize=12)
-    plt.ylabel('Frequency', fontsize=12)
-    plt.grid(True, alpha=0.3)
-    plt.tight_layout()
-    plt.savefig(output_path)
-    print(f"Saved chart to: {os.path.abspath(output_path)}")
-    plt.close()
+    When a target width is given the figure is rasterised at a DPI that
+    yields exactly that width, so no resampling or PNG round-trip is needed.
+    
+    Args:
+        fig (Figure): The figure to render
+        width (int): Target width in pixels (defaults to the figure's own size)
+        
+    Returns:
+        PIL.Image.Image: The rendered image
+    """
+    from PIL import Image
+    
+    if width:
+        fig.set_dpi(width / fig.get_figwidth())
+    canvas = fig.canvas if isinstance(fig.canvas, FigureCanvasAgg) else FigureCanvasAgg(fig)
+    canvas.draw()
+    size = canvas.get_width_height()
+    return Image.frombuffer("RGBA", size, bytes(canvas.buffer_rgba()), "raw", "RGBA", 0, 1)
 
-def plot_units_per_amount(df):
+def build_units_over_time_figure(df):
     """
-    Plot a scatter plot showing units received per amount spent.
+    Build a line chart of the number of units purchased over time.
     
     Args:
         df (pd.DataFrame): The token data DataFrame
+        
+    Returns:
+        Figure: The chart
     """
-    base_dir = os.path.dirname(os.path.dirname(__file__))
-    output_path = os.path.join(base_dir, "resources", "images", "units_per_amount.png")
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    fig, ax = new_figure((12, 6))
+    ax.plot(df['Datetime'], df['Units'], marker='o', linestyle='-', color='#1f77b4')
+    ax.set_title('Units Purchased Over Time', fontsize=16)
+    ax.set_xlabel('Date', fontsize=12)
+    ax.set_ylabel('Units', fontsize=12)
+    ax.grid(True, alpha=0.3)
+    fig.tight_layout()
+    return fig
+
+def build_amount_distribution_figure(df):
+    """
+    Build a histogram showing the distribution of purchase amounts.
+    
+    Args:
+        df (pd.DataFrame): The token data DataFrame
+        
+    Returns:
+        Figure: The chart
+    """
+    import seaborn as sns  # Imported on first use; it is slow to load
+    
+    fig, ax = new_figure((10, 6))
+    sns.histplot(df['Amt'], bins=10, kde=True, color='#2ca02c', ax=ax)
+    ax.set_title('Distribution of Purchase Amounts', fontsize=16)
+    ax.set_xlabel('Amount (KSh)', fontsize=12)
+    ax.set_ylabel('Frequency', fontsize=12)
+    ax.grid(True, alpha=0.3)
+    fig.tight_layout()
+    return fig
+
+def build_units_per_amount_figure(df):
+    """
+    Build a scatter plot showing units received per amount spent.
     
-    plt.figure(figsize=(10, 6))
-    plt.scatter(df['Amt'], df['Units'], alpha=0.7, s=50, color='#d62728')
+    Args:
+        df (pd.DataFrame): The token data DataFrame
+        
+    Returns:
+        Figure: The chart
+    """
+    fig, ax = new_figure((10, 6))
+    ax.scatter(df['Amt'], df['Units'], alpha=0.7, s=50, color='#d62728')
     
     # Add trend line
     z = np.polyfit(df['Amt'], df['Units'], 1)
     p = np.poly1d(z)
-    plt.plot(df['Amt'], p(df['Amt']), "r--", alpha=0.8)
-    
-    plt.title('Units per Amount Spent', fontsize=16)
-    plt.xlabel('Amount (KSh)', fontsize=12)
-    plt.ylabel('Units', fontsize=12)
-    plt.grid(True, alpha=0.3)
-    plt.tight_layout()
-    plt.savefig(output_path)
-    print(f"Saved chart to: {os.path.abspath(output_path)}")
-    plt.close()
+    ax.plot(df['Amt'], p(df['Amt']), "r--", alpha=0.8)
+    
+    ax.set_title('Units per Amount Spent', fontsize=16)
+    ax.set_xlabel('Amount (KSh)', fontsize=12)
+    ax.set_ylabel('Units', fontsize=12)
+    ax.grid(True, alpha=0.3)
+    fig.tight_layout()
+    return fig
 
-def plot_monthly_spending(df):
+def build_monthly_spending_figure(df):
     """
-    Plot the total monthly spending.
+    Build a bar chart of the total monthly spending.
     
     Args:
         df (pd.DataFrame): The token data DataFrame
+        
+    Returns:
+        Figure: The chart
     """
-    base_dir = os.path.dirname(os.path.dirname(__file__))
-    output_path = os.path.join(base_dir, "resources", "images", "monthly_spending.png")
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    
     # Add month and year columns
     df['Month'] = df['Datetime'].dt.month_name()
     df['Year'] = df['Datetime'].dt.year
@@ -140,39 +208,38 @@ def plot_monthly_spending(df):
     # Format x-axis labels
     x_labels = [f"{row['Month'][:3]} {row['Year']}" for _, row in monthly_data.iterrows()]
     
-    plt.figure(figsize=(12, 6))
-    bars = plt.bar(x_labels, monthly_data['Amt'], color='#9467bd')
-    plt.title('Monthly Spending', fontsize=16)
-    plt.xlabel('Month', fontsize=12)
-    plt.ylabel('Total Amount (KSh)', fontsize=12)
-    plt.xticks(rotation=45)
+    fig, ax = new_figure((12, 6))
+    bars = ax.bar(x_labels, monthly_data['Amt'], color='#9467bd')
+    ax.set_title('Monthly Spending', fontsize=16)
+    ax.set_xlabel('Month', fontsize=12)
+    ax.set_ylabel('Total Amount (KSh)', fontsize=12)
+    ax.tick_params(axis='x', labelrotation=45)
     
     # Add value labels above bars
     for bar in bars:
         height = bar.get_height()
-        plt.text(bar.get_x() + bar.get_width()/2., height + 5,
-                 f'{int(height)}',
-                 ha='center', va='bottom', rotation=0)
+        ax.text(bar.get_x() + bar.get_width()/2., height + 5,
+                f'{int(height)}',
+                ha='center', va='bottom', rotation=0)
     
-    plt.grid(True, alpha=0.3, axis='y')
-    plt.tight_layout()
-    plt.savefig(output_path)
-    print(f"Saved chart to: {os.path.abspath(output_path)}")
-    plt.close()
+    ax.grid(True, alpha=0.3, axis='y')
+    fig.tight_layout()
+    return fig
 
-def create_comprehensive_dashboard(df):
+def build_dashboard_figure(df):
     """
-    Create a comprehensive dashboard with multiple visualizations.
+    Build a comprehensive dashboard with multiple visualizations.
     
     Args:
         df (pd.DataFrame): The token data DataFrame
+        
+    Returns:
+        Figure: The dashboard
     """
-    base_dir = os.path.dirname(os.path.dirname(__file__))
-    output_path = os.path.join(base_dir, "resources", "images", "token_data_dashboard.png")
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    import seaborn as sns  # Imported on first use; it is slow to load
     
     # Create the figure with multiple subplots
-    fig, axs = plt.subplots(2, 2, figsize=(16, 12))
+    fig, axs = new_figure((16, 12), 2, 2)
     
     # 1. Units over time
     axs[0, 0].plot(df['Datetime'], df['Units'], marker='o', linestyle='-', color='#1f77b4')
@@ -211,45 +278,368 @@ def create_comprehensive_dashboard(df):
             shadow=True, startangle=90, colors=['#ff7f0e', '#8c564b'])
     axs[1, 1].set_title('Proportion of Token Amount vs Other Charges', fontsize=14)
     axs[1, 1].axis('equal')  # Equal aspect ratio ensures that pie is drawn as a circle
-      plt.tight_layout()
-    plt.savefig(output_path)
-    print(f"Saved comprehensive dashboard to: {os.path.abspath(output_path)}")
-    plt.close()
+    
+    fig.tight_layout()
+    return fig
+
+# Chart name -> (display title, figure builder, image file name)
+CHARTS = {
+    "units_over_time": ("Units Over Time", build_units_over_time_figure, "units_over_time.png"),
+    "amount_distribution": ("Amount Distribution", build_amount_distribution_figure, "amount_distribution.png"),
+    "units_per_amount": ("Units per Amount", build_units_per_amount_figure, "units_per_amount.png"),
+    "monthly_spending": ("Monthly Spending", build_monthly_spending_figure, "monthly_spending.png"),
+    "dashboard": ("Dashboard", build_dashboard_figure, "token_data_dashboard.png"),
+}
+
+def render_charts(df, names=None, width=None):
+    """
+    Render charts straight into memory, skipping the PNG write and read.
+    
+    Args:
+        df (pd.DataFrame): The token data DataFrame
+        names (list): Chart names from CHARTS (defaults to all of them)
+        width (int): Target width in pixels for every image
+        
+    Returns:
+        list: (title, PIL.Image.Image) tuples in the requested order
+    """
+    rendered = []
+    for name in names or CHARTS:
+        title, builder, _ = CHARTS[name]
+        rendered.append((title, render_figure(builder(df), width=width)))
+    return rendered
+
+def plot_units_over_time(df):
+    """
+    Plot the number of units purchased over time.
+    
+    Args:
+        df (pd.DataFrame): The token data DataFrame
+    """
+    save_figure(build_units_over_time_figure(df), _image_path("units_over_time.png"))
+
+def plot_amount_distribution(df):
+    """
+    Plot a histogram showing the distribution of purchase amounts.
+    
+    Args:
+        df (pd.DataFrame): The token data DataFrame
+    """
+    save_figure(build_amount_distribution_figure(df), _image_path("amount_distribution.png"))
+
+def plot_units_per_amount(df):
+    """
+    Plot a scatter plot showing units received per amount spent.
+    
+    Args:
+        df (pd.DataFrame): The token data DataFrame
+    """
+    save_figure(build_units_per_amount_figure(df), _image_path("units_per_amount.png"))
+
+def plot_monthly_spending(df):
+    """
+    Plot the total monthly spending.
+    
+    Args:
+        df (pd.DataFrame): The token data DataFrame
+    """
+    save_figure(build_monthly_spending_figure(df), _image_path("monthly_spending.png"))
+
+def create_comprehensive_dashboard(df):
+    """
+    Create a comprehensive dashboard with multiple visualizations.
+    
+    Args:
+        df (pd.DataFrame): The token data DataFrame
+    """
+    save_figure(build_dashboard_figure(df), _image_path("token_data_dashboard.png"),
+                message="Saved comprehensive dashboard to")
 
 def generate_summary_statistics(df):
     """
     Generate and print summary statistics for the token data.
     
+    The statistics are computed with the mergeable SummaryAccumulator, so the
+    same figures can be produced from a stream or from chunks on disk.
+    
     Args:
         df (pd.DataFrame): The token data DataFrame
     """
-    base_dir = os.path.dirname(os.path.dirname(__file__))
-    output_path = os.path.join(base_dir, "resources", "data", "token_summary_statistics.txt")
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    stats = SummaryAccumulator().add_frame(df).statistics()
+    write_summary_report(stats)
+
+def compute_fleet_statistics(df):
+    """
+    Compute per-meter statistics for a token history covering many meters.
+    
+    The data is sorted and grouped by meter once, and every statistic is
+    computed as a vectorized aggregate over that grouping, so the cost grows
+    linearly with the number of transactions rather than with meters x rows.
     
-    # Basic statistics
-    stats = {
-        'Total Transactions': len(df),
-        'Total Amount Spent': f"KSh {df['Amt'].sum():.2f}",
-        'Total Units Purchased': f"{df['Units'].sum():.2f}",
-        'Average Purchase Amount': f"KSh {df['Amt'].mean():.2f}",
-        'Average Units per Transaction': f"{df['Units'].mean():.2f}",
-        'Average Cost per Unit': f"KSh {(df['Amt'].sum() / df['Units'].sum()):.2f}",
-        'First Transaction Date': df['Datetime'].min().strftime('%Y-%m-%d'),
-        'Last Transaction Date': df['Datetime'].max().strftime('%Y-%m-%d')
-    }
-    
-    # Print summary statistics
-    print("\n===== Token Data Summary Statistics =====")
-    for key, value in stats.items():
-        print(f"{key}: {value}")
-      # Save summary statistics to a text file
-    with open(output_path, 'w') as f:
-        f.write("===== Token Data Summary Statistics =====\n")
-        for key, value in stats.items():
-            f.write(f"{key}: {value}\n")
-    
-    print(f"\nSaved summary statistics to: {os.path.abspath(output_path)}")
+    Args:
+        df (pd.DataFrame): The token data DataFrame (must contain a 'Mtr' column)
+        
+    Returns:
+        pd.DataFrame: One row per meter, indexed by meter number
+    """
+    df = df.sort_values(['Mtr', 'Datetime'], kind='mergesort')
+    grouped = df.groupby('Mtr', sort=False)
+    
+    stats = grouped.agg(
+        Transactions=('Amt', 'size'),
+        TotalAmt=('Amt', 'sum'),
+        TotalUnits=('Units', 'sum'),
+        AvgAmt=('Amt', 'mean'),
+        AvgUnits=('Units', 'mean'),
+        FirstPurchase=('Datetime', 'min'),
+        LastPurchase=('Datetime', 'max'),
+    )
+    stats['CostPerUnit'] = stats['TotalAmt'] / stats['TotalUnits'].replace(0, np.nan)
+    
+    # Purchase cadence: average number of days between consecutive purchases
+    gaps = grouped['Datetime'].diff().dt.total_seconds() / 86400.0
+    stats['AvgDaysBetweenPurchases'] = gaps.groupby(df['Mtr']).mean()
+    
+    return stats.sort_index()
+
+def flag_fleet_meters(stats, threshold=3.5):
+    """
+    Flag meters whose cost per unit is an outlier within the fleet.
+    
+    Uses a robust z-score (median and median absolute deviation) so that a few
+    extreme meters do not hide each other.
+    
+    Args:
+        stats (pd.DataFrame): Output of compute_fleet_statistics
+        threshold (float): Robust z-score above which a meter is flagged
+        
+    Returns:
+        pd.DataFrame: The statistics with an added boolean 'Flagged' column
+    """
+    stats = stats.copy()
+    cost = stats['CostPerUnit']
+    median = cost.median()
+    deviation = (cost - median).abs()
+    
+    # Scale by the MAD, falling back to the mean absolute deviation when more
+    # than half of the fleet shares the same cost per unit
+    scale = deviation.median() / 0.6745
+    if not scale or np.isnan(scale):
+        scale = deviation.mean() * 1.253314
+    
+    if not scale or np.isnan(scale):
+        stats['Flagged'] = False
+    else:
+        stats['Flagged'] = (deviation / scale > threshold).fillna(False)
+    
+    return stats
+
+def select_fleet_meters(stats, top_n=10, by='TotalAmt'):
+    """
+    Pick the meters worth charting: the top N by a statistic plus any flagged meters.
+    
+    Args:
+        stats (pd.DataFrame): Output of compute_fleet_statistics / flag_fleet_meters
+        top_n (int): Number of top meters to include
+        by (str): Column used to rank the meters
+        
+    Returns:
+        list: Meter numbers to render charts for
+    """
+    selected = list(stats[by].nlargest(top_n).index)
+    if 'Flagged' in stats.columns:
+        for meter in stats.index[stats['Flagged']]:
+            if meter not in selected:
+                selected.append(meter)
+    return selected
+
+def write_fleet_statistics(stats, output_path=None):
+    """
+    Write the per-meter statistics to a single CSV table.
+    
+    Args:
+        stats (pd.DataFrame): Output of compute_fleet_statistics / flag_fleet_meters
+        output_path (str): Destination CSV (defaults to resources/data/fleet_meter_statistics.csv)
+        
+    Returns:
+        str: The path the table was written to
+    """
+    if output_path is None:
+        base_dir = os.path.dirname(os.path.dirname(__file__))
+        output_path = os.path.join(base_dir, "resources", "data", "fleet_meter_statistics.csv")
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    
+    stats.to_csv(output_path, index_label='Mtr')
+    print(f"Saved fleet statistics to: {os.path.abspath(output_path)}")
+    return output_path
+
+def build_fleet_overview_figure(stats, meters, by='TotalAmt'):
+    """
+    Build a bar chart comparing the selected meters, highlighting flagged ones.
+    
+    Args:
+        stats (pd.DataFrame): Output of flag_fleet_meters
+        meters (list): Meter numbers to include (see select_fleet_meters)
+        by (str): Column to plot
+        
+    Returns:
+        Figure: The chart
+    """
+    subset = stats.loc[meters]
+    flagged = subset['Flagged'] if 'Flagged' in subset.columns else pd.Series(False, index=subset.index)
+    colors = ['#d62728' if flag else '#1f77b4' for flag in flagged]
+    
+    fig, ax = new_figure((12, 6))
+    ax.bar([str(meter) for meter in subset.index], subset[by], color=colors)
+    ax.set_title(f'Fleet Overview ({by})', fontsize=16)
+    ax.set_xlabel('Meter', fontsize=12)
+    ax.set_ylabel(by, fontsize=12)
+    ax.tick_params(axis='x', labelrotation=45)
+    ax.grid(True, alpha=0.3, axis='y')
+    fig.tight_layout()
+    return fig
+
+def build_meter_figure(meter, meter_df):
+    """
+    Build the purchase history chart for a single meter.
+    
+    Args:
+        meter: The meter number
+        meter_df (pd.DataFrame): That meter's rows, sorted by Datetime
+        
+    Returns:
+        Figure: The chart
+    """
+    fig, (ax_units, ax_amt) = new_figure((12, 8), 2, 1, sharex=True)
+    ax_units.plot(meter_df['Datetime'], meter_df['Units'], marker='o', linestyle='-', color='#1f77b4')
+    ax_units.set_title(f'Meter {meter} - Units Purchased', fontsize=14)
+    ax_units.set_ylabel('Units', fontsize=10)
+    ax_units.grid(True, alpha=0.3)
+    
+    ax_amt.bar(meter_df['Datetime'], meter_df['Amt'], width=0.8, color='#9467bd')
+    ax_amt.set_title(f'Meter {meter} - Amount Spent', fontsize=14)
+    ax_amt.set_xlabel('Date', fontsize=10)
+    ax_amt.set_ylabel('Amount (KSh)', fontsize=10)
+    ax_amt.grid(True, alpha=0.3, axis='y')
+    
+    fig.tight_layout()
+    return fig
+
+def iter_fleet_meter_frames(df, meters):
+    """
+    Yield the history of each selected meter, grouping only the selected rows.
+    
+    Args:
+        df (pd.DataFrame): The token data DataFrame
+        meters (list): Meter numbers to include
+        
+    Yields:
+        tuple: (meter, meter DataFrame sorted by Datetime)
+    """
+    subset = df[df['Mtr'].isin(meters)].sort_values('Datetime', kind='mergesort')
+    yield from subset.groupby('Mtr')
+
+def plot_fleet_overview(stats, meters, by='TotalAmt'):
+    """
+    Plot a bar chart comparing the selected meters, highlighting flagged ones.
+    
+    Args:
+        stats (pd.DataFrame): Output of flag_fleet_meters
+        meters (list): Meter numbers to include (see select_fleet_meters)
+        by (str): Column to plot
+        
+    Returns:
+        str: Path of the saved chart
+    """
+    return save_figure(build_fleet_overview_figure(stats, meters, by=by),
+                       _image_path(os.path.join("fleet", "fleet_overview.png")))
+
+def plot_fleet_meters(df, meters):
+    """
+    Plot the purchase history of each selected meter.
+    
+    Only the rows for the selected meters are grouped and rendered, so large
+    fleets produce one chart per interesting meter instead of one per meter.
+    
+    Args:
+        df (pd.DataFrame): The token data DataFrame
+        meters (list): Meter numbers to render (see select_fleet_meters)
+        
+    Returns:
+        list: Paths of the saved charts
+    """
+    output_paths = []
+    for meter, meter_df in iter_fleet_meter_frames(df, meters):
+        output_path = _image_path(os.path.join("fleet", f"meter_{meter}.png"))
+        build_meter_figure(meter, meter_df).savefig(output_path)
+        output_paths.append(output_path)
+    
+    output_dir = os.path.dirname(_image_path(os.path.join("fleet", "fleet_overview.png")))
+    print(f"Saved {len(output_paths)} meter chart(s) to: {os.path.abspath(output_dir)}")
+    return output_paths
+
+def fleet_chart_renderers(df, top_n=10, by='TotalAmt', threshold=3.5):
+    """
+    Prepare lazy renderers for a fleet report without drawing any chart.
+    
+    Each renderer builds and rasterises its figure only when called, so a
+    viewer can render just the charts that are actually on screen.
+    
+    Args:
+        df (pd.DataFrame): The token data DataFrame
+        top_n (int): Number of top meters to include
+        by (str): Column used to rank the meters
+        threshold (float): Robust z-score used to flag cost-per-unit outliers
+        
+    Returns:
+        list: (title, (width_px, height_px), render) tuples, where render(width)
+            returns a PIL image at that width (full size when width is None)
+    """
+    stats = flag_fleet_meters(compute_fleet_statistics(df), threshold=threshold)
+    meters = select_fleet_meters(stats, top_n=top_n, by=by)
+    if not meters:
+        return []
+    
+    dpi = rcParams['figure.dpi']
+    renderers = [(
+        f'Fleet Overview ({len(stats)} meters, {int(stats["Flagged"].sum())} flagged)',
+        (round(12 * dpi), round(6 * dpi)),
+        lambda width: render_figure(build_fleet_overview_figure(stats, meters, by=by), width=width),
+    )]
+    for meter, meter_df in iter_fleet_meter_frames(df, meters):
+        title = f'Meter {meter}' + (' (flagged)' if stats.loc[meter, 'Flagged'] else '')
+        renderers.append((
+            title,
+            (round(12 * dpi), round(8 * dpi)),
+            lambda width, meter=meter, meter_df=meter_df: render_figure(build_meter_figure(meter, meter_df), width=width),
+        ))
+    return renderers
+
+def run_fleet_analysis(df, top_n=10, by='TotalAmt', threshold=3.5):
+    """
+    Run the full fleet analysis: per-meter statistics, flagging, table and charts.
+    
+    Args:
+        df (pd.DataFrame): The token data DataFrame
+        top_n (int): Number of top meters to chart
+        by (str): Column used to rank the meters
+        threshold (float): Robust z-score used to flag cost-per-unit outliers
+        
+    Returns:
+        pd.DataFrame: The flagged per-meter statistics
+    """
+    stats = flag_fleet_meters(compute_fleet_statistics(df), threshold=threshold)
+    write_fleet_statistics(stats)
+    
+    meters = select_fleet_meters(stats, top_n=top_n, by=by)
+    print(f"\nFleet size: {len(stats)} meter(s), {int(stats['Flagged'].sum())} flagged")
+    print(f"Rendering charts for {len(meters)} meter(s)...")
+    
+    if meters:
+        plot_fleet_overview(stats, meters, by=by)
+        plot_fleet_meters(df, meters)
+    
+    return stats
 
 if __name__ == "__main__":
     try:
@@ -275,7 +665,8 @@ if __name__ == "__main__":
             import matplotlib
             import seaborn
             print("Required visualization libraries are installed.")
-        except ImportError:            print("\nOne or more required libraries are not installed.")
+        except ImportError:
+            print("\nOne or more required libraries are not installed.")
             print("Please install them using:")
             print("pip install matplotlib seaborn pandas numpy")
 
@@ -299,5 +690,19 @@ def main():
     except Exception as e:
         print(f"Error: {e}")
 
+def fleet_main():
+    """Main function to run the per-meter fleet analysis."""
+    try:
+        print("Loading token data...")
+        df = load_data()
+        
+        print("\nComputing fleet statistics...")
+        run_fleet_analysis(df)
+        
+        print("\nFleet analysis complete! Check resources/data and resources/images/fleet.")
+        
+    except Exception as e:
+        print(f"Error: {e}")
+
 if __name__ == "__main__":
     main()
@@ -7,35 +7,487 @@ import sys
 import tkinter as tk
 from tkinter import ttk, messagebox, scrolledtext, filedialog
 import threading
-import subprocess
+import importlib
 import io
-from contextlib import redirect_stdout
-from PIL import Image, ImageTk
+import bisect
+import queue
+from collections import OrderedDict
+from contextlib import contextmanager
+from src.job_scheduler import JobScheduler, SchedulerBusy, current_job
 import time
-import importlib
 from typing import Dict, Any, Optional, List, Tuple, Union
-import matplotlib
-matplotlib.use('Agg')  # Use Agg backend for matplotlib
+
+# Use the Agg backend for matplotlib without importing it at startup;
+# PIL, pandas, matplotlib and seaborn are imported when first needed
+os.environ.setdefault("MPLBACKEND", "Agg")
+
+# Heavy modules loaded in the background once the window is on screen
+WARMUP_MODULES = (
+    "PIL.Image",
+    "PIL.ImageTk",
+    "numpy",
+    "pandas",
+    "matplotlib.figure",
+    "matplotlib.backends.backend_agg",
+    "seaborn",
+    "src.Token",
+    "src.DKGA02",
+    "src.TokenDecrypter",
+    "src.data_cleaning",
+    "src.TokenVisualizer",
+)
 
 class RedirectText:
-    """Redirect stdout to a tkinter Text widget"""
-    def __init__(self, text_widget):
+    """
+    Buffered stdout-like sink for a tkinter Text widget.
+
+    write() may be called from any thread and only appends to a pending list.
+    flush_pending(), run from the Tk main loop at a fixed frame rate, inserts
+    everything collected since the last frame in a single widget update and
+    trims the widget to a bounded scrollback, so bulk output never floods the
+    event loop or grows memory without limit.
+    """
+    def __init__(self, text_widget, max_lines=5000, max_pending_chars=1000000):
         self.text_widget = text_widget
-        self.buffer = ""
+        self.max_lines = max_lines
+        self.max_pending_chars = max_pending_chars
+        self.pending = []
+        self.pending_chars = 0
+        self.lock = threading.Lock()
 
     def write(self, string):
-        self.buffer += string
+        if not string:
+            return 0
+        with self.lock:
+            self.pending.append(string)
+            self.pending_chars += len(string)
+            if self.pending_chars > self.max_pending_chars:
+                # Keep only the tail that could still be visible after trimming
+                text = "".join(self.pending)[-self.max_pending_chars // 2:]
+                self.pending = [text]
+                self.pending_chars = len(text)
+        return len(string)
+
+    def flush(self):
+        pass
+
+    def clear(self):
+        """Drop pending output and empty the widget (Tk thread only)"""
+        with self.lock:
+            self.pending = []
+            self.pending_chars = 0
         self.text_widget.configure(state="normal")
-        self.text_widget.insert(tk.END, string)
-        self.text_widget.see(tk.END)  # Auto-scroll to the end
+        self.text_widget.delete(1.0, tk.END)
         self.text_widget.configure(state="disabled")
 
+    def flush_pending(self):
+        """Insert all pending output in one update (Tk thread only)"""
+        with self.lock:
+            if not self.pending:
+                return False
+            text = "".join(self.pending)
+            self.pending = []
+            self.pending_chars = 0
+
+        # Never insert more lines than the scrollback can hold
+        if text.count("\n") > self.max_lines:
+            text = "\n".join(text.split("\n")[-self.max_lines - 1:])
+
+        widget = self.text_widget
+        widget.configure(state="normal")
+        widget.insert(tk.END, text)
+        line_count = int(widget.index("end-1c").split(".")[0])
+        if line_count > self.max_lines:
+            widget.delete("1.0", f"{line_count - self.max_lines + 1}.0")
+        widget.see(tk.END)  # Auto-scroll to the end
+        widget.configure(state="disabled")
+        return True
+
+class ThreadLocalOutput:
+    """
+    A sys.stdout replacement that routes writes per thread.
+
+    Threads that have entered capture_output() write into their own buffer;
+    every other thread writes to the original stream. It is installed once,
+    so concurrent actions never swap the global sys.stdout under each other.
+    """
+    _install_lock = threading.Lock()
+
+    def __init__(self, fallback):
+        self.fallback = fallback
+        self.local = threading.local()
+
+    @classmethod
+    def install(cls):
+        """Install the router as sys.stdout (idempotent) and return it"""
+        with cls._install_lock:
+            if not isinstance(sys.stdout, cls):
+                sys.stdout = cls(sys.stdout)
+            return sys.stdout
+
+    def _target(self):
+        return getattr(self.local, "target", None) or self.fallback
+
+    def write(self, string):
+        return self._target().write(string)
+
     def flush(self):
-        pass
+        target = self._target()
+        if target is not None:
+            target.flush()
+
+    def __getattr__(self, name):
+        return getattr(self.fallback, name)
+
+@contextmanager
+def capture_output(target):
+    """Capture print() output of the current thread only into target"""
+    router = ThreadLocalOutput.install()
+    previous = getattr(router.local, "target", None)
+    router.local.target = target
+    try:
+        yield target
+    finally:
+        router.local.target = previous
+
+class ImageSource:
+    """An image shown in a LazyImagePanel, decoded only when needed"""
+    def __init__(self, title, size, loader):
+        """
+        Args:
+            title (str): Caption shown above the image
+            size (tuple): Natural (width, height) in pixels
+            loader (callable): loader(width) returns a PIL image at that width,
+                or at full resolution when width is None
+        """
+        self.title = title
+        self.size = size
+        self.loader = loader
+
+    def load(self, width=None):
+        """Decode the image, scaled down to width if it is wider"""
+        return self.loader(width)
+
+    @classmethod
+    def from_path(cls, path, title=None):
+        """Create a source for an image file, reading only its header up front"""
+        from PIL import Image
+        
+        if title is None:
+            title = os.path.basename(path).replace('_', ' ').replace('.png', '').title()
+        with Image.open(path) as img:
+            size = img.size
+
+        def loader(width):
+            img = Image.open(path)
+            if width and img.width > width:
+                # thumbnail() lets the decoder reduce the image before resampling
+                img.thumbnail((width, round(img.height * width / img.width)), Image.LANCZOS)
+            else:
+                img.load()
+            return img
+
+        return cls(title, size, loader)
+
+    @classmethod
+    def from_image(cls, title, pil_img):
+        """Create a source for an image that is already in memory"""
+        from PIL import Image
+        
+        def loader(width):
+            if width and pil_img.width > width:
+                return pil_img.resize((width, round(pil_img.height * width / pil_img.width)), Image.LANCZOS)
+            return pil_img
+
+        return cls(title, pil_img.size, loader)
+
+def visible_range(tops, top, bottom):
+    """
+    Find the items that overlap a vertical span.
+
+    Args:
+        tops (list): Sorted y offset of each item
+        top (float): Top of the span
+        bottom (float): Bottom of the span
+
+    Returns:
+        tuple: [start, stop) indices of the overlapping items
+    """
+    start = max(0, bisect.bisect_right(tops, top) - 1)
+    stop = bisect.bisect_right(tops, bottom)
+    return start, stop
+
+class LazyImagePanel:
+    """
+    Virtualized, scrollable list of images.
+
+    Only the items inside (or just outside) the viewport have canvas items.
+    Thumbnails are decoded on a background thread, turned into PhotoImages on
+    the Tk thread and kept in a bounded LRU cache; clicking a thumbnail opens
+    it at full resolution.
+    """
+    TITLE_HEIGHT = 30
+    GAP = 20
+    MARGIN = 10
+
+    def __init__(self, parent, max_width=800, cache_size=16, overscan=400):
+        self.max_width = max_width
+        self.cache_size = cache_size
+        self.overscan = overscan
+
+        self.canvas = tk.Canvas(parent, bg="white", highlightthickness=0)
+        self.canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar = ttk.Scrollbar(parent, orient="vertical", command=self._on_scrollbar)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.canvas.configure(yscrollcommand=scrollbar.set)
+
+        self.canvas.bind("<Configure>", self._on_configure)
+        self.canvas.bind("<Enter>", self._bind_mousewheel)
+        self.canvas.bind("<Leave>", self._unbind_mousewheel)
+
+        self.sources = []
+        self.tops = []          # y offset of each item, for bisecting the viewport
+        self.heights = []       # thumbnail height of each item
+        self.thumb_width = max_width
+        self.drawn = {}         # index -> canvas item ids
+        self.cache = OrderedDict()  # (index, width) -> PhotoImage
+        self.failed = {}        # (index, width) -> decode error message
+        self.pending = set()
+        self.generation = 0
+        self._refresh_job = None
+        self._poll_job = None
+        self._last_width = None
+
+        self.requests = queue.Queue()
+        self.results = queue.Queue()
+        threading.Thread(target=self._decode_worker, daemon=True).start()
+
+    def set_sources(self, sources):
+        """Replace the panel contents with a list of ImageSource objects"""
+        self.clear()
+        self.sources = list(sources)
+        self._layout()
+
+    def clear(self):
+        """Remove all items and drop every cached image"""
+        self.generation += 1
+        self.canvas.delete("all")
+        self.sources = []
+        self.tops = []
+        self.heights = []
+        self.drawn = {}
+        self.cache.clear()
+        self.failed.clear()
+        self.pending.clear()
+        self.canvas.configure(scrollregion=(0, 0, 0, 0))
+        self.canvas.yview_moveto(0)
+
+    def _layout(self):
+        """Compute item positions from the natural sizes without decoding anything"""
+        self.tops = []
+        self.heights = []
+        y = self.MARGIN
+        for source in self.sources:
+            width, height = source.size
+            scale = min(1.0, self.thumb_width / width) if width else 1.0
+            self.tops.append(y)
+            self.heights.append(max(1, round(height * scale)))
+            y += self.TITLE_HEIGHT + self.heights[-1] + self.GAP
+
+        self.canvas.configure(scrollregion=(0, 0, self.thumb_width + 2 * self.MARGIN, y))
+        self.refresh()
+
+    def _visible_range(self):
+        """Return the [start, stop) indices of items overlapping the viewport"""
+        top = self.canvas.canvasy(0) - self.overscan
+        bottom = self.canvas.canvasy(self.canvas.winfo_height()) + self.overscan
+        return visible_range(self.tops, top, bottom)
+
+    def refresh(self):
+        """Create canvas items for items in view and delete the rest"""
+        self._refresh_job = None
+        start, stop = self._visible_range()
+        visible = set(range(start, stop))
+
+        for index in list(self.drawn):
+            if index not in visible:
+                for item in self.drawn.pop(index):
+                    self.canvas.delete(item)
+
+        for index in range(start, stop):
+            if index not in self.drawn:
+                self._draw_item(index)
+
+    def _draw_item(self, index):
+        source = self.sources[index]
+        x = self.MARGIN
+        y = self.tops[index]
+        height = self.heights[index]
+        width = min(self.thumb_width, source.size[0])
+        tag = f"item{index}"
+
+        items = [self.canvas.create_text(x + self.thumb_width // 2, y + self.TITLE_HEIGHT // 2,
+                                         text=source.title, font=('Arial', 14, 'bold'))]
+        photo = self.cache.get((index, self.thumb_width))
+        if photo is not None:
+            self.cache.move_to_end((index, self.thumb_width))
+            items.append(self.canvas.create_image(x, y + self.TITLE_HEIGHT, image=photo, anchor="nw", tags=tag))
+        elif (index, self.thumb_width) in self.failed:
+            items.append(self._create_error(index, self.failed[(index, self.thumb_width)]))
+        else:
+            items.append(self.canvas.create_rectangle(x, y + self.TITLE_HEIGHT, x + width,
+                                                      y + self.TITLE_HEIGHT + height,
+                                                      outline="#dddddd", fill="#f5f5f5", tags=tag))
+            self._request(index)
+
+        self.canvas.tag_bind(tag, "<Button-1>", lambda e, i=index: self.open_full_resolution(i))
+        self.drawn[index] = items
+
+    def _request(self, index):
+        key = (index, self.thumb_width)
+        if key in self.pending:
+            return
+        self.pending.add(key)
+        self.requests.put((self.generation, index, self.thumb_width, self.sources[index]))
+        if self._poll_job is None:
+            self._poll_job = self.canvas.after(30, self._poll_results)
+
+    def _decode_worker(self):
+        """Decode thumbnails off the Tk thread"""
+        while True:
+            generation, index, width, source = self.requests.get()
+            if generation != self.generation:
+                continue
+            try:
+                image = source.load(width)
+            except Exception as e:
+                image = e
+            self.results.put((generation, index, width, image))
+
+    def _poll_results(self):
+        """Turn decoded thumbnails into PhotoImages on the Tk thread"""
+        from PIL import ImageTk
+        
+        self._poll_job = None
+        while True:
+            try:
+                generation, index, width, image = self.results.get_nowait()
+            except queue.Empty:
+                break
+            self.pending.discard((index, width))
+            if generation != self.generation or width != self.thumb_width:
+                continue
+
+            if isinstance(image, Exception):
+                # Remember the failure so scrolling back does not retry the decode
+                self.failed[(index, width)] = f"Could not render image: {image}"
+            else:
+                photo = ImageTk.PhotoImage(image)
+                self._cache_put((index, width), photo)
+
+            # Swap the placeholder for the image (or the error) if the item is still in view
+            if index in self.drawn:
+                placeholder = self.drawn[index][1]
+                self.canvas.delete(placeholder)
+                if isinstance(image, Exception):
+                    self.drawn[index][1] = self._create_error(index, self.failed[(index, width)])
+                else:
+                    self.drawn[index][1] = self.canvas.create_image(
+                        self.MARGIN, self.tops[index] + self.TITLE_HEIGHT,
+                        image=photo, anchor="nw", tags=f"item{index}")
+
+        if self.pending:
+            self._poll_job = self.canvas.after(30, self._poll_results)
+
+    def _create_error(self, index, message):
+        """Draw an error caption in the item's image area"""
+        return self.canvas.create_text(self.MARGIN + self.thumb_width // 2,
+                                       self.tops[index] + self.TITLE_HEIGHT + self.heights[index] // 2,
+                                       text=message, fill="#c0392b", width=self.thumb_width - 20,
+                                       font=('Arial', 11))
+
+    def _cache_put(self, key, photo):
+        """Insert into the LRU, never evicting an image that is on screen"""
+        self.cache[key] = photo
+        self.cache.move_to_end(key)
+        if len(self.cache) <= self.cache_size:
+            return
+        for old_key in list(self.cache):
+            if len(self.cache) <= self.cache_size:
+                break
+            if old_key[0] not in self.drawn:
+                del self.cache[old_key]
+
+    def open_full_resolution(self, index):
+        """Open an item at full resolution in its own window"""
+        from PIL import ImageTk
+        
+        source = self.sources[index]
+        window = tk.Toplevel(self.canvas)
+        window.title(source.title)
+
+        canvas = tk.Canvas(window, bg="white", highlightthickness=0)
+        y_scroll = ttk.Scrollbar(window, orient="vertical", command=canvas.yview)
+        x_scroll = ttk.Scrollbar(window, orient="horizontal", command=canvas.xview)
+        canvas.configure(yscrollcommand=y_scroll.set, xscrollcommand=x_scroll.set)
+        y_scroll.pack(side=tk.RIGHT, fill=tk.Y)
+        x_scroll.pack(side=tk.BOTTOM, fill=tk.X)
+        canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+        photo = ImageTk.PhotoImage(source.load())
+        canvas.image = photo  # Keep a reference to prevent garbage collection
+        canvas.create_image(0, 0, image=photo, anchor="nw")
+        canvas.configure(scrollregion=(0, 0, photo.width(), photo.height()))
+        window.geometry(f"{min(photo.width(), 1200)}x{min(photo.height(), 800)}")
+
+    def _schedule_refresh(self):
+        if self._refresh_job is None:
+            self._refresh_job = self.canvas.after_idle(self.refresh)
+
+    def _on_scrollbar(self, *args):
+        self.canvas.yview(*args)
+        self._schedule_refresh()
+
+    def _on_configure(self, event):
+        width = max(100, min(self.max_width, event.width - 2 * self.MARGIN))
+        if width != self._last_width:
+            self._last_width = width
+            if width != self.thumb_width:
+                # Thumbnails are cached per width, so stale sizes simply age out
+                self.thumb_width = width
+                for index in list(self.drawn):
+                    for item in self.drawn.pop(index):
+                        self.canvas.delete(item)
+                self._layout()
+                return
+        self._schedule_refresh()
+
+    def _on_mousewheel(self, event):
+        if event.num == 4:
+            delta = -1
+        elif event.num == 5:
+            delta = 1
+        else:
+            delta = -1 if event.delta > 0 else 1
+        self.canvas.yview_scroll(delta * 3, "units")
+        self._schedule_refresh()
+
+    def _bind_mousewheel(self, event):
+        self.canvas.bind_all("<MouseWheel>", self._on_mousewheel)
+        self.canvas.bind_all("<Button-4>", self._on_mousewheel)
+        self.canvas.bind_all("<Button-5>", self._on_mousewheel)
+
+    def _unbind_mousewheel(self, event):
+        self.canvas.unbind_all("<MouseWheel>")
+        self.canvas.unbind_all("<Button-4>")
+        self.canvas.unbind_all("<Button-5>")
 
 class UtilityTokenApp:
     """Main application class for the Utility Token GUI"""
     
+    # Output areas are refreshed at about 30 frames per second
+    OUTPUT_FRAME_MS = 33
+    
     def __init__(self, root):
         self.root = root
         self.root.title("Utility Token Generator")
@@ -88,15 +540,26 @@ class UtilityTokenApp:
         # Store form inputs
         self.input_vars = {}
         
-        # Store visualization images
-        self.current_images = []
-        
         # Store current view (for swapping content)
         self.current_content_frame = None
         self.content_frames = {}
         
+        # Background jobs: a small bounded pool whose callbacks run on the Tk loop
+        self.scheduler = JobScheduler(max_workers=2, max_pending=6)
+        self.scheduler.add_listener(self.on_jobs_changed)
+        self.scheduler.attach(self.root)
+        self.showing_running_status = False
+        self.root.bind("<Destroy>", self.on_destroy, add="+")
+        
+        # Buffered output areas, flushed together at a fixed frame rate
+        self.output_sinks = []
+        
         # Create the main layout
         self.create_widgets()
+        self.root.after(self.OUTPUT_FRAME_MS, self.flush_output)
+        
+        # Load the heavy libraries in the background after the window shows
+        self.root.after(200, self.start_warmup)
         
     def create_widgets(self):
         """Create and arrange all the widgets"""
@@ -127,6 +590,7 @@ class UtilityTokenApp:
             ("Generate Token", self.show_token_generator),
             ("Generate Decoder Key", self.show_decoder_key_generator),
             ("Decrypt Token", self.show_token_decrypter),
+            ("Batch Vending", self.show_batch_vending),
             ("Process Raw Data", self.show_data_cleaning),
             ("Run Tests", self.show_tests)
         ])
@@ -158,12 +622,23 @@ class UtilityTokenApp:
         # Status bar
         self.status_var = tk.StringVar()
         self.status_var.set("Ready")
-        status_bar = ttk.Label(main_frame, 
+        status_frame = ttk.Frame(main_frame)
+        status_frame.pack(fill=tk.X, side=tk.BOTTOM, pady=(10, 0))
+        
+        # Cancels every queued and running background job
+        self.cancel_button = ttk.Button(status_frame, 
+                                      text="Cancel", 
+                                      command=self.cancel_jobs,
+                                      style="TButton",
+                                      state="disabled")
+        self.cancel_button.pack(side=tk.RIGHT, padx=(10, 0))
+        
+        status_bar = ttk.Label(status_frame, 
                              textvariable=self.status_var, 
                              relief=tk.SUNKEN, 
                              anchor=tk.W,
                              style="Status.TLabel")
-        status_bar.pack(fill=tk.X, side=tk.BOTTOM, pady=(10, 0))
+        status_bar.pack(fill=tk.X, side=tk.LEFT, expand=True)
         
     def create_sidebar_section(self, title, buttons):
         """Create a section in the sidebar with a title and buttons"""
@@ -235,10 +710,26 @@ class UtilityTokenApp:
         # Token Decrypter frame
         decrypt_frame = self.create_form_frame("token_decrypter", "Decrypt Token")
         self.add_form_field(decrypt_frame, "decrypt_meter_number", "Meter Number:", "37194275246")
-        self.add_form_field(decrypt_frame, "token", "Token:", "1865-3776-4842-2132-9404")
+        self.add_form_field(decrypt_frame, "token", "Token:")
         self.add_submit_button(decrypt_frame, "Decrypt Token", self.run_token_decrypter)
         self.add_output_area(decrypt_frame)
         
+        # Batch Vending frame
+        base_dir = os.path.dirname(os.path.dirname(__file__))
+        batch_frame = self.create_form_frame("batch_vending", "Batch Vending")
+        self.add_file_field(batch_frame, "batch_input", "Input CSV:",
+                            os.path.join(base_dir, "resources", "data", "vend_requests.csv"))
+        self.add_file_field(batch_frame, "batch_output", "Output CSV:",
+                            os.path.join(base_dir, "resources", "data", "vended_tokens.csv"), save=True)
+        self.add_form_field(batch_frame, "batch_chunk_size", "Chunk Size:", "1000")
+        self.add_submit_button(batch_frame, "Generate Tokens", self.run_batch_vending)
+        
+        self.batch_progress = ttk.Progressbar(batch_frame, orient="horizontal", mode="determinate", maximum=1.0)
+        self.batch_progress.pack(fill=tk.X, pady=(0, 5))
+        self.batch_rate_var = tk.StringVar(value="Load a CSV of meter_number,amount rows")
+        ttk.Label(batch_frame, textvariable=self.batch_rate_var).pack(anchor=tk.W)
+        self.add_output_area(batch_frame)
+        
         # Data Cleaning frame
         clean_frame = self.create_form_frame("data_cleaning", "Process Raw Data")
         self.add_submit_button(clean_frame, "Process Raw Token Data", self.run_data_cleaning)
@@ -261,7 +752,8 @@ class UtilityTokenApp:
             ("Amount Distribution", "amount_distribution"),
             ("Units per Amount", "units_per_amount"),
             ("Monthly Spending", "monthly_spending"),
-            ("Dashboard", "dashboard")
+            ("Dashboard", "dashboard"),
+            ("Fleet Report", "fleet")
         ]
         
         option_menu = ttk.OptionMenu(viz_options_frame, self.viz_option, options[0][0], *[o[0] for o in options])
@@ -274,20 +766,8 @@ class UtilityTokenApp:
         viz_display_frame = ttk.Frame(viz_frame)
         viz_display_frame.pack(fill=tk.BOTH, expand=True, pady=10)
         
-        # Canvas for displaying visualizations
-        viz_canvas = tk.Canvas(viz_display_frame, bg="white", highlightthickness=0)
-        viz_canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        
-        # Add scrollbar
-        viz_scrollbar = ttk.Scrollbar(viz_display_frame, orient="vertical", command=viz_canvas.yview)
-        viz_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        
-        viz_canvas.configure(yscrollcommand=viz_scrollbar.set)
-        viz_canvas.bind("<Configure>", lambda e: viz_canvas.configure(scrollregion=viz_canvas.bbox("all")))
-        
-        # Create frame inside canvas for images
-        self.viz_images_frame = ttk.Frame(viz_canvas)
-        viz_canvas.create_window((0, 0), window=self.viz_images_frame, anchor="nw")
+        # Virtualized panel: only the charts in view are decoded and drawn
+        self.image_panel = LazyImagePanel(viz_display_frame)
         
         # Test frame
         test_frame = self.create_form_frame("test", "Run Component Tests")
@@ -320,6 +800,22 @@ class UtilityTokenApp:
         
         return field_frame
     
+    def add_file_field(self, parent, var_name, label_text, default="", save=False):
+        """Add a form field with a Browse button for picking a file"""
+        field_frame = self.add_form_field(parent, var_name, label_text, default)
+        var = self.input_vars[var_name]
+        
+        def browse():
+            dialog = filedialog.asksaveasfilename if save else filedialog.askopenfilename
+            path = dialog(filetypes=[("CSV files", "*.csv"), ("All files", "*.*")],
+                          initialfile=os.path.basename(var.get()),
+                          initialdir=os.path.dirname(var.get()) or None)
+            if path:
+                var.set(path)
+        
+        ttk.Button(field_frame, text="Browse...", command=browse).pack(side=tk.LEFT, padx=(10, 0))
+        return field_frame
+    
     def add_submit_button(self, parent, text, command):
         """Add a submit button to a form"""
         button_frame = ttk.Frame(parent)
@@ -348,6 +844,10 @@ class UtilityTokenApp:
         # Store reference to the output text widget in the parent frame
         parent.output_text = output_text
         
+        # Writes are buffered and flushed to the widget at a fixed frame rate
+        parent.output_sink = RedirectText(output_text)
+        self.output_sinks.append(parent.output_sink)
+        
         return output_text
     
     def show_content_frame(self, name):
@@ -381,6 +881,10 @@ class UtilityTokenApp:
         """Show the token decrypter form"""
         self.show_content_frame("token_decrypter")
     
+    def show_batch_vending(self):
+        """Show the batch vending form"""
+        self.show_content_frame("batch_vending")
+    
     def show_data_cleaning(self):
         """Show the data cleaning form"""
         self.show_content_frame("data_cleaning")
@@ -394,143 +898,157 @@ class UtilityTokenApp:
         """Show the test form"""
         self.show_content_frame("test")
     
-    def clear_output(self):
-        """Clear the output text area of the current frame"""
-        if self.current_content_frame and hasattr(self.current_content_frame, 'output_text'):
-            output_text = self.current_content_frame.output_text
-            output_text.configure(state="normal")
-            output_text.delete(1.0, tk.END)
-            output_text.configure(state="disabled")
-    
-    def display_output(self, text):
-        """Display text in the output area of the current frame"""
-        if self.current_content_frame and hasattr(self.current_content_frame, 'output_text'):
-            output_text = self.current_content_frame.output_text
-            output_text.configure(state="normal")
-            output_text.insert(tk.END, text)
-            output_text.see(tk.END)  # Auto-scroll to the end
-            output_text.configure(state="disabled")
+    def clear_output(self, frame=None):
+        """Clear the output text area of the given (default: current) frame"""
+        frame = frame or self.current_content_frame
+        if frame and hasattr(frame, 'output_sink'):
+            frame.output_sink.clear()
+    
+    def display_output(self, text, frame=None):
+        """Queue text for the output area of the given (default: current) frame"""
+        frame = frame or self.current_content_frame
+        if frame and hasattr(frame, 'output_sink'):
+            frame.output_sink.write(text)
+    
+    def flush_output(self):
+        """Flush buffered output to the Text widgets once per frame"""
+        for sink in self.output_sinks:
+            sink.flush_pending()
+        self.root.after(self.OUTPUT_FRAME_MS, self.flush_output)
     
     def clear_visualizations(self):
         """Clear all visualizations from the visualization frame"""
-        for widget in self.viz_images_frame.winfo_children():
-            widget.destroy()
-        
-        # Clear image references to prevent memory leaks
-        self.current_images = []
+        # Drops the canvas items and the cached PhotoImages
+        self.image_panel.clear()
+        
+    def run_task(self, description, func, *args, on_success=None, on_progress=None):
+        """
+        Call a typed API function as a background job and show its output.
+        
+        print() output of the call is captured for the worker thread only and
+        streamed into the output area of the frame that started the task,
+        followed by the returned text (if any). Clicking again while the same task is
+        queued or running does not start another one.
+        
+        Args:
+            description (str): Job name, shown in the status bar
+            func (callable): The function to call
+            *args: Arguments for func
+            on_success (callable): Called on the Tk thread with func's result
+            on_progress (callable): on_progress(job, fraction, message) on the Tk thread
+        """
+        if self.scheduler.find(description):
+            self.update_status(f"Already running: {description}")
+            return
         
-    def run_script_with_input(self, module_name, function_name=None, inputs=None):
-        """Run a Python module with specified inputs and capture its output"""
-        self.clear_output()
-        self.update_status(f"Running {module_name}...")
+        frame = self.current_content_frame
+        sink = getattr(frame, 'output_sink', None)
+        self.clear_output(frame)
         
-        # Create a buffer to capture output
-        output_buffer = io.StringIO()
-        old_stdout = sys.stdout
-        old_stdin = sys.stdin
+        def call():
+            # Output streams into the frame's buffered sink while the job runs
+            with capture_output(sink or io.StringIO()):
+                return func(*args)
         
         try:
-            # Import the module dynamically
-            if module_name.endswith(".py"):
-                module_name = module_name[:-3]  # Remove .py extension
-            
-            # Prefix with src. for proper import
-            if not module_name.startswith("src."):
-                module_name = f"src.{module_name}"
-                
-            if inputs:
-                # Replace stdin with a StringIO object containing the inputs
-                input_str = "\n".join(str(inp) for inp in inputs)
-                sys.stdin = io.StringIO(input_str)
-            
-            # Redirect stdout to our buffer
-            sys.stdout = output_buffer
-            
-            # Import or reload the module
-            if module_name in sys.modules:
-                module = importlib.reload(sys.modules[module_name])
-            else:
-                module = importlib.import_module(module_name)
-            
-            # If a specific function is provided, call it
-            if function_name:
-                func = getattr(module, function_name)
-                result = func(*inputs) if inputs else func()
-                return result
-            
-            # Run the script and capture output
-            output = output_buffer.getvalue()
-            self.display_output(output)
-            
-            self.update_status(f"Completed {module_name}")
-            return output
-            
-        except Exception as e:
-            error_msg = f"Error running {module_name}: {str(e)}"
-            self.display_output(error_msg)
-            self.update_status(f"Error running {module_name}")
-            return None
-        finally:
-            sys.stdout = old_stdout
-            sys.stdin = old_stdin
-    
-    def run_in_thread(self, func, *args, **kwargs):
-        """Run a function in a separate thread"""
-        thread = threading.Thread(target=func, args=args, kwargs=kwargs)
-        thread.daemon = True
-        thread.start()
-        return thread
-    
-    def display_images(self, image_paths):
-        """Display images in the visualization frame"""
-        # Clear existing images
-        self.clear_visualizations()
+            self.scheduler.submit(
+                description, call,
+                on_done=lambda job: self._finish_task(job, frame, on_success),
+                on_error=lambda job: self._finish_task(job, frame, None),
+                on_progress=on_progress or self.on_job_progress,
+            )
+        except SchedulerBusy:
+            self.update_status("Busy - too many tasks queued, please wait")
+    
+    def _finish_task(self, job, frame, on_success):
+        """Show the outcome of a background job (runs on the Tk thread)"""
+        if isinstance(job.result, str):
+            self.display_output(job.result, frame)
+        if job.error is not None:
+            self.display_output(f"Error: {job.error}\n", frame)
+        
+        self.showing_running_status = False
+        if job.error is not None:
+            self.update_status(f"Error: {job.name} ({job.error})")
+            return
         
-        for i, img_path in enumerate(image_paths):
+        self.update_status(f"Completed: {job.name} in {job.elapsed:.2f}s")
+        if on_success:
+            on_success(job.result)
+    
+    def on_job_progress(self, job, fraction, message):
+        """Show job progress in the status bar (runs on the Tk thread)"""
+        parts = [job.name]
+        if fraction is not None:
+            parts.append(f"{fraction:.0%}")
+        if message:
+            parts.append(message)
+        parts.append(f"{job.elapsed:.1f}s")
+        self.showing_running_status = True
+        self.update_status(" - ".join(parts))
+    
+    def on_jobs_changed(self, scheduler):
+        """Reflect queued/running jobs in the status bar (runs on the Tk thread)"""
+        jobs = scheduler.active_jobs
+        self.cancel_button.configure(state="normal" if jobs else "disabled")
+        
+        running = [job for job in jobs if job.state == "running"]
+        queued = len(jobs) - len(running)
+        if running:
+            text = "Running: " + ", ".join(job.name for job in running)
+            if queued:
+                text += f" ({queued} queued)"
+            self.showing_running_status = True
+            self.update_status(text)
+        elif not jobs and self.showing_running_status:
+            self.showing_running_status = False
+            self.update_status("Ready")
+    
+    def cancel_jobs(self):
+        """Cancel all queued and running background jobs"""
+        self.scheduler.cancel_all()
+        self.update_status("Cancelling...")
+        self.showing_running_status = True
+    
+    def start_warmup(self):
+        """Import heavy modules on a background thread so first use is fast"""
+        def warmup():
+            for module_name in WARMUP_MODULES:
+                try:
+                    importlib.import_module(module_name)
+                except Exception:
+                    pass  # The feature will report the error when it is used
+        
+        threading.Thread(target=warmup, name="warmup", daemon=True).start()
+    
+    def on_destroy(self, event):
+        """Stop background jobs when the main window goes away"""
+        if event.widget is self.root:
+            self.scheduler.shutdown()
+    
+    def display_images(self, images):
+        """
+        Display images in the virtualized visualization panel.
+        
+        Args:
+            images (list): Image file paths, (title, PIL image) tuples rendered
+                in memory by TokenVisualizer.render_charts, or ImageSource objects
+        """
+        sources = []
+        for image in images:
             try:
-                # Skip if image doesn't exist
-                if not os.path.exists(img_path):
-                    self.display_output(f"Warning: Image not found: {img_path}\n")
-                    continue
-                    
-                # Create a frame for this image
-                img_frame = ttk.Frame(self.viz_images_frame, padding=10)
-                img_frame.pack(fill=tk.X, pady=10)
-                
-                # Extract image name from path for the title
-                img_name = os.path.basename(img_path).replace('_', ' ').replace('.png', '').title()
-                
-                # Add image title
-                title_label = ttk.Label(img_frame, text=img_name, style="SubHeader.TLabel")
-                title_label.pack(pady=(0, 10))
-                
-                # Load and display the image
-                pil_img = Image.open(img_path)
-                
-                # Resize if too large while maintaining aspect ratio
-                max_width = 800
-                if pil_img.width > max_width:
-                    ratio = max_width / pil_img.width
-                    new_width = max_width
-                    new_height = int(pil_img.height * ratio)
-                    pil_img = pil_img.resize((new_width, new_height), Image.LANCZOS)
-                
-                tk_img = ImageTk.PhotoImage(pil_img)
-                
-                # Keep a reference to prevent garbage collection
-                self.current_images.append(tk_img)
-                
-                # Create and pack the image label
-                img_label = ttk.Label(img_frame, image=tk_img)
-                img_label.pack()
-                
-                # Add separator except for the last image
-                if i < len(image_paths) - 1:
-                    separator = ttk.Separator(self.viz_images_frame, orient="horizontal")
-                    separator.pack(fill=tk.X, pady=10)
-                    
+                if isinstance(image, ImageSource):
+                    sources.append(image)
+                elif isinstance(image, tuple):
+                    sources.append(ImageSource.from_image(*image))
+                elif not os.path.exists(image):
+                    self.display_output(f"Warning: Image not found: {image}\n")
+                else:
+                    sources.append(ImageSource.from_path(image))
             except Exception as e:
-                self.display_output(f"Error loading image {img_path}: {str(e)}\n")
+                self.display_output(f"Error loading image {image}: {str(e)}\n")
+        
+        self.image_panel.set_sources(sources)
     
     # Button command handlers
     def run_token_generator(self):
@@ -542,8 +1060,11 @@ class UtilityTokenApp:
             messagebox.showerror("Input Error", "Please provide both meter number and amount")
             return
         
-        self.update_status("Generating token...")
-        self.run_in_thread(self.run_script_with_input, "Token", None, [meter_number, amount])
+        def generate():
+            from src.Token import generate_token
+            return f"Generated Token: {generate_token(meter_number, float(amount))}\n"
+        
+        self.run_task("Generating token", generate)
     
     def run_decoder_key_generator(self):
         """Generate a decoder key using user input"""
@@ -557,9 +1078,12 @@ class UtilityTokenApp:
             messagebox.showerror("Input Error", "Please provide all required fields")
             return
         
-        self.update_status("Generating decoder key...")
-        self.run_in_thread(self.run_script_with_input, "DKGA02", None, 
-                           [key_type, supply_group, tariff_index, key_revision, decoder_reference])
+        def generate():
+            from src.DKGA02 import derive_decoder_key
+            key_hex = derive_decoder_key(key_type, supply_group, tariff_index, key_revision, decoder_reference)
+            return f"Decoder Key (Hex): {key_hex}\n"
+        
+        self.run_task("Generating decoder key", generate)
     
     def run_token_decrypter(self):
         """Decrypt a token using user input"""
@@ -570,93 +1094,127 @@ class UtilityTokenApp:
             messagebox.showerror("Input Error", "Please provide both meter number and token")
             return
         
-        self.update_status("Decrypting token...")
-        self.run_in_thread(self.run_script_with_input, "TokenDecrypter", None, [meter_number, token])
+        def decrypt():
+            from src.TokenDecrypter import TokenDecrypter, describe_token
+            return describe_token(TokenDecrypter(meter_number).decrypt_token(token)) + "\n"
+        
+        self.run_task("Decrypting token", decrypt)
     
-    def run_data_cleaning(self):
-        """Run data cleaning on raw token data"""
-        self.update_status("Processing raw token data...")
+    def run_batch_vending(self):
+        """Generate tokens for a CSV of meter/amount rows in the background"""
+        from src.batch_vending import vend_batch, format_eta
+        
+        input_path = self.input_vars["batch_input"].get()
+        output_path = self.input_vars["batch_output"].get()
         
-        def process_and_update():
-            output = self.run_script_with_input("data_cleaning")
-            self.update_status("Data processed successfully!")
+        try:
+            chunk_size = int(self.input_vars["batch_chunk_size"].get())
+            if chunk_size < 1:
+                raise ValueError
+        except ValueError:
+            messagebox.showerror("Input Error", "Chunk size must be a positive whole number")
+            return
+        
+        if not os.path.exists(input_path):
+            messagebox.showerror("Input Error", f"Input file not found: {input_path}")
+            return
+        
+        def vend():
+            job = current_job()
             
-            # Check if files were created and show confirmation
-            base_dir = os.path.dirname(os.path.dirname(__file__))
-            csv_path = os.path.join(base_dir, "resources", "data", "cleaned_meter_data.csv")
-            excel_path = os.path.join(base_dir, "resources", "data", "cleaned_meter_data.xlsx")
+            def progress(done, total, rate, eta):
+                job.progress_detail = (done, total, rate, eta)
+                job.report_progress(done / total if total else None, f"{done:,}/{total:,} tokens")
             
-            if os.path.exists(csv_path) and os.path.exists(excel_path):
-                self.display_output("\nFiles created successfully:\n")
-                self.display_output(f"- CSV: {csv_path}\n")
-                self.display_output(f"- Excel: {excel_path}\n")
-                
-                # Ask if user wants to view the data
-                if messagebox.askyesno("Success", "Data processed successfully! Would you like to visualize the data now?"):
-                    self.show_visualizer()
-                    self.run_visualizer()
-        
-        self.run_in_thread(process_and_update)
+            summary = vend_batch(input_path, output_path, chunk_size=chunk_size, progress=progress)
+            # Only the summary goes to the Text widget, never the tokens themselves
+            return (f"Generated {summary['rows'] - summary['errors']:,} tokens "
+                    f"({summary['errors']:,} rows rejected) in {summary['seconds']:.2f}s\n"
+                    f"Throughput: {summary['tokens_per_second']:,.0f} tokens/sec\n"
+                    f"Results written to: {output_path}\n")
+        
+        def on_progress(job, fraction, message):
+            self.on_job_progress(job, fraction, message)
+            done, total, rate, eta = job.progress_detail
+            self.batch_progress["value"] = fraction or 0.0
+            self.batch_rate_var.set(f"{done:,} / {total:,} tokens - {rate:,.0f} tokens/sec - ETA {format_eta(eta)}")
+        
+        def on_success(result):
+            self.batch_progress["value"] = 1.0
+        
+        self.batch_progress["value"] = 0.0
+        self.batch_rate_var.set("Starting...")
+        self.run_task("Batch vending", vend, on_success=on_success, on_progress=on_progress)
+    
+    def run_data_cleaning(self):
+        """Run data cleaning on raw token data"""
+        from src.data_cleaning import default_paths
+        _, csv_path, excel_path = default_paths()
+        
+        def clean():
+            from src.data_cleaning import clean_raw_data
+            job = current_job()
+            df = clean_raw_data(progress=lambda count: job.report_progress(message=f"{count:,} records"))
+            print("First 5 rows of cleaned data:")
+            print(df.head())
+            print(f"\nTotal records processed: {len(df)}")
+            # Printed here so it lands in this task's output area even if
+            # the user has switched screens by the time it finishes
+            print("\nFiles created successfully:")
+            print(f"- CSV: {csv_path}")
+            print(f"- Excel: {excel_path}")
+            return df
+        
+        def on_success(df):
+            # Ask if user wants to view the data
+            if messagebox.askyesno("Success", "Data processed successfully! Would you like to visualize the data now?"):
+                self.show_visualizer()
+                self.run_visualizer()
+        
+        self.run_task("Processing raw token data", clean, on_success=on_success)
     
     def run_visualizer(self):
         """Run visualization on processed data"""
-        self.update_status("Generating visualizations...")
         
-        def generate_and_display():
-            # Run the visualizer script
-            self.run_script_with_input("TokenVisualizer")
+        # Map the selected option to chart names (None renders all of them)
+        selected_type_map = {
+            "All Visualizations": None,
+            "Units Over Time": ["units_over_time"],
+            "Amount Distribution": ["amount_distribution"],
+            "Units per Amount": ["units_per_amount"],
+            "Monthly Spending": ["monthly_spending"],
+            "Dashboard": ["dashboard"]
+        }
+        selected = self.viz_option.get()
+        chart_names = selected_type_map.get(selected)
+        
+        def generate():
+            from src.TokenVisualizer import load_data, render_charts, fleet_chart_renderers
             
-            # Determine which images to display based on selection
-            viz_type = self.viz_option.get()
-            image_paths = []
-            
-            # Map visualization names to file names
-            viz_file_names = [
-                "units_over_time.png", 
-                "amount_distribution.png", 
-                "units_per_amount.png", 
-                "monthly_spending.png", 
-                "token_data_dashboard.png"
-            ]
-            
-            # Base directory for images
-            base_dir = os.path.dirname(os.path.dirname(__file__))
-            image_dir = os.path.join(base_dir, "resources", "images")
-            
-            # Get the correct paths for the image files
-            all_image_paths = [os.path.join(image_dir, file) for file in viz_file_names]
-            
-            # Filter based on selection
-            if viz_type == "all":
-                image_paths = [path for path in all_image_paths if os.path.exists(path)]
-            else:
-                # Get the filename for the selected visualization
-                selected_type_map = {
-                    "Units Over Time": "units_over_time.png",
-                    "Amount Distribution": "amount_distribution.png",
-                    "Units per Amount": "units_per_amount.png",
-                    "Monthly Spending": "monthly_spending.png",
-                    "Dashboard": "token_data_dashboard.png"
-                }
-                selected_file = selected_type_map.get(viz_type)
-                if selected_file:
-                    selected_path = os.path.join(image_dir, selected_file)
-                    if os.path.exists(selected_path):
-                        image_paths = [selected_path]
+            try:
+                df = load_data()
+            except Exception:
+                print("Could not load the cleaned data. Please make sure data has been processed first.")
+                raise
+            if selected == "Fleet Report":
+                # Per-meter charts are only rendered when scrolled into view
+                return [ImageSource(title, size, render)
+                        for title, size, render in fleet_chart_renderers(df, top_n=50)]
             
-            if image_paths:
-                self.display_images(image_paths)
-                self.update_status("Visualizations generated successfully!")
-            else:
-                self.display_output("No visualization images found. Please make sure data has been processed first.")
-                self.update_status("Visualization failed - no images found")
+            # Render straight into memory at the display width: no PNG
+            # write, read back or resample on every refresh
+            return render_charts(df, chart_names, width=800)
         
-        self.run_in_thread(generate_and_display)
+        # PhotoImages are created by display_images on the Tk main thread
+        self.run_task("Generating visualizations", generate, on_success=self.display_images)
     
     def run_tests(self):
         """Run component tests"""
-        self.update_status("Running component tests...")
-        self.run_in_thread(self.run_script_with_input, "test_components")
+        def run():
+            from src.test_components import run_all_tests
+            run_all_tests()
+        
+        self.run_task("Running component tests", run)
 
 if __name__ == "__main__":
     # Set up high DPI awareness for Windows
@@ -0,0 +1,163 @@
+"""
+Batch token vending: generate tokens for a CSV of meter/amount rows.
+
+Rows are read, generated and written in chunks, so a batch of any size is
+processed in constant memory and its results never have to be displayed.
+"""
+
+import csv
+import os
+import time
+
+from src.Token import generate_token
+
+# Accepted header names for the input columns
+METER_COLUMNS = ("meter_number", "meter", "mtr")
+AMOUNT_COLUMNS = ("amount", "amt")
+
+OUTPUT_COLUMNS = ["meter_number", "amount", "token", "error"]
+
+def count_rows(csv_path):
+    """
+    Count the data rows of a CSV quickly (used for progress and ETA).
+
+    Args:
+        csv_path (str): Path to the input CSV
+
+    Returns:
+        int: Number of non-empty lines, excluding a header row
+    """
+    with open(csv_path, "rb") as f:
+        lines = sum(1 for line in f if line.strip())
+    return max(0, lines - 1) if _has_header(csv_path) else lines
+
+def _has_header(csv_path):
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        first = next(csv.reader(f), [])
+    return bool(first) and first[0].strip().lower() in METER_COLUMNS
+
+def read_vend_requests(csv_path):
+    """
+    Stream (meter_number, amount) rows from a CSV.
+
+    The file may have a header naming the meter and amount columns
+    (e.g. "meter_number,amount" or "Mtr,Amt"), or no header, in which case
+    the first two columns are used.
+
+    Args:
+        csv_path (str): Path to the input CSV
+
+    Yields:
+        tuple: (meter_number, amount) as strings
+    """
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        meter_index, amount_index = 0, 1
+
+        for row_number, row in enumerate(reader):
+            if not row or not any(cell.strip() for cell in row):
+                continue
+            if row_number == 0:
+                header = [cell.strip().lower() for cell in row]
+                if header[0] in METER_COLUMNS:
+                    meter_index = next(i for i, name in enumerate(header) if name in METER_COLUMNS)
+                    amount_index = next((i for i, name in enumerate(header) if name in AMOUNT_COLUMNS), 1)
+                    continue
+            # A short row yields empty cells, which vend_rows reports as that row's error
+            yield _cell(row, meter_index), _cell(row, amount_index)
+
+def _cell(row, index):
+    return row[index].strip() if index < len(row) else ""
+
+def vend_rows(rows):
+    """
+    Generate tokens for a chunk of rows.
+
+    Args:
+        rows (list): (meter_number, amount) tuples
+
+    Returns:
+        list: Output rows matching OUTPUT_COLUMNS; rows that cannot be vended
+            carry an error message instead of a token
+    """
+    results = []
+    for meter_number, amount in rows:
+        try:
+            if not meter_number:
+                raise ValueError("Missing meter number")
+            if not amount:
+                raise ValueError("Missing amount")
+            token = generate_token(meter_number, float(amount))
+            results.append([meter_number, amount, token, ""])
+        except ValueError as e:
+            results.append([meter_number, amount, "", str(e)])
+    return results
+
+def format_eta(seconds):
+    """
+    Format a number of seconds as H:MM:SS.
+
+    Args:
+        seconds (float): Remaining time in seconds
+
+    Returns:
+        str: The formatted duration
+    """
+    seconds = int(round(seconds))
+    return f"{seconds // 3600}:{seconds // 60 % 60:02d}:{seconds % 60:02d}"
+
+def vend_batch(input_path, output_path, chunk_size=1000, progress=None):
+    """
+    Generate tokens for every row of a CSV and stream them to an output CSV.
+
+    Args:
+        input_path (str): CSV of meter/amount rows
+        output_path (str): Destination CSV (meter_number, amount, token, error)
+        chunk_size (int): Rows generated and written per chunk
+        progress (callable): Called after each chunk as
+            progress(done, total, tokens_per_second, eta_seconds); it may
+            raise to abort the batch
+
+    Returns:
+        dict: Rows processed, errors, elapsed seconds and tokens per second
+    """
+    total = count_rows(input_path)
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+
+    done = 0
+    errors = 0
+    start = time.perf_counter()
+
+    with open(output_path, "w", newline="", encoding="utf-8") as out:
+        writer = csv.writer(out)
+        writer.writerow(OUTPUT_COLUMNS)
+
+        chunk = []
+        requests = read_vend_requests(input_path)
+        while True:
+            chunk.clear()
+            for row in requests:
+                chunk.append(row)
+                if len(chunk) >= chunk_size:
+                    break
+            if not chunk:
+                break
+
+            results = vend_rows(chunk)
+            writer.writerows(results)
+            errors += sum(1 for result in results if result[3])
+            done += len(results)
+
+            if progress:
+                elapsed = time.perf_counter() - start
+                rate = done / elapsed if elapsed > 0 else 0.0
+                eta = (total - done) / rate if rate else 0.0
+                progress(done, total, rate, max(0.0, eta))
+
+    elapsed = time.perf_counter() - start
+    return {
+        "rows": done,
+        "errors": errors,
+        "seconds": elapsed,
+        "tokens_per_second": done / elapsed if elapsed > 0 else 0.0,
+    }
@@ -4,67 +4,134 @@ import pandas as pd
 from datetime import datetime
 #import ace_tools as tools
 
-def main():
-    """Main function to run the data cleaning process."""
-    # Get paths to files
+# Regular expression pattern to extract data fields from a token SMS line
+LINE_PATTERN = re.compile(
+    r"Mtr:(?P<Mtr>\d+)\s+Token:(?P<Token>[\d\-]+)\s+Date:(?P<Date>\d{8})\s(?P<Time>\d{2}:\d{2})\s+"
+    r"Units:(?P<Units>[\d.]+)\s+Amt:(?P<Amt>[\d.]+)\s+TknAmt:(?P<TknAmt>[\d.]+)\s+OtherCharges:(?P<OtherCharges>[\d.]+)"
+)
+
+NUMERIC_FIELDS = ['Units', 'Amt', 'TknAmt', 'OtherCharges']
+
+def parse_line(line):
+    """
+    Parse a single SMS line into a cleaned record.
+    
+    Args:
+        line (str): A line from the raw SMS export
+    
+    Returns:
+        dict: The cleaned record, or None if the line holds no token information
+    """
+    if "Mtr:" not in line:
+        return None
+    
+    match = LINE_PATTERN.search(line)
+    if not match:
+        return None
+    
+    entry = match.groupdict()
+    # Combine Date and Time into a datetime object
+    dt_str = f"{entry.pop('Date')} {entry.pop('Time')}"
+    entry['Datetime'] = datetime.strptime(dt_str, "%Y%m%d %H:%M")
+    # Convert string numbers to floats
+    for key in NUMERIC_FIELDS:
+        entry[key] = float(entry[key])
+    return entry
+
+def iter_cleaned_records(raw_file_path):
+    """
+    Stream cleaned records from a raw SMS export one line at a time.
+    
+    Args:
+        raw_file_path (str): Path to the raw SMS text file
+    
+    Yields:
+        dict: One cleaned record per token line
+    """
+    with open(raw_file_path, "r", encoding="utf-8") as file:
+        for line in file:
+            record = parse_line(line)
+            if record is not None:
+                yield record
+
+def default_paths():
+    """
+    Return the default raw, CSV and Excel paths under resources/data.
+    
+    Returns:
+        tuple: (raw_file_path, csv_output_path, excel_output_path)
+    """
     base_dir = os.path.dirname(os.path.dirname(__file__))
-    raw_file_path = os.path.join(base_dir, "resources", "data", "Raw-SMS-Meter-tokens.txt")
-    csv_output_path = os.path.join(base_dir, "resources", "data", "cleaned_meter_data.csv")
-    excel_output_path = os.path.join(base_dir, "resources", "data", "cleaned_meter_data.xlsx")
+    data_dir = os.path.join(base_dir, "resources", "data")
+    return (
+        os.path.join(data_dir, "Raw-SMS-Meter-tokens.txt"),
+        os.path.join(data_dir, "cleaned_meter_data.csv"),
+        os.path.join(data_dir, "cleaned_meter_data.xlsx"),
+    )
+
+def clean_raw_data(raw_file_path=None, csv_output_path=None, excel_output_path=None,
+                   progress=None, progress_every=10000):
+    """
+    Clean a raw SMS export and save the result as CSV and Excel.
+    
+    Args:
+        raw_file_path (str): Raw SMS text file (defaults to resources/data)
+        csv_output_path (str): Cleaned CSV destination (defaults to resources/data)
+        excel_output_path (str): Cleaned Excel destination (defaults to resources/data)
+        progress (callable): Called as progress(records_parsed) every
+            progress_every records; it may raise to abort the run
+        progress_every (int): Number of records between progress calls
+    
+    Returns:
+        pd.DataFrame: The cleaned data
+    
+    Raises:
+        FileNotFoundError: If the raw data file does not exist
+    """
+    default_raw, default_csv, default_excel = default_paths()
+    raw_file_path = raw_file_path or default_raw
+    csv_output_path = csv_output_path or default_csv
+    excel_output_path = excel_output_path or default_excel
     
     # Ensure data directory exists
-    os.makedirs(os.path.dirname(raw_file_path), exist_ok=True)
+    os.makedirs(os.path.dirname(csv_output_path), exist_ok=True)
+    
+    # Step 1: Stream the lines that contain token information (those with "Mtr:")
+    # and extract their data fields
+    parsed_data = []
+    for record in iter_cleaned_records(raw_file_path):
+        parsed_data.append(record)
+        if progress and len(parsed_data) % progress_every == 0:
+            progress(len(parsed_data))
+    
+    # Step 2: Create a DataFrame from the parsed data
+    df_cleaned = pd.DataFrame(parsed_data)
+    
+    # Step 3: Save the cleaned DataFrame to files
+    df_cleaned.to_csv(csv_output_path, index=False)
+    df_cleaned.to_excel(excel_output_path, index=False)
+    
+    return df_cleaned
+
+def main():
+    """Main function to run the data cleaning process."""
+    raw_file_path, csv_output_path, excel_output_path = default_paths()
     
-    # Step 1: Load the raw text from the file
     try:
-        with open(raw_file_path, "r", encoding="utf-8") as file:
-            raw_text = file.read()
+        df_cleaned = clean_raw_data(raw_file_path, csv_output_path, excel_output_path)
     except FileNotFoundError:
         print(f"Error: Raw data file not found at {raw_file_path}")
         print("Please ensure the file exists in the resources/data directory.")
         return
     
-    # Step 2: Extract only the lines that contain token information (those with "Mtr:")
-    mtr_lines = [line for line in raw_text.splitlines() if "Mtr:" in line]
-    
-    # Step 3: Define a regular expression pattern to extract data fields
-    line_pattern = re.compile(
-        r"Mtr:(?P<Mtr>\d+)\s+Token:(?P<Token>[\d\-]+)\s+Date:(?P<Date>\d{8})\s(?P<Time>\d{2}:\d{2})\s+"
-        r"Units:(?P<Units>[\d.]+)\s+Amt:(?P<Amt>[\d.]+)\s+TknAmt:(?P<TknAmt>[\d.]+)\s+OtherCharges:(?P<OtherCharges>[\d.]+)"
-    )
-    
-    # Step 4: Apply the regex pattern to each line and collect the results
-    parsed_data = []
-    for line in mtr_lines:
-        match = line_pattern.search(line)
-        if match:
-            entry = match.groupdict()
-            # Combine Date and Time into a datetime object
-            dt_str = f"{entry['Date']} {entry['Time']}"
-            entry['Datetime'] = datetime.strptime(dt_str, "%Y%m%d %H:%M")
-            # Remove separate Date and Time after combining
-            del entry['Date']
-            del entry['Time']
-            # Convert string numbers to floats
-            for key in ['Units', 'Amt', 'TknAmt', 'OtherCharges']:
-                entry[key] = float(entry[key])
-            parsed_data.append(entry)
-    
-    # Step 5: Create a DataFrame from the parsed data
-    df_cleaned = pd.DataFrame(parsed_data)
-    
     # Optional Step: Display the DataFrame to the user
     print("First 5 rows of cleaned data:")
     print(df_cleaned.head())
     
-    # Optional Step: Save the cleaned DataFrame to files
-    df_cleaned.to_csv(csv_output_path, index=False)
-    df_cleaned.to_excel(excel_output_path, index=False)
-    
     print(f"\nCleaned data saved to:")
     print(f"- CSV: {csv_output_path}")
     print(f"- Excel: {excel_output_path}")
     print(f"\nTotal records processed: {len(df_cleaned)}")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
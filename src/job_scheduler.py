@@ -0,0 +1,279 @@
+"""
+Bounded background job scheduler for the GUI.
+
+Jobs run on a small thread pool with a bounded number of queued/running
+jobs. Callbacks (progress, completion, errors) are never run on the worker
+threads; they are queued and executed by poll(), which the GUI calls from the
+Tk main loop via root.after, so widgets are only ever touched from one thread.
+"""
+
+import itertools
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+_current = threading.local()
+
+class JobCancelled(Exception):
+    """Raised inside a job when it has been cancelled."""
+
+class SchedulerBusy(Exception):
+    """Raised when the scheduler's queue is full."""
+
+def current_job():
+    """
+    Return the Job being executed by the calling worker thread.
+
+    Returns:
+        Job: The current job, or None outside of a scheduled job
+    """
+    return getattr(_current, "job", None)
+
+class Job:
+    """
+    A unit of work submitted to a JobScheduler.
+    """
+
+    def __init__(self, scheduler, job_id, name, key, on_done, on_error, on_progress):
+        self.scheduler = scheduler
+        self.id = job_id
+        self.name = name
+        self.key = key
+        self.state = "queued"
+        self.result = None
+        self.error = None
+        self.submitted_at = time.perf_counter()
+        self.started_at = None
+        self.finished_at = None
+        self.future = None
+
+        self._on_done = on_done
+        self._on_error = on_error
+        self._on_progress = on_progress
+        self._cancel_event = threading.Event()
+
+    @property
+    def cancelled(self):
+        """Whether cancellation has been requested."""
+        return self._cancel_event.is_set()
+
+    @property
+    def elapsed(self):
+        """Run time in seconds (so far, if still running)."""
+        if self.started_at is None:
+            return 0.0
+        end = self.finished_at if self.finished_at is not None else time.perf_counter()
+        return end - self.started_at
+
+    @property
+    def wait_time(self):
+        """Time spent queued before starting, in seconds."""
+        start = self.started_at if self.started_at is not None else time.perf_counter()
+        return start - self.submitted_at
+
+    def cancel(self):
+        """
+        Request cancellation.
+
+        A queued job never starts. A running job stops at its next
+        check_cancelled() / report_progress() call, and its result is dropped.
+        """
+        self._cancel_event.set()
+        if self.future is not None and self.future.cancel():
+            self.scheduler._finish(self, "cancelled")
+
+    def check_cancelled(self):
+        """
+        Raise JobCancelled if the job has been cancelled.
+
+        Raises:
+            JobCancelled: If cancellation was requested
+        """
+        if self._cancel_event.is_set():
+            raise JobCancelled(self.name)
+
+    def report_progress(self, fraction=None, message=None):
+        """
+        Report progress from the worker thread; delivered on the main loop.
+
+        Also acts as a cancellation point.
+
+        Args:
+            fraction (float): Completed fraction between 0 and 1, if known
+            message (str): Optional progress message
+        """
+        self.check_cancelled()
+        if self._on_progress:
+            self.scheduler._post(self._on_progress, self, fraction, message)
+
+class JobScheduler:
+    """
+    Executor-backed job scheduler with a bounded queue and main-loop callbacks.
+    """
+
+    def __init__(self, max_workers=2, max_pending=8):
+        """
+        Args:
+            max_workers (int): Number of worker threads
+            max_pending (int): Maximum number of queued plus running jobs
+        """
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self._events = queue.Queue()
+        self._active = {}
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._listeners = []
+
+    def submit(self, name, func, *args, key=None, on_done=None, on_error=None, on_progress=None, **kwargs):
+        """
+        Submit a job.
+
+        If a job with the same key is already queued or running, that job is
+        returned instead of starting another one, so repeated clicks do not
+        pile up work.
+
+        Args:
+            name (str): Human-readable job name
+            func (callable): Function run on a worker thread as func(*args, **kwargs)
+            key: Deduplication key (defaults to the name)
+            on_done (callable): on_done(job) on the main loop after success
+            on_error (callable): on_error(job) on the main loop after failure
+            on_progress (callable): on_progress(job, fraction, message) on the main loop
+
+        Returns:
+            Job: The new (or already active) job
+
+        Raises:
+            SchedulerBusy: If max_pending jobs are already queued or running
+        """
+        key = name if key is None else key
+        with self._lock:
+            for job in self._active.values():
+                if job.key == key and not job.cancelled:
+                    return job
+            if len(self._active) >= self.max_pending:
+                raise SchedulerBusy(f"{len(self._active)} jobs already pending")
+
+            job = Job(self, next(self._ids), name, key, on_done, on_error, on_progress)
+            self._active[job.id] = job
+            job.future = self._executor.submit(self._run, job, func, args, kwargs)
+        self._notify()
+        return job
+
+    def _run(self, job, func, args, kwargs):
+        if job.cancelled:
+            self._finish(job, "cancelled")
+            return
+
+        job.started_at = time.perf_counter()
+        job.state = "running"
+        self._notify()
+
+        _current.job = job
+        try:
+            job.result = func(*args, **kwargs)
+        except JobCancelled:
+            self._finish(job, "cancelled")
+        except Exception as e:
+            job.error = e
+            self._finish(job, "failed")
+        else:
+            self._finish(job, "cancelled" if job.cancelled else "done")
+        finally:
+            _current.job = None
+
+    def _finish(self, job, state):
+        with self._lock:
+            if self._active.pop(job.id, None) is None:
+                return
+        job.finished_at = time.perf_counter()
+        job.state = state
+        if state == "done" and job._on_done:
+            self._post(job._on_done, job)
+        elif state == "failed" and job._on_error:
+            self._post(job._on_error, job)
+        self._notify()
+
+    def _post(self, callback, *args):
+        self._events.put((callback, args))
+
+    def _notify(self):
+        for listener in self._listeners:
+            self._post(listener, self)
+
+    def add_listener(self, listener):
+        """
+        Register listener(scheduler), called on the main loop whenever a job
+        is queued, starts or finishes.
+        """
+        self._listeners.append(listener)
+
+    def find(self, key):
+        """
+        Return the queued or running job with the given key, if any.
+
+        Args:
+            key: The job's deduplication key
+
+        Returns:
+            Job: The active job, or None
+        """
+        with self._lock:
+            for job in self._active.values():
+                if job.key == key and not job.cancelled:
+                    return job
+        return None
+
+    @property
+    def active_jobs(self):
+        """Queued and running jobs, oldest first."""
+        with self._lock:
+            return sorted(self._active.values(), key=lambda job: job.id)
+
+    def cancel_all(self):
+        """Cancel every queued and running job."""
+        for job in self.active_jobs:
+            job.cancel()
+
+    def poll(self, max_events=100):
+        """
+        Run pending callbacks. Must be called from the main (Tk) thread.
+
+        Args:
+            max_events (int): Upper bound of callbacks run per call, so a burst
+                of progress events cannot stall the main loop
+
+        Returns:
+            int: The number of callbacks run
+        """
+        handled = 0
+        while handled < max_events:
+            try:
+                callback, args = self._events.get_nowait()
+            except queue.Empty:
+                break
+            callback(*args)
+            handled += 1
+        return handled
+
+    def attach(self, root, interval_ms=50):
+        """
+        Poll for callbacks from a Tk main loop every interval_ms.
+
+        Args:
+            root (tk.Tk): The Tk root window
+            interval_ms (int): Polling interval
+        """
+        def tick():
+            self.poll()
+            root.after(interval_ms, tick)
+
+        root.after(interval_ms, tick)
+
+    def shutdown(self, cancel=True):
+        """Stop accepting jobs, optionally cancelling the pending ones."""
+        if cancel:
+            self.cancel_all()
+        self._executor.shutdown(wait=False, cancel_futures=cancel)
@@ -0,0 +1,80 @@
+"""
+Common interface over the decoder key generation algorithms.
+
+Each algorithm provides a generator class with generate_decoder_key() and
+get_decoder_key_hex(), and a bulk derive_many() for many meters that share
+one parameter set (key type, supply group code, tariff index and key
+revision number).
+"""
+
+from src import DKGA02, DKGA04
+
+KEY_DERIVATION_ALGORITHMS = {
+    "DKGA02": DKGA02,
+    "DKGA04": DKGA04,
+}
+
+def _algorithm(name):
+    try:
+        return KEY_DERIVATION_ALGORITHMS[name.upper()]
+    except KeyError:
+        raise ValueError(f"Unknown key derivation algorithm: {name} "
+                         f"(expected one of {', '.join(KEY_DERIVATION_ALGORITHMS)})")
+
+def create_key_generator(algorithm, key_type, supply_group_code, tariff_index, key_revision_number,
+                         decoder_reference_number, vending_key=None, key_store=None):
+    """
+    Create a decoder key generator for one meter.
+
+    Args:
+        algorithm (str): "DKGA02" or "DKGA04"
+        key_type (str): The key type
+        supply_group_code (str): The supply group code
+        tariff_index (str): The tariff index
+        key_revision_number (str): The key revision number
+        decoder_reference_number (str): The decoder reference (meter) number
+        vending_key (bytes): The vending key (default: read from file)
+        key_store (VendingKeyStore): Store to take the vending key from instead of the file
+
+    Returns:
+        DecoderKeyGenerator | DKGA04KeyGenerator: The generator
+    """
+    if _algorithm(algorithm) is DKGA02:
+        return DKGA02.DecoderKeyGenerator(key_type, supply_group_code, tariff_index, key_revision_number,
+                                          decoder_reference_number, vending_key=vending_key, key_store=key_store)
+    return DKGA04.DKGA04KeyGenerator(key_type, supply_group_code, tariff_index, key_revision_number,
+                                     decoder_reference_number, vending_key=vending_key, key_store=key_store)
+
+def derive_decoder_key(algorithm, key_type, supply_group_code, tariff_index, key_revision_number,
+                       decoder_reference_number, vending_key=None, key_store=None):
+    """
+    Derive one decoder key with the named algorithm.
+
+    Returns:
+        str: The decoder key in uppercase hex
+    """
+    return _algorithm(algorithm).derive_decoder_key(key_type, supply_group_code, tariff_index, key_revision_number,
+                                                    decoder_reference_number, vending_key=vending_key,
+                                                    key_store=key_store)
+
+def derive_many(algorithm, key_type, supply_group_code, tariff_index, key_revision_number,
+                decoder_reference_numbers, vending_key=None, key_store=None):
+    """
+    Derive decoder keys for many meters sharing one parameter set.
+
+    Args:
+        algorithm (str): "DKGA02" or "DKGA04"
+        key_type (str): The key type
+        supply_group_code (str): The supply group code
+        tariff_index (str): The tariff index
+        key_revision_number (str): The key revision number
+        decoder_reference_numbers (list): Decoder reference (meter) numbers
+        vending_key (bytes): The vending key (default: read from file)
+        key_store (VendingKeyStore): Store to take the vending key from instead of the file
+
+    Returns:
+        list: Uppercase hex decoder keys, in input order
+    """
+    return _algorithm(algorithm).derive_many(key_type, supply_group_code, tariff_index, key_revision_number,
+                                             decoder_reference_numbers, vending_key=vending_key,
+                                             key_store=key_store)
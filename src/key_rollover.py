@@ -0,0 +1,362 @@
+"""
+Bulk key-change (rollover) token generation.
+
+When a supply group moves to a new key revision (or tariff index, or supply
+group code), every meter in it needs a pair of key-change tokens:
+
+    class 2, subclass 3  Set 1st section decoder key
+        subclass(4) | KENHO(4) | KRN(4) | RO(1) | reserved(1) | KT(2) | NKHO(32) | CRC(16)
+    class 2, subclass 4  Set 2nd section decoder key
+        subclass(4) | KENLO(4) | TI(8) | NKLO(32) | CRC(16)
+
+NKHO/NKLO are the high and low halves of the meter's new decoder key, KEN is
+the key expiry number and RO the rollover flag. Both tokens are encrypted
+with the meter's old decoder key, so only that meter can load the new one.
+
+The meter list is processed in chunks. Each chunk derives all its old and
+new decoder keys with one bulk derive_many call per key set and, for EA07,
+encrypts all its tokens in one batch with per-block keys. Chunks run
+across a process pool while results are written to the output CSV in input
+order. A JSON checkpoint next to the output records how many meters and
+output bytes are complete, so an interrupted rollover resumes where it
+stopped instead of starting over.
+"""
+
+import argparse
+import csv
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from src.batch_vending import METER_COLUMNS, format_eta
+from src.crc16 import with_crc
+from src.DKGA02 import load_vending_key
+from src.EA07 import encrypt_blocks_with_keys
+from src.key_derivation import derive_decoder_key, derive_many
+from src.process_pool import ordered_results, pool_size
+from src.TokenDecrypter import create_cipher
+from src.TokenEncoder import render_token, transpose_class_bits
+
+TOKEN_CLASS = 2
+SUBCLASS_FIRST_SECTION = 3
+SUBCLASS_SECOND_SECTION = 4
+DEFAULT_KEY_EXPIRY_NUMBER = 255
+
+OUTPUT_COLUMNS = ["meter_number", "key_change_token_1", "key_change_token_2", "error"]
+
+def build_key_change_blocks(new_key, key_type, key_revision_number, tariff_index,
+                            key_expiry_number=DEFAULT_KEY_EXPIRY_NUMBER, rollover=True):
+    """
+    Build the two plaintext key-change data blocks (with CRCs) for a new decoder key.
+
+    Args:
+        new_key (int): The new 64-bit decoder key
+        key_type (int): The new key type (0-3)
+        key_revision_number (int): The new key revision number (1-15)
+        tariff_index (int): The new tariff index (0-99)
+        key_expiry_number (int): The key expiry number (0-255)
+        rollover (bool): Set the rollover flag, so the meter clears its
+            token memory when it loads the key
+
+    Returns:
+        tuple: (first_section_block, second_section_block) as 64-bit integers
+
+    Raises:
+        ValueError: If a field is out of range
+    """
+    if not 0 <= key_type <= 3:
+        raise ValueError(f"Key type out of range (0-3): {key_type}")
+    if not 1 <= key_revision_number <= 15:
+        raise ValueError(f"Key revision number out of range (1-15): {key_revision_number}")
+    if not 0 <= tariff_index <= 99:
+        raise ValueError(f"Tariff index out of range (0-99): {tariff_index}")
+    if not 0 <= key_expiry_number <= 255:
+        raise ValueError(f"Key expiry number out of range (0-255): {key_expiry_number}")
+
+    first = (SUBCLASS_FIRST_SECTION << 60 | (key_expiry_number >> 4) << 56 | key_revision_number << 52
+             | int(rollover) << 51 | key_type << 48 | (new_key >> 32) << 16)
+    second = (SUBCLASS_SECOND_SECTION << 60 | (key_expiry_number & 0xF) << 56 | tariff_index << 48
+              | (new_key & 0xFFFFFFFF) << 16)
+    return with_crc(TOKEN_CLASS, first), with_crc(TOKEN_CLASS, second)
+
+def _render(encrypted_block):
+    return render_token(transpose_class_bits(TOKEN_CLASS, encrypted_block))
+
+def _derive_keys(key_derivation, key_type, key_parameters, meter_numbers, vending_key):
+    # One bulk call for the chunk; if any meter number is unusable, fall back
+    # to deriving one by one so only that meter gets an error
+    try:
+        return derive_many(key_derivation, key_type, *key_parameters, meter_numbers, vending_key=vending_key)
+    except ValueError:
+        keys = []
+        for meter_number in meter_numbers:
+            try:
+                keys.append(derive_decoder_key(key_derivation, key_type, *key_parameters, meter_number,
+                                               vending_key=vending_key))
+            except (ValueError, IndexError) as e:
+                keys.append(e)
+        return keys
+
+def rollover_chunk(meter_numbers, key_type, old, new, vending_key, algorithm="EA07", key_derivation="DKGA02",
+                   key_expiry_number=DEFAULT_KEY_EXPIRY_NUMBER, new_vending_key=None):
+    """
+    Generate key-change tokens for a chunk of meters.
+
+    Args:
+        meter_numbers (list): Meter numbers (decoder reference numbers)
+        key_type (str): The key type
+        old (tuple): Current (supply_group_code, tariff_index, key_revision_number)
+        new (tuple): New (supply_group_code, tariff_index, key_revision_number)
+        vending_key (bytes): The vending key of the current keys
+        algorithm (str): Token encryption algorithm, "EA07" or "EA11"
+        key_derivation (str): Decoder key algorithm, "DKGA02" or "DKGA04"
+        key_expiry_number (int): The key expiry number written into the tokens
+        new_vending_key (bytes): The vending key of the new keys (default: vending_key)
+
+    Returns:
+        list: Output rows matching OUTPUT_COLUMNS; meters that cannot be
+            processed carry an error message instead of tokens
+    """
+    old_keys = _derive_keys(key_derivation, key_type, old, meter_numbers, vending_key)
+    new_keys = _derive_keys(key_derivation, key_type, new, meter_numbers, new_vending_key or vending_key)
+
+    rows = []
+    valid = []  # (row index, old key, first block, second block)
+    for meter_number, old_key, new_key in zip(meter_numbers, old_keys, new_keys):
+        try:
+            for key in (old_key, new_key):
+                if isinstance(key, Exception):
+                    raise ValueError(f"Cannot derive decoder key for meter {meter_number}: {key}")
+            blocks = build_key_change_blocks(int(new_key, 16), int(key_type), int(new[2]), int(new[1]),
+                                             key_expiry_number)
+        except ValueError as e:
+            rows.append([meter_number, "", "", str(e)])
+            continue
+        valid.append((len(rows), int(old_key, 16)) + blocks)
+        rows.append([meter_number, "", "", ""])
+
+    if algorithm.upper() == "EA07":
+        # Every block has a different key, so encrypt them all in one keyed batch
+        keys = np.array([entry[1] for entry in valid for _ in range(2)], dtype=np.uint64)
+        blocks = np.array([block for entry in valid for block in entry[2:]], dtype=np.uint64)
+        encrypted = encrypt_blocks_with_keys(blocks, keys).tolist()
+    else:
+        encrypted = []
+        for _, old_key, first, second in valid:
+            cipher = create_cipher(algorithm, old_key.to_bytes(8, "big"))
+            encrypted += [cipher.encrypt_block(first), cipher.encrypt_block(second)]
+
+    for n, entry in enumerate(valid):
+        rows[entry[0]][1:3] = _render(encrypted[2 * n]), _render(encrypted[2 * n + 1])
+    return rows
+
+def _rollover_task(args):
+    return rollover_chunk(*args)
+
+def read_meter_numbers(input_path):
+    """
+    Stream meter numbers from a CSV or a plain list with one meter per line.
+
+    A header naming the meter column (e.g. "meter_number" or "Mtr") selects
+    that column; otherwise the first column is used.
+
+    Args:
+        input_path (str): Path to the meter list
+
+    Yields:
+        str: Meter numbers
+    """
+    with open(input_path, newline="", encoding="utf-8") as f:
+        meter_index = 0
+        for row_number, row in enumerate(csv.reader(f)):
+            if not row or not row[0].strip():
+                continue
+            if row_number == 0:
+                header = [cell.strip().lower() for cell in row]
+                column = next((i for i, name in enumerate(header) if name in METER_COLUMNS), None)
+                if column is not None:
+                    meter_index = column
+                    continue
+            yield row[meter_index].strip()
+
+def _load_checkpoint(checkpoint_path, settings):
+    if not os.path.exists(checkpoint_path):
+        return None
+    with open(checkpoint_path, encoding="utf-8") as f:
+        checkpoint = json.load(f)
+    if checkpoint.get("settings") != settings:
+        raise ValueError(f"Checkpoint {checkpoint_path} was written for a different rollover; "
+                         "remove it to start over")
+    return checkpoint
+
+def _save_checkpoint(checkpoint_path, checkpoint):
+    tmp_path = f"{checkpoint_path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(checkpoint, f)
+    os.replace(tmp_path, checkpoint_path)
+
+def _chunks(meter_numbers, chunk_size):
+    chunk = []
+    for meter_number in meter_numbers:
+        chunk.append(meter_number)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def run_rollover(input_path, output_path, old, new, key_type="2", vending_key=None, algorithm="EA07",
+                 key_derivation="DKGA02", key_expiry_number=DEFAULT_KEY_EXPIRY_NUMBER, chunk_size=5000,
+                 workers=None, checkpoint_path=None, progress=None, key_store=None):
+    """
+    Generate key-change tokens for every meter in a list and stream them to a CSV.
+
+    Args:
+        input_path (str): Meter list (see read_meter_numbers)
+        output_path (str): Destination CSV (meter_number, key_change_token_1, key_change_token_2, error)
+        old (tuple): Current (supply_group_code, tariff_index, key_revision_number)
+        new (tuple): New (supply_group_code, tariff_index, key_revision_number)
+        key_type (str): The key type
+        vending_key (bytes): The vending key (default: read from file)
+        algorithm (str): Token encryption algorithm, "EA07" or "EA11"
+        key_derivation (str): Decoder key algorithm, "DKGA02" or "DKGA04"
+        key_expiry_number (int): The key expiry number written into the tokens
+        chunk_size (int): Meters per pool task
+        workers (int): Process pool size (default: CPU count; 0 runs in this process)
+        checkpoint_path (str): Resume checkpoint (default: output_path + ".checkpoint.json");
+            it is removed once the rollover completes
+        progress (callable): Called after each chunk as progress(done, meters_per_second)
+        key_store (VendingKeyStore): Take the old and new vending keys from the
+            store by supply group and key revision, instead of one vending key for both
+
+    Returns:
+        dict: Meters processed (including resumed ones), errors, elapsed seconds
+            and meters per second for this run
+    """
+    old = tuple(str(value) for value in old)
+    new = tuple(str(value) for value in new)
+    new_vending_key = None
+    if key_store is not None:
+        vending_key = key_store.get(old[0], old[2])
+        new_vending_key = key_store.get(new[0], new[2])
+    elif vending_key is None:
+        vending_key = load_vending_key()
+    checkpoint_path = checkpoint_path or f"{output_path}.checkpoint.json"
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+
+    settings = {
+        "input": os.path.abspath(input_path),
+        "old": list(old),
+        "new": list(new),
+        "key_type": str(key_type),
+        "algorithm": algorithm,
+        "key_derivation": key_derivation,
+        "key_expiry_number": key_expiry_number,
+    }
+    checkpoint = _load_checkpoint(checkpoint_path, settings) if os.path.exists(output_path) else None
+    if checkpoint is None:
+        checkpoint = {"settings": settings, "meters_done": 0, "errors": 0, "output_bytes": 0}
+
+    meter_numbers = read_meter_numbers(input_path)
+    for _ in range(checkpoint["meters_done"]):
+        next(meter_numbers, None)
+    chunks = _chunks(meter_numbers, chunk_size)
+
+    # Uncheckpointed rows past output_bytes are discarded and regenerated
+    mode = "r+" if checkpoint["output_bytes"] else "w"
+    workers = pool_size(workers)
+    executor = ProcessPoolExecutor(workers) if workers else None
+    count = 0
+    start = time.perf_counter()
+    try:
+        with open(output_path, mode, newline="", encoding="utf-8") as out:
+            out.seek(checkpoint["output_bytes"])
+            out.truncate()
+            writer = csv.writer(out)
+            if not checkpoint["output_bytes"]:
+                writer.writerow(OUTPUT_COLUMNS)
+
+            def tasks():
+                for chunk in chunks:
+                    yield (chunk, key_type, old, new, vending_key, algorithm, key_derivation, key_expiry_number,
+                           new_vending_key)
+
+            results = ordered_results(executor, _rollover_task, tasks(), workers * 2)
+
+            for rows in results:
+                writer.writerows(rows)
+                out.flush()
+                count += len(rows)
+                checkpoint["meters_done"] += len(rows)
+                checkpoint["errors"] += sum(1 for row in rows if row[3])
+                checkpoint["output_bytes"] = out.tell()
+                _save_checkpoint(checkpoint_path, checkpoint)
+
+                if progress:
+                    elapsed = time.perf_counter() - start
+                    rate = count / elapsed if elapsed > 0 else 0.0
+                    progress(checkpoint["meters_done"], rate)
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+    # An empty meter list never writes a checkpoint
+    if os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    elapsed = time.perf_counter() - start
+    return {
+        "meters": checkpoint["meters_done"],
+        "errors": checkpoint["errors"],
+        "seconds": elapsed,
+        "meters_per_second": count / elapsed if elapsed > 0 else 0.0,
+    }
+
+def _parse_key_parameters(value):
+    parts = value.split(",")
+    if len(parts) != 3:
+        raise argparse.ArgumentTypeError("expected SGC,TI,KRN")
+    return tuple(part.strip() for part in parts)
+
+def main(argv=None):
+    """Main function to run a key rollover."""
+    parser = argparse.ArgumentParser(prog="main.py rollover", description="Bulk key-change token generation")
+    parser.add_argument("input", help="Meter list (CSV with a meter column, or one meter per line)")
+    parser.add_argument("output", help="Output CSV of key-change tokens")
+    parser.add_argument("--old", type=_parse_key_parameters, required=True, metavar="SGC,TI,KRN",
+                        help="Current supply group code, tariff index and key revision number")
+    parser.add_argument("--new", type=_parse_key_parameters, required=True, metavar="SGC,TI,KRN",
+                        help="New supply group code, tariff index and key revision number")
+    parser.add_argument("--key-type", default="2", help="Key type (default: 2)")
+    parser.add_argument("--algorithm", default="EA07", choices=["EA07", "EA11"],
+                        help="Token encryption algorithm (default: EA07)")
+    parser.add_argument("--key-derivation", default="DKGA02", choices=["DKGA02", "DKGA04"],
+                        help="Decoder key algorithm (default: DKGA02)")
+    parser.add_argument("--key-expiry", type=int, default=DEFAULT_KEY_EXPIRY_NUMBER,
+                        help=f"Key expiry number (default: {DEFAULT_KEY_EXPIRY_NUMBER})")
+    parser.add_argument("--chunk-size", type=int, default=5000, help="Meters per pool task (default: 5000)")
+    parser.add_argument("--workers", type=int, default=None, help="Process pool size (default: CPU count)")
+    parser.add_argument("--key-store", nargs="?", const="", default=None, metavar="PATH",
+                        help="Take the old and new vending keys from a key store "
+                             "(default: resources/data/VendingKeys.json) instead of VendingKey.key")
+    args = parser.parse_args(argv)
+
+    key_store = None
+    if args.key_store is not None:
+        from src.vending_key_store import VendingKeyStore
+        key_store = VendingKeyStore(args.key_store or None)
+
+    def report(done, rate):
+        print(f"\r{done:,} meters  {rate:,.0f} meters/s", end="", flush=True)
+
+    summary = run_rollover(args.input, args.output, args.old, args.new, key_type=args.key_type,
+                           algorithm=args.algorithm, key_derivation=args.key_derivation,
+                           key_expiry_number=args.key_expiry, chunk_size=args.chunk_size,
+                           workers=args.workers, progress=report, key_store=key_store)
+    print(f"\nWrote key-change tokens for {summary['meters']:,} meters to {args.output} "
+          f"({summary['errors']:,} errors, {format_eta(summary['seconds'])})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+"""
+Fixed-rate load test for the local token vending service.
+
+Requests are issued on a fixed schedule (open loop) over a pool of
+keep-alive connections. Latency is measured from each request's scheduled
+start, so time spent waiting for a free connection when the service falls
+behind is counted instead of hidden.
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import time
+
+from src.token_service import DEFAULT_HOST, DEFAULT_PORT
+
+def percentile(values, fraction):
+    """
+    Return the nearest-rank percentile of a list of values.
+
+    Args:
+        values (list): Samples
+        fraction (float): Percentile as a fraction, e.g. 0.99
+
+    Returns:
+        float: The percentile, or 0.0 for no samples
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+def make_payload(endpoint, rng):
+    """
+    Build a random request body for an endpoint.
+
+    Args:
+        endpoint (str): /token, /decoder-key or /decrypt
+        rng (random.Random): Random source
+
+    Returns:
+        dict: The JSON request body
+    """
+    meter = str(rng.randint(10**10, 10**11 - 1))
+    if endpoint == "/token":
+        return {"meter_number": meter, "amount": rng.choice([50, 100, 200, 500, 1000])}
+    if endpoint == "/decoder-key":
+        return {"decoder_reference_number": meter}
+    if endpoint == "/decrypt":
+        return {"meter_number": meter, "token": "".join(rng.choice("0123456789") for _ in range(20))}
+    raise ValueError(f"Unsupported endpoint: {endpoint}")
+
+class Connection:
+    """
+    A keep-alive HTTP/1.1 client connection.
+    """
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.reader = None
+        self.writer = None
+
+    async def request(self, method, path, payload=None):
+        """
+        Send a request and read the response, reconnecting if needed.
+
+        Returns:
+            tuple: (status code, decoded JSON body)
+        """
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+
+        body = json.dumps(payload).encode("utf-8") if payload is not None else b""
+        head = (f"{method} {path} HTTP/1.1\r\n"
+                f"Host: {self.host}:{self.port}\r\n"
+                "Content-Type: application/json\r\n"
+                f"Content-Length: {len(body)}\r\n\r\n")
+        self.writer.write(head.encode("latin-1") + body)
+        await self.writer.drain()
+
+        status_line = await self.reader.readline()
+        if not status_line:
+            self.close()
+            raise ConnectionError("Connection closed by server")
+        status = int(status_line.split()[1])
+
+        headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        data = await self.reader.readexactly(int(headers.get("content-length") or 0))
+        if headers.get("connection", "").lower() == "close":
+            self.close()
+        return status, json.loads(data) if data else None
+
+    def close(self):
+        """Close the underlying socket."""
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = self.writer = None
+
+async def run_load_test(host=DEFAULT_HOST, port=DEFAULT_PORT, endpoint="/token", rate=200.0,
+                        duration=10.0, connections=16, seed=1):
+    """
+    Drive the service at a fixed request rate and collect latencies.
+
+    Args:
+        host (str): Service host
+        port (int): Service port
+        endpoint (str): Endpoint to exercise
+        rate (float): Requests per second
+        duration (float): Test length in seconds
+        connections (int): Number of keep-alive connections
+        seed (int): Seed for the random request bodies
+
+    Returns:
+        dict: Request counts, achieved rate and latency percentiles in ms
+    """
+    # Fail fast if the service is not running
+    probe = Connection(host, port)
+    await probe.request("GET", "/health")
+    probe.close()
+
+    rng = random.Random(seed)
+    total = max(1, int(rate * duration))
+    pool = asyncio.Queue()
+    for _ in range(connections):
+        pool.put_nowait(Connection(host, port))
+
+    latencies = []
+    errors = 0
+
+    async def one(scheduled, payload):
+        nonlocal errors
+        connection = await pool.get()
+        try:
+            status, _ = await connection.request("POST", endpoint, payload)
+            if status != 200:
+                errors += 1
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            connection.close()
+            errors += 1
+        finally:
+            pool.put_nowait(connection)
+        latencies.append(time.perf_counter() - scheduled)
+
+    start = time.perf_counter()
+    tasks = []
+    for i in range(total):
+        scheduled = start + i / rate
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(one(scheduled, make_payload(endpoint, rng))))
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - start
+
+    while not pool.empty():
+        pool.get_nowait().close()
+
+    latencies_ms = [latency * 1000 for latency in latencies]
+    return {
+        "requests": total,
+        "errors": errors,
+        "seconds": elapsed,
+        "achieved_rate": total / elapsed if elapsed > 0 else 0.0,
+        "p50_ms": percentile(latencies_ms, 0.50),
+        "p99_ms": percentile(latencies_ms, 0.99),
+        "max_ms": max(latencies_ms) if latencies_ms else 0.0,
+    }
+
+def main(argv=None):
+    """Main function to load test the token vending service."""
+    parser = argparse.ArgumentParser(prog="main.py loadtest", description="Fixed-rate load test for the token service")
+    parser.add_argument("--host", default=DEFAULT_HOST, help=f"Service host (default: {DEFAULT_HOST})")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"Service port (default: {DEFAULT_PORT})")
+    parser.add_argument("--endpoint", default="/token", choices=["/token", "/decoder-key", "/decrypt"])
+    parser.add_argument("--rate", type=float, default=200.0, help="Requests per second (default: 200)")
+    parser.add_argument("--duration", type=float, default=10.0, help="Test length in seconds (default: 10)")
+    parser.add_argument("--connections", type=int, default=16, help="Keep-alive connections (default: 16)")
+    args = parser.parse_args(argv)
+
+    print(f"Load testing http://{args.host}:{args.port}{args.endpoint} at {args.rate:g} req/s "
+          f"for {args.duration:g}s over {args.connections} connections...")
+    try:
+        report = asyncio.run(run_load_test(args.host, args.port, args.endpoint, args.rate,
+                                           args.duration, args.connections))
+    except OSError as e:
+        print(f"Error: could not reach the service ({e}). Start it with: python main.py serve")
+        return
+
+    print(f"Requests:      {report['requests']} ({report['errors']} errors)")
+    print(f"Achieved rate: {report['achieved_rate']:.1f} req/s")
+    print(f"Latency p50:   {report['p50_ms']:.2f} ms")
+    print(f"Latency p99:   {report['p99_ms']:.2f} ms")
+    print(f"Latency max:   {report['max_ms']:.2f} ms")
+
+if __name__ == "__main__":
+    main()
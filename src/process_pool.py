@@ -0,0 +1,54 @@
+"""
+Helpers for running chunked jobs on a process pool in input order.
+
+Bulk jobs (key rollover, reconciliation) split their input into chunks,
+run the chunks on a ProcessPoolExecutor and write results in input order.
+Submitting every chunk up front would hold the whole input in memory, so
+only a bounded number of chunks are in flight at a time.
+"""
+
+import os
+
+def pool_size(workers=None):
+    """
+    Resolve a worker count option.
+
+    Args:
+        workers (int): Requested pool size (None: one per CPU; 0: run in this process)
+
+    Returns:
+        int: Number of worker processes, or 0 to run in this process
+    """
+    if workers is None:
+        return os.cpu_count() or 1
+    if workers < 0:
+        raise ValueError("workers must not be negative")
+    return workers
+
+def ordered_results(executor, func, tasks, max_pending):
+    """
+    Run func over tasks with a bounded number in flight, yielding results in input order.
+
+    Args:
+        executor (Executor): The pool, or None to run each task in this process
+        func (callable): Function applied to each task (picklable for a process pool)
+        tasks (iterable): Task arguments, consumed lazily
+        max_pending (int): Most tasks submitted but not yet yielded
+
+    Yields:
+        The result of func for each task, in input order
+    """
+    if executor is None:
+        for task in tasks:
+            yield func(task)
+        return
+
+    from collections import deque
+
+    pending = deque()
+    for task in tasks:
+        pending.append(executor.submit(func, task))
+        if len(pending) >= max_pending:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
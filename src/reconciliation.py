@@ -0,0 +1,215 @@
+"""
+Reconciliation of SMS records against what their tokens decrypt to.
+
+Every cleaned SMS record states the Units a token should carry. The job
+streams the records in chunks and, per chunk:
+
+1. Build: group the distinct tokens by meter (Mtr) and decrypt each meter's
+   tokens in one bulk decrypt_tokens call, into a hash table keyed by
+   (meter, token).
+2. Probe: look every record up in that table and compare its Units with the
+   decrypted units.
+
+Only mismatches are written out: records whose token does not decrypt (bad
+CRC, malformed token, no key for the meter), records with missing or
+unparseable Units, and records whose Units differ from the token's by more
+than the tolerance. Chunks run on a process pool with
+a bounded number in flight, so memory stays proportional to the chunk size
+however large the input is.
+"""
+
+import argparse
+import csv
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from src.decrypt_coalescer import KEY_PARAMETER_DEFAULTS, get_registry
+from src.process_pool import ordered_results, pool_size
+
+OUTPUT_COLUMNS = ["Mtr", "Token", "Datetime", "Units", "DecryptedUnits", "Reason"]
+# The token amount field has a resolution of 0.1 units
+DEFAULT_TOLERANCE = 0.05
+
+_registries = {}
+
+def _registry(vending_key):
+    if vending_key is None:
+        return get_registry()
+    registry = _registries.get(vending_key)
+    if registry is None:
+        from src.TokenDecrypter import DecrypterRegistry
+        registry = _registries[vending_key] = DecrypterRegistry(vending_key=vending_key)
+    return registry
+
+def reconcile_chunk(records, key_parameters=None, tolerance=DEFAULT_TOLERANCE, vending_key=None):
+    """
+    Reconcile a chunk of records with a hash join on (meter, token).
+
+    Args:
+        records (list): (Mtr, Token, Units, Datetime) tuples
+        key_parameters (tuple): (key_type, supply_group_code, tariff_index,
+            key_revision_number, algorithm); defaults to KEY_PARAMETER_DEFAULTS
+        tolerance (float): Largest Units difference that still counts as a match
+        vending_key (bytes): The vending key (default: the process registry's)
+
+    Returns:
+        tuple: (mismatch rows matching OUTPUT_COLUMNS, {"matched", "mismatched", "errors"})
+    """
+    key_parameters = tuple(key_parameters or KEY_PARAMETER_DEFAULTS.values())
+    registry = _registry(vending_key)
+
+    # Build side: every distinct token of every meter, decrypted per meter in bulk
+    tokens_by_meter = {}
+    for meter, token, _, _ in records:
+        tokens_by_meter.setdefault(str(meter), set()).add(str(token).replace("-", "").strip())
+    decrypted = {}
+    for meter, tokens in tokens_by_meter.items():
+        tokens = list(tokens)
+        try:
+            results = registry.get(meter, *key_parameters).decrypt_tokens(tokens, return_exceptions=True)
+        except Exception as e:
+            results = [e] * len(tokens)
+        for token, result in zip(tokens, results):
+            decrypted[(meter, token)] = result
+
+    # Probe side: each record against its token's entry
+    mismatches = []
+    counts = {"matched": 0, "mismatched": 0, "errors": 0}
+    for meter, token, units, timestamp in records:
+        result = decrypted[(str(meter), str(token).replace("-", "").strip())]
+        if isinstance(result, Exception):
+            counts["errors"] += 1
+            mismatches.append([meter, token, timestamp, units, "", f"Decrypt failed: {result}"])
+            continue
+        try:
+            stated_units = float(units)
+        except (TypeError, ValueError):
+            stated_units = math.nan
+        if not math.isfinite(stated_units):
+            # A missing Units value compares False with everything, so it would pass as a match
+            counts["mismatched"] += 1
+            mismatches.append([meter, token, timestamp, units, result["units"], "Missing or invalid Units"])
+        elif abs(result["units"] - stated_units) > tolerance:
+            counts["mismatched"] += 1
+            mismatches.append([meter, token, timestamp, units, result["units"], "Units mismatch"])
+        else:
+            counts["matched"] += 1
+    return mismatches, counts
+
+def _reconcile_task(args):
+    return reconcile_chunk(*args)
+
+def iter_record_chunks(input_path, chunk_size=10000):
+    """
+    Stream (Mtr, Token, Units, Datetime) records in chunks.
+
+    A .txt file is read as a raw SMS export through the cleaning parser; any
+    other file as a cleaned CSV.
+
+    Args:
+        input_path (str): Cleaned CSV or raw SMS export
+        chunk_size (int): Records per chunk
+
+    Yields:
+        list: Up to chunk_size record tuples
+    """
+    if input_path.lower().endswith(".txt"):
+        from src.data_cleaning import iter_cleaned_records
+
+        chunk = []
+        for record in iter_cleaned_records(input_path):
+            chunk.append((record["Mtr"], record["Token"], record["Units"], str(record["Datetime"])))
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+        return
+
+    import pandas as pd
+
+    columns = ["Mtr", "Token", "Units", "Datetime"]
+    for frame in pd.read_csv(input_path, usecols=columns, dtype={"Mtr": str, "Token": str, "Datetime": str},
+                             chunksize=chunk_size):
+        yield list(frame[columns].itertuples(index=False, name=None))
+
+def reconcile(input_path=None, output_path=None, key_parameters=None, tolerance=DEFAULT_TOLERANCE,
+              chunk_size=10000, workers=None, vending_key=None, progress=None):
+    """
+    Reconcile every record of a cleaned CSV (or raw SMS export) and write the mismatches.
+
+    Args:
+        input_path (str): Cleaned CSV or raw .txt export (default: resources/data/cleaned_meter_data.csv)
+        output_path (str): Mismatch CSV (default: resources/data/reconciliation_mismatches.csv)
+        key_parameters (tuple): (key_type, supply_group_code, tariff_index,
+            key_revision_number, algorithm) of the meters
+        tolerance (float): Largest Units difference that still counts as a match
+        chunk_size (int): Records per chunk (bounds memory per worker)
+        workers (int): Process pool size (default: CPU count; 0 runs in this process)
+        vending_key (bytes): The vending key (default: read from file)
+        progress (callable): Called after each chunk as progress(records_done)
+
+    Returns:
+        dict: Records, matched, mismatched and error counts, elapsed seconds
+            and records per second
+    """
+    base_dir = os.path.dirname(os.path.dirname(__file__))
+    input_path = input_path or os.path.join(base_dir, "resources", "data", "cleaned_meter_data.csv")
+    output_path = output_path or os.path.join(base_dir, "resources", "data", "reconciliation_mismatches.csv")
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    key_parameters = tuple(key_parameters or KEY_PARAMETER_DEFAULTS.values())
+
+    tasks = ((chunk, key_parameters, tolerance, vending_key) for chunk in iter_record_chunks(input_path, chunk_size))
+    summary = {"records": 0, "matched": 0, "mismatched": 0, "errors": 0}
+    workers = pool_size(workers)
+    executor = ProcessPoolExecutor(workers) if workers else None
+    start = time.perf_counter()
+    try:
+        results = ordered_results(executor, _reconcile_task, tasks, workers * 2)
+        with open(output_path, "w", newline="", encoding="utf-8") as out:
+            writer = csv.writer(out)
+            writer.writerow(OUTPUT_COLUMNS)
+            for mismatches, counts in results:
+                writer.writerows(mismatches)
+                for name, count in counts.items():
+                    summary[name] += count
+                summary["records"] += sum(counts.values())
+                if progress:
+                    progress(summary["records"])
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+    elapsed = time.perf_counter() - start
+    summary["seconds"] = elapsed
+    summary["records_per_second"] = summary["records"] / elapsed if elapsed > 0 else 0.0
+    return summary
+
+def main(argv=None):
+    """Main function to reconcile SMS records against their tokens."""
+    parser = argparse.ArgumentParser(prog="main.py reconcile",
+                                     description="Check SMS Units against what each token decrypts to")
+    parser.add_argument("input", nargs="?", default=None,
+                        help="Cleaned CSV or raw SMS .txt export (default: resources/data/cleaned_meter_data.csv)")
+    parser.add_argument("output", nargs="?", default=None,
+                        help="Mismatch CSV (default: resources/data/reconciliation_mismatches.csv)")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help=f"Largest Units difference counted as a match (default: {DEFAULT_TOLERANCE})")
+    parser.add_argument("--chunk-size", type=int, default=10000, help="Records per chunk (default: 10000)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Process pool size (default: CPU count; 0 runs in one process)")
+    for name, default in KEY_PARAMETER_DEFAULTS.items():
+        parser.add_argument(f"--{name.replace('_', '-')}", default=default, help=f"(default: {default})")
+    args = parser.parse_args(argv)
+
+    key_parameters = tuple(getattr(args, name) for name in KEY_PARAMETER_DEFAULTS)
+    summary = reconcile(args.input, args.output, key_parameters, args.tolerance, args.chunk_size, args.workers,
+                        progress=lambda done: print(f"\r{done:,} records", end="", flush=True))
+    print(f"\n{summary['matched']:,} matched, {summary['mismatched']:,} Units mismatches, "
+          f"{summary['errors']:,} tokens that did not decrypt "
+          f"({summary['records_per_second']:,.0f} records/s)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+"""
+Decoder key table in shared memory for process pool workers.
+
+Without it, every worker in a pool derives the decoder keys for the same
+meters itself (and reads VendingKey.key itself). A SharedKeyTable is built
+once in the parent with one bulk DKGA02 derivation and placed in a
+multiprocessing.shared_memory block; workers attach to it by name and read
+the keys in place, without copying or deriving anything.
+
+The block holds a small header with the key parameters, a sorted uint64
+array of meter ids and a parallel uint64 array of decoder keys, so a lookup
+is one binary search. A meter id is the meter number's integer value with
+its digit count in the top byte, so "012345678901" and "12345678901" (whose
+PAN blocks differ) stay distinct.
+"""
+
+import struct
+import sys
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+from src.DKGA02 import derive_decoder_key, derive_many, load_vending_key
+
+MAGIC = b"SKTB"
+VERSION = 1
+# magic, version, entry count, "key_type|supply_group_code|tariff_index|key_revision_number";
+# 80 bytes, so the arrays that follow are 8-byte aligned
+HEADER = struct.Struct("<4sIQ64s")
+
+def meter_id(meter_number):
+    """
+    Pack a meter number into the uint64 id used as the table's sort key.
+
+    Args:
+        meter_number (str): The meter number
+
+    Returns:
+        int: The digit count in bits 63-56 and the value in the bits below
+
+    Raises:
+        ValueError: If the meter number is not 1-16 digits
+    """
+    meter_number = str(meter_number).strip()
+    if not meter_number.isdigit() or len(meter_number) > 16:
+        raise ValueError(f"Invalid meter number: {meter_number}")
+    return len(meter_number) << 56 | int(meter_number)
+
+def _open_untracked(name):
+    # Only the creating process tracks (and eventually unlinks) the block.
+    # Before Python 3.13 every attach registers with the resource tracker, and
+    # a spawned worker's tracker would unlink the block when the worker exits
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    register = resource_tracker.register
+    resource_tracker.register = lambda name, rtype: None
+    try:
+        return shared_memory.SharedMemory(name=name)
+    finally:
+        resource_tracker.register = register
+
+class SharedKeyTable:
+    """
+    Sorted meter -> decoder key table in a shared memory block.
+    """
+
+    def __init__(self, shm, owner=False):
+        """
+        Use build() or attach() rather than constructing a table directly.
+
+        Args:
+            shm (SharedMemory): The block holding the table
+            owner (bool): Whether this process created the block (and unlinks it)
+        """
+        self._shm = shm
+        self.owner = owner
+        magic, version, count, params = HEADER.unpack_from(shm.buf)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"Not a shared key table: {shm.name}")
+        self.key_parameters = tuple(params.rstrip(b"\x00").decode("ascii").split("|"))
+        self._meters = np.ndarray((count,), dtype=np.uint64, buffer=shm.buf, offset=HEADER.size)
+        self._keys = np.ndarray((count,), dtype=np.uint64, buffer=shm.buf, offset=HEADER.size + 8 * count)
+
+    @property
+    def name(self):
+        return self._shm.name
+
+    @classmethod
+    def build(cls, meter_numbers, key_type="2", supply_group_code="123456", tariff_index="7",
+              key_revision_number="1", vending_key=None, name=None):
+        """
+        Derive the decoder keys for a set of meters and publish them in shared memory.
+
+        Meter numbers DKGA02 cannot derive a key for are left out; lookups
+        for them return None.
+
+        Args:
+            meter_numbers (iterable): Meter numbers
+            key_type (str): The key type
+            supply_group_code (str): The supply group code
+            tariff_index (str): The tariff index
+            key_revision_number (str): The key revision number
+            vending_key (bytes): The vending key (default: read from file)
+            name (str): Shared memory name (default: chosen by the OS)
+
+        Returns:
+            SharedKeyTable: The table, owned by this process
+        """
+        params = tuple(str(value) for value in (key_type, supply_group_code, tariff_index, key_revision_number))
+        if vending_key is None:
+            vending_key = load_vending_key()
+
+        meters = {}
+        for meter_number in meter_numbers:
+            try:
+                meters.setdefault(meter_id(meter_number), str(meter_number).strip())
+            except ValueError:
+                continue
+        ids = sorted(meters)
+        numbers = [meters[i] for i in ids]
+        try:
+            keys = derive_many(*params, numbers, vending_key=vending_key)
+        except ValueError:
+            # Some meter has no valid PAN block: derive one by one and drop it
+            keys = []
+            for meter_number in numbers:
+                try:
+                    keys.append(derive_decoder_key(*params, meter_number, vending_key=vending_key))
+                except (ValueError, IndexError):
+                    keys.append(None)
+            ids = [i for i, key in zip(ids, keys) if key is not None]
+            keys = [key for key in keys if key is not None]
+
+        count = len(ids)
+        shm = shared_memory.SharedMemory(name=name, create=True, size=HEADER.size + 16 * max(count, 1))
+        HEADER.pack_into(shm.buf, 0, MAGIC, VERSION, count, "|".join(params).encode("ascii"))
+        table = cls(shm, owner=True)
+        table._meters[:] = np.array(ids, dtype=np.uint64)
+        table._keys[:] = np.array([int(key, 16) for key in keys], dtype=np.uint64)
+        return table
+
+    @classmethod
+    def attach(cls, name):
+        """
+        Attach to a table built by another process, without copying it.
+
+        Args:
+            name (str): The table's shared memory name
+
+        Returns:
+            SharedKeyTable: A read view of the table
+        """
+        return cls(_open_untracked(name))
+
+    def __len__(self):
+        return len(self._meters)
+
+    def __contains__(self, meter_number):
+        return self.lookup(meter_number) is not None
+
+    def matches(self, key_type, supply_group_code, tariff_index, key_revision_number):
+        """
+        Check whether the table holds keys for a parameter set.
+
+        Returns:
+            bool: True if the key parameters are the table's
+        """
+        return tuple(str(value) for value in (key_type, supply_group_code, tariff_index,
+                                              key_revision_number)) == self.key_parameters
+
+    def lookup(self, meter_number):
+        """
+        Look up one meter's decoder key.
+
+        Args:
+            meter_number (str): The meter number
+
+        Returns:
+            str: The decoder key in hex, or None if the meter is not in the table
+        """
+        try:
+            target = np.uint64(meter_id(meter_number))
+        except ValueError:
+            return None
+        i = int(np.searchsorted(self._meters, target))
+        if i < len(self._meters) and self._meters[i] == target:
+            return "%016X" % int(self._keys[i])
+        return None
+
+    def lookup_many(self, meter_numbers):
+        """
+        Look up many meters' decoder keys with one vectorized search.
+
+        Args:
+            meter_numbers (list): Meter numbers
+
+        Returns:
+            list: Decoder keys in hex, or None for meters not in the table
+        """
+        ids = []
+        for meter_number in meter_numbers:
+            try:
+                ids.append(meter_id(meter_number))
+            except ValueError:
+                ids.append(0)  # No meter has id 0, so this never matches
+        if not len(self._meters):
+            return [None] * len(ids)
+        targets = np.array(ids, dtype=np.uint64)
+        positions = np.minimum(np.searchsorted(self._meters, targets), len(self._meters) - 1)
+        found = self._meters[positions] == targets
+        keys = self._keys[positions].tolist()
+        return ["%016X" % key if hit else None for key, hit in zip(keys, found.tolist())]
+
+    def close(self):
+        """Detach from the table (and remove it, if this process created it)."""
+        if self._shm is None:
+            return
+        # The array views must go before the buffer can be released
+        self._meters = self._keys = None
+        self._shm.close()
+        if self.owner:
+            self._shm.unlink()
+        self._shm = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,194 @@
+"""
+Non-interactive streaming mode for the token, key and decrypt components.
+
+Instead of prompting with input(), a component reads one request per line
+from stdin (NDJSON objects, or CSV with a header row) and writes one result
+per request to stdout, in input order, so one long-lived process can sit in
+a Unix pipeline:
+
+    cat requests.ndjson | python main.py decrypt --batch-size 5000 > results.ndjson
+    python main.py key --format csv < meters.csv | python main.py ...
+
+Requests use the field names of the HTTP service (see token_service):
+
+    token    {"meter_number", "amount"}
+    key      {"decoder_reference_number", ...key parameters}
+    decrypt  {"meter_number", "token", ...key parameters, "algorithm"}
+
+Requests are handled batch_size at a time with the service's batch
+handlers, and stdout is flushed after every batch, so results flow
+downstream while stdin is still being read. A request that fails gets an
+"error" field in its result; it never stops the stream.
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+from itertools import chain, islice
+
+FORMATS = ("ndjson", "csv")
+DEFAULT_BATCH_SIZE = 1000
+
+# Columns written in CSV output; NDJSON results carry every field
+OUTPUT_FIELDS = {
+    "token": ["meter_number", "amount", "token", "error"],
+    "key": ["decoder_reference_number", "decoder_key", "error"],
+    "decrypt": ["meter_number", "token", "token_class", "subclass", "random_number", "tid", "units", "crc", "error"],
+}
+
+def _handler(component):
+    from src.decrypt_coalescer import decrypt_requests
+    from src.token_service import derive_decoder_keys, vend_tokens
+
+    return {"token": vend_tokens, "key": derive_decoder_keys, "decrypt": decrypt_requests}[component]
+
+def detect_format(lines):
+    """
+    Work out whether a stream holds NDJSON or CSV from its first non-blank line.
+
+    Args:
+        lines (iterator): The input lines
+
+    Returns:
+        tuple: (format, lines), where lines still includes the line that was looked at
+    """
+    for line in lines:
+        if line.strip():
+            return ("ndjson" if line.lstrip().startswith("{") else "csv"), chain([line], lines)
+    return "ndjson", iter(())
+
+def read_requests(lines, input_format):
+    """
+    Parse request lines into dicts.
+
+    A line that cannot be parsed yields its error message (a str) in its
+    place, so it still gets a result at its position in the output.
+
+    Args:
+        lines (iterator): The input lines
+        input_format (str): "ndjson" or "csv"
+
+    Yields:
+        dict | str: One request, or an error message, per input record
+    """
+    if input_format == "csv":
+        for row in csv.DictReader(lines):
+            # Empty cells fall back to the handler's defaults
+            yield {name: value for name, value in row.items() if name and value not in (None, "")}
+        return
+
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            request = json.loads(line)
+        except ValueError as e:
+            yield f"Invalid JSON: {e}"
+            continue
+        yield request if isinstance(request, dict) else "Each line must hold a JSON object"
+
+def handle_batch(handler, requests):
+    """
+    Run a batch handler over the parseable requests of a batch.
+
+    If the handler fails on the batch as a whole, the requests are retried
+    one at a time so only the offending request gets an error.
+
+    Args:
+        handler (callable): Batch handler taking a list of request dicts
+        requests (list): Request dicts or error messages from read_requests
+
+    Returns:
+        list: One result dict per request, in order
+    """
+    results = [{"error": request} if isinstance(request, str) else None for request in requests]
+    valid = [i for i, request in enumerate(requests) if not isinstance(request, str)]
+    try:
+        handled = handler([requests[i] for i in valid])
+    except Exception:
+        handled = []
+        for i in valid:
+            try:
+                handled.extend(handler([requests[i]]))
+            except Exception as e:
+                handled.append({"error": str(e)})
+    for i, result in zip(valid, handled):
+        results[i] = result
+    return results
+
+def run_stream(component, input_stream, output_stream, input_format="auto", output_format=None,
+               batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Stream requests from input_stream through a component to output_stream.
+
+    Args:
+        component (str): "token", "key" or "decrypt"
+        input_stream (file): Text stream of NDJSON or CSV requests
+        output_stream (file): Text stream the results are written to
+        input_format (str): "ndjson", "csv" or "auto" (detect from the first line)
+        output_format (str): "ndjson" or "csv" (default: the input format)
+        batch_size (int): Requests handled per batch
+
+    Returns:
+        dict: Number of requests and of results with an error
+    """
+    if batch_size < 1:
+        raise ValueError("batch_size must be at least 1")
+    handler = _handler(component)
+    lines = iter(input_stream)
+    if input_format == "auto":
+        input_format, lines = detect_format(lines)
+    output_format = output_format or input_format
+
+    writer = None
+    if output_format == "csv":
+        writer = csv.DictWriter(output_stream, fieldnames=OUTPUT_FIELDS[component], extrasaction="ignore",
+                                lineterminator="\n")
+        writer.writeheader()
+
+    summary = {"requests": 0, "errors": 0}
+    requests = read_requests(lines, input_format)
+    while True:
+        batch = list(islice(requests, batch_size))
+        if not batch:
+            break
+        results = handle_batch(handler, batch)
+        if writer is not None:
+            writer.writerows(results)
+        else:
+            output_stream.write("".join(json.dumps(result) + "\n" for result in results))
+        output_stream.flush()
+        summary["requests"] += len(results)
+        summary["errors"] += sum(1 for result in results if "error" in result)
+    return summary
+
+def main(component, argv=None):
+    """
+    Main function for a component's streaming mode.
+
+    Args:
+        component (str): "token", "key" or "decrypt"
+        argv (list): Command line options
+    """
+    parser = argparse.ArgumentParser(prog=f"main.py {component}",
+                                     description=f"Stream {component} requests from stdin to stdout")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+                        help=f"Requests handled per batch (default: {DEFAULT_BATCH_SIZE})")
+    parser.add_argument("--input-format", choices=("auto",) + FORMATS, default="auto",
+                        help="Format of stdin (default: detected from the first line)")
+    parser.add_argument("--format", choices=FORMATS, default=None, dest="output_format",
+                        help="Format of stdout (default: the input format)")
+    args = parser.parse_args(argv)
+
+    try:
+        summary = run_stream(component, sys.stdin, sys.stdout, args.input_format, args.output_format,
+                             args.batch_size)
+    except BrokenPipeError:
+        # The reader went away (e.g. `| head`); stop quietly without a
+        # second error when Python flushes stdout at exit
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        sys.exit(1)
+    if summary["errors"]:
+        print(f"{summary['errors']:,} of {summary['requests']:,} requests failed", file=sys.stderr)
@@ -0,0 +1,327 @@
+"""
+Streaming summary statistics for token data.
+
+The accumulators in this module keep only a handful of numbers per field
+(count, sum, min, max and Welford's running mean/variance) plus one bucket per
+calendar month, so they can summarise arbitrarily long histories in constant
+memory. They can be fed record by record from the cleaning stream, chunk by
+chunk from a CSV on disk, and partial results from parallel workers can be
+merged into one.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+SUMMARY_FIELDS = ['Amt', 'Units', 'TknAmt', 'OtherCharges']
+
+class RunningStats:
+    """
+    Mergeable running statistics for a single numeric field.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.minimum = None
+        self.maximum = None
+        self.mean = 0.0
+        self.m2 = 0.0  # Sum of squared differences from the mean (Welford)
+
+    def add(self, value):
+        """
+        Add a single value using Welford's online update.
+
+        Args:
+            value (float): The value to add
+        """
+        self.count += 1
+        self.total += value
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        if self.minimum is None or value < self.minimum:
+            self.minimum = value
+        if self.maximum is None or value > self.maximum:
+            self.maximum = value
+
+    def add_series(self, series):
+        """
+        Add a whole column of values at once.
+
+        The chunk is summarised with vectorized operations and then merged,
+        which is far cheaper than calling add() per value.
+
+        Args:
+            series (pd.Series): The values to add
+        """
+        series = series.dropna()
+        if series.empty:
+            return
+        chunk = RunningStats()
+        chunk.count = int(series.size)
+        chunk.total = float(series.sum())
+        chunk.mean = chunk.total / chunk.count
+        chunk.m2 = float(((series - chunk.mean) ** 2).sum())
+        chunk.minimum = float(series.min())
+        chunk.maximum = float(series.max())
+        self.merge(chunk)
+
+    def merge(self, other):
+        """
+        Merge another accumulator into this one (Chan et al. parallel update).
+
+        Args:
+            other (RunningStats): The partial result to merge
+        """
+        if other.count == 0:
+            return
+        if self.count == 0:
+            self.count, self.total = other.count, other.total
+            self.mean, self.m2 = other.mean, other.m2
+            self.minimum, self.maximum = other.minimum, other.maximum
+            return
+
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.mean += delta * other.count / count
+        self.count = count
+        self.total += other.total
+        self.minimum = min(self.minimum, other.minimum)
+        self.maximum = max(self.maximum, other.maximum)
+
+    @property
+    def variance(self):
+        """Population variance of the values seen so far."""
+        return self.m2 / self.count if self.count else 0.0
+
+class SummaryAccumulator:
+    """
+    Mergeable accumulator producing the token data summary statistics.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.fields = {field: RunningStats() for field in SUMMARY_FIELDS}
+        self.first_datetime = None
+        self.last_datetime = None
+        # (year, month) -> [transactions, amount, units]
+        self.monthly = {}
+
+    def _add_month(self, key, count, amount, units):
+        bucket = self.monthly.setdefault(key, [0, 0.0, 0.0])
+        bucket[0] += count
+        bucket[1] += amount
+        bucket[2] += units
+
+    def _add_datetime_range(self, first, last):
+        if first is None:
+            return
+        if self.first_datetime is None or first < self.first_datetime:
+            self.first_datetime = first
+        if self.last_datetime is None or last > self.last_datetime:
+            self.last_datetime = last
+
+    def add_record(self, record):
+        """
+        Add one cleaned record (as produced by data_cleaning.iter_cleaned_records).
+
+        Args:
+            record (dict): A record with Amt, Units, TknAmt, OtherCharges and Datetime
+        """
+        self.count += 1
+        for field, stats in self.fields.items():
+            stats.add(record[field])
+
+        dt = record['Datetime']
+        self._add_datetime_range(dt, dt)
+        self._add_month((dt.year, dt.month), 1, record['Amt'], record['Units'])
+
+    def add_records(self, records):
+        """
+        Add every record from an iterable, e.g. the cleaning stream.
+
+        Args:
+            records (iterable): Cleaned record dicts
+
+        Returns:
+            SummaryAccumulator: self, for chaining
+        """
+        for record in records:
+            self.add_record(record)
+        return self
+
+    def add_frame(self, df):
+        """
+        Add a chunk of records held in a DataFrame.
+
+        Args:
+            df (pd.DataFrame): A chunk of cleaned token data
+
+        Returns:
+            SummaryAccumulator: self, for chaining
+        """
+        if df.empty:
+            return self
+
+        self.count += len(df)
+        for field, stats in self.fields.items():
+            stats.add_series(df[field])
+
+        dt = df['Datetime']
+        self._add_datetime_range(dt.min().to_pydatetime(), dt.max().to_pydatetime())
+
+        monthly = df.groupby([dt.dt.year, dt.dt.month]).agg(
+            count=('Amt', 'size'), amount=('Amt', 'sum'), units=('Units', 'sum'))
+        for (year, month), row in monthly.iterrows():
+            self._add_month((int(year), int(month)), int(row['count']), float(row['amount']), float(row['units']))
+        return self
+
+    def merge(self, other):
+        """
+        Merge a partial result (e.g. from another worker) into this accumulator.
+
+        Args:
+            other (SummaryAccumulator): The partial result to merge
+
+        Returns:
+            SummaryAccumulator: self, for chaining
+        """
+        self.count += other.count
+        for field, stats in self.fields.items():
+            stats.merge(other.fields[field])
+        self._add_datetime_range(other.first_datetime, other.last_datetime)
+        for key, (count, amount, units) in other.monthly.items():
+            self._add_month(key, count, amount, units)
+        return self
+
+    def monthly_totals(self):
+        """
+        Return the per-month buckets in chronological order.
+
+        Returns:
+            list: (year, month, transactions, amount, units) tuples
+        """
+        return [(year, month, *self.monthly[(year, month)]) for year, month in sorted(self.monthly)]
+
+    def statistics(self):
+        """
+        Format the accumulated values like generate_summary_statistics.
+
+        Returns:
+            dict: Summary statistic names mapped to display values
+        """
+        amt = self.fields['Amt']
+        units = self.fields['Units']
+        cost_per_unit = amt.total / units.total if units.total else float('nan')
+
+        return {
+            'Total Transactions': self.count,
+            'Total Amount Spent': f"KSh {amt.total:.2f}",
+            'Total Units Purchased': f"{units.total:.2f}",
+            'Average Purchase Amount': f"KSh {amt.mean:.2f}",
+            'Average Units per Transaction': f"{units.mean:.2f}",
+            'Average Cost per Unit': f"KSh {cost_per_unit:.2f}",
+            'First Transaction Date': self.first_datetime.strftime('%Y-%m-%d') if self.first_datetime else 'N/A',
+            'Last Transaction Date': self.last_datetime.strftime('%Y-%m-%d') if self.last_datetime else 'N/A'
+        }
+
+def write_summary_report(stats, output_path=None):
+    """
+    Print the summary statistics and save them to a text file.
+
+    Args:
+        stats (dict): Output of SummaryAccumulator.statistics
+        output_path (str): Destination file (defaults to resources/data/token_summary_statistics.txt)
+
+    Returns:
+        str: The path the report was written to
+    """
+    if output_path is None:
+        base_dir = os.path.dirname(os.path.dirname(__file__))
+        output_path = os.path.join(base_dir, "resources", "data", "token_summary_statistics.txt")
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+
+    # Print summary statistics
+    print("\n===== Token Data Summary Statistics =====")
+    for key, value in stats.items():
+        print(f"{key}: {value}")
+
+    # Save summary statistics to a text file
+    with open(output_path, 'w') as f:
+        f.write("===== Token Data Summary Statistics =====\n")
+        for key, value in stats.items():
+            f.write(f"{key}: {value}\n")
+
+    print(f"\nSaved summary statistics to: {os.path.abspath(output_path)}")
+    return output_path
+
+def summarize_raw_file(raw_file_path):
+    """
+    Summarise a raw SMS export by streaming it through the cleaning parser.
+
+    Args:
+        raw_file_path (str): Path to the raw SMS text file
+
+    Returns:
+        SummaryAccumulator: The accumulated summary
+    """
+    from src.data_cleaning import iter_cleaned_records
+    return SummaryAccumulator().add_records(iter_cleaned_records(raw_file_path))
+
+def summarize_csv(file_path, chunksize=100000):
+    """
+    Summarise a cleaned CSV chunk by chunk, holding at most one chunk in memory.
+
+    Args:
+        file_path (str): Path to a cleaned meter data CSV
+        chunksize (int): Number of rows read per chunk
+
+    Returns:
+        SummaryAccumulator: The accumulated summary
+    """
+    import pandas as pd
+
+    accumulator = SummaryAccumulator()
+    for chunk in pd.read_csv(file_path, chunksize=chunksize, parse_dates=['Datetime']):
+        accumulator.add_frame(chunk)
+    return accumulator
+
+def summarize_csv_files(file_paths, chunksize=100000, max_workers=None):
+    """
+    Summarise several cleaned CSV files in parallel and merge the partial results.
+
+    Args:
+        file_paths (list): Paths to cleaned meter data CSVs
+        chunksize (int): Number of rows read per chunk in each worker
+        max_workers (int): Size of the process pool (defaults to the CPU count)
+
+    Returns:
+        SummaryAccumulator: The merged summary
+    """
+    accumulator = SummaryAccumulator()
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        for partial in executor.map(summarize_csv, file_paths, [chunksize] * len(file_paths)):
+            accumulator.merge(partial)
+    return accumulator
+
+def main():
+    """Main function to summarise token data without loading it all into memory."""
+    base_dir = os.path.dirname(os.path.dirname(__file__))
+    csv_path = os.path.join(base_dir, "resources", "data", "cleaned_meter_data.csv")
+    raw_path = os.path.join(base_dir, "resources", "data", "Raw-SMS-Meter-tokens.txt")
+
+    try:
+        if os.path.exists(csv_path):
+            print(f"Summarising {csv_path} in chunks...")
+            accumulator = summarize_csv(csv_path)
+        else:
+            print(f"Cleaned data not found, streaming {raw_path}...")
+            accumulator = summarize_raw_file(raw_path)
+
+        write_summary_report(accumulator.statistics())
+    except Exception as e:
+        print(f"Error: {e}")
+
+if __name__ == "__main__":
+    main()
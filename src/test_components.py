@@ -5,12 +5,12 @@ Test script to verify the functionality of TokenDecrypter.py and TokenVisualizer
 import os
 import sys
 import pandas as pd
-from src.Token import generate_demo_token
+from src.Token import generate_token
 from src.TokenDecrypter import TokenDecrypter
 from src.TokenVisualizer import load_data, plot_units_over_time
 
 def test_token_decrypter():
-    """Test the TokenDecrypter with a generated token"""
+    """Test the TokenDecrypter with a token vended by Token.py"""
     print("\n===== Testing TokenDecrypter =====")
     
     # Generate a token using the Token.py module
@@ -18,14 +18,17 @@ def test_token_decrypter():
     amount = 100.0  # Example amount (KSh)
     
     print(f"Generating token for meter {meter_number} with amount KSh {amount}...")
-    token = generate_demo_token(meter_number, amount)
+    token = generate_token(meter_number, amount)
     print(f"Generated token: {token}")
     
-    # Decrypt the token
+    # Decrypt the token with the meter's decoder key
     print("\nDecrypting the token...")
     decrypter = TokenDecrypter(meter_number)
     try:
         result = decrypter.decrypt_token(token)
+        if result['units'] != amount:
+            print(f"Error: expected {amount:.2f} units, got {result['units']:.2f}")
+            return False
         print("\nDecrypted Token Information:")
         print(f"Token Class: {result['token_class']}")
         print(f"Subclass: {result['subclass']}")
@@ -73,34 +76,34 @@ def test_token_visualizer():
         print(f"Error in TokenVisualizer: {e}")
         return False
 
-if __name__ == "__main__":
+def run_all_tests():
+    """
+    Run every component test and print a summary.
+    
+    Returns:
+        dict: Component name mapped to whether its test passed
+    """
     print("=== Testing Utility Token Generation Components ===\n")
     
-    decrypter_result = test_token_decrypter()
-    visualizer_result = test_token_visualizer()
+    results = {
+        "TokenDecrypter": test_token_decrypter(),
+        "TokenVisualizer": test_token_visualizer(),
+    }
     
     print("\n=== Test Summary ===")
-    print(f"TokenDecrypter: {'PASSED' if decrypter_result else 'FAILED'}")
-    print(f"TokenVisualizer: {'PASSED' if visualizer_result else 'FAILED'}")
+    for component, passed in results.items():
+        print(f"{component}: {'PASSED' if passed else 'FAILED'}")
     
-    if decrypter_result and visualizer_result:
+    if all(results.values()):
         print("\nAll tests passed successfully! The components are working correctly.")
     else:
         print("\nSome tests failed. Please check the error messages above.")
+    
+    return results
 
 def main():
     """Main function to run the tests."""
-    if __name__ == "__main__":
-        print("=== Testing Utility Token Generation Components ===\n")
-        
-        decrypter_result = test_token_decrypter()
-        visualizer_result = test_token_visualizer()
-        
-        print("\n=== Test Summary ===")
-        print(f"TokenDecrypter: {'PASSED' if decrypter_result else 'FAILED'}")
-        print(f"TokenVisualizer: {'PASSED' if visualizer_result else 'FAILED'}")
-        
-        if decrypter_result and visualizer_result:
-            print("\nAll tests passed successfully! The components are working correctly.")
-        else:
-            print("\nSome tests failed. Please check the error messages above.")
+    run_all_tests()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,269 @@
+"""
+Compact, persistent index of issued or redeemed tokens for replay detection.
+
+A 20-digit token is a number below 10**20, which needs up to 67 bits. Each
+token is split into its high bits (value >> 64, at most 5) and its low 64
+bits. The low bits are kept in one sorted uint64 array per high-bit bucket,
+so a token costs 8 bytes and a lookup is one binary search. Saved indexes are
+memory-mapped on load, so opening even a very large index is immediate and
+only the pages that lookups touch are read.
+
+Tokens added since the last save live in an in-memory set and are merged
+into the sorted arrays by save().
+"""
+
+import os
+import struct
+
+import numpy as np
+
+MAGIC = b"TKIX"
+VERSION = 1
+BUCKETS = 8  # value >> 64 is at most 5 for a 20-digit token
+# Padded to 80 bytes so the arrays that follow are 8-byte aligned; numpy
+# copies unaligned arrays on every search
+HEADER = struct.Struct(f"<4sII{BUCKETS}Q4x")
+LOW_MASK = (1 << 64) - 1
+
+def token_to_int(token):
+    """
+    Convert a token (with or without separators) to its integer value.
+
+    Args:
+        token (str | int): The 20-digit token
+
+    Returns:
+        int: The token value
+
+    Raises:
+        ValueError: If the token is not a number of at most 20 digits
+    """
+    if isinstance(token, (int, np.integer)):
+        value = int(token)
+    else:
+        digits = str(token).replace("-", "").strip()
+        if not digits.isdigit() or len(digits) > 20:
+            raise ValueError(f"Invalid token: {token}")
+        value = int(digits)
+    if value < 0 or value >= 10 ** 20:
+        raise ValueError(f"Invalid token: {token}")
+    return value
+
+def default_index_path(name):
+    """
+    Return the default location of a named index under resources/data.
+
+    Args:
+        name (str): Index name, e.g. "issued" or "redeemed"
+
+    Returns:
+        str: Path to <name>_tokens.idx
+    """
+    base_dir = os.path.dirname(os.path.dirname(__file__))
+    return os.path.join(base_dir, "resources", "data", f"{name}_tokens.idx")
+
+def pack_tokens(tokens):
+    """
+    Pack tokens into parallel high-bit and low-64-bit arrays.
+
+    Args:
+        tokens (iterable): Tokens (strings or integers)
+
+    Returns:
+        tuple: (his, los) as uint8 and uint64 arrays
+    """
+    values = [token_to_int(token) for token in tokens]
+    his = np.fromiter((value >> 64 for value in values), dtype=np.uint8, count=len(values))
+    los = np.fromiter((value & LOW_MASK for value in values), dtype=np.uint64, count=len(values))
+    return his, los
+
+class TokenIndex:
+    """
+    Set of tokens backed by sorted uint64 arrays and an in-memory delta.
+    """
+
+    def __init__(self, path=None):
+        """
+        Args:
+            path (str): Index file; loaded (memory-mapped) if it exists, and
+                written by save()
+        """
+        self.path = path
+        self._buckets = [np.empty(0, dtype=np.uint64) for _ in range(BUCKETS)]
+        self._delta = set()
+        if path is not None and os.path.exists(path):
+            self._load(path)
+
+    def _load(self, path):
+        with open(path, "rb") as f:
+            magic, version, buckets, *counts = HEADER.unpack(f.read(HEADER.size))
+        if magic != MAGIC or version != VERSION or buckets != BUCKETS:
+            raise ValueError(f"Not a token index file: {path}")
+
+        offset = HEADER.size
+        for hi, count in enumerate(counts):
+            if count:
+                self._buckets[hi] = np.memmap(path, dtype="<u8", mode="r", offset=offset, shape=(count,))
+            offset += count * 8
+
+    def __len__(self):
+        return sum(len(bucket) for bucket in self._buckets) + len(self._delta)
+
+    def __contains__(self, token):
+        return self.contains(token)
+
+    def contains(self, token):
+        """
+        Check whether a token is in the index.
+
+        Args:
+            token (str | int): The token
+
+        Returns:
+            bool: True if the token has been added before
+        """
+        value = token_to_int(token)
+        if value in self._delta:
+            return True
+        bucket = self._buckets[value >> 64]
+        lo = np.uint64(value & LOW_MASK)
+        i = int(np.searchsorted(bucket, lo))
+        return bool(i < len(bucket) and bucket[i] == lo)
+
+    def contains_many(self, tokens):
+        """
+        Check many tokens at once with vectorized binary searches.
+
+        Args:
+            tokens (iterable): Tokens (strings or integers)
+
+        Returns:
+            np.ndarray: Boolean array, True where the token is in the index
+        """
+        return self.contains_packed(*pack_tokens(tokens))
+
+    def contains_packed(self, his, los):
+        """
+        Check tokens already packed with pack_tokens.
+
+        This skips per-token conversion, so callers that keep tokens packed
+        get the raw vectorized search rate.
+
+        Args:
+            his (np.ndarray): High bits (value >> 64) per token
+            los (np.ndarray): Low 64 bits per token
+
+        Returns:
+            np.ndarray: Boolean array, True where the token is in the index
+        """
+        found = np.zeros(len(los), dtype=bool)
+        if not len(los):
+            return found
+
+        for hi in np.unique(his):
+            bucket = self._buckets[hi]
+            if not len(bucket):
+                continue
+            mask = his == hi
+            positions = np.searchsorted(bucket, los[mask])
+            hits = positions < len(bucket)
+            hits[hits] = bucket[positions[hits]] == los[mask][hits]
+            found[mask] = hits
+
+        if self._delta:
+            delta = self._delta
+            found |= np.fromiter(((int(hi) << 64 | int(lo)) in delta for hi, lo in zip(his, los)),
+                                 dtype=bool, count=len(los))
+        return found
+
+    def add(self, token):
+        """
+        Add a token.
+
+        Args:
+            token (str | int): The token
+
+        Returns:
+            bool: True if the token was new, False if it was already present
+        """
+        if self.contains(token):
+            return False
+        self._delta.add(token_to_int(token))
+        return True
+
+    def add_many(self, tokens):
+        """
+        Add many tokens.
+
+        Args:
+            tokens (iterable): Tokens (strings or integers)
+
+        Returns:
+            int: Number of tokens that were new
+        """
+        tokens = list(tokens)
+        present = self.contains_many(tokens)
+        before = len(self._delta)
+        self._delta.update(token_to_int(token) for token, seen in zip(tokens, present) if not seen)
+        return len(self._delta) - before
+
+    def check_and_add(self, token, message="Duplicate token"):
+        """
+        Add a token, raising if it is already present (the replay check).
+
+        Args:
+            token (str | int): The token
+            message (str): Error message prefix
+
+        Raises:
+            ValueError: If the token was already in the index
+        """
+        if not self.add(token):
+            raise ValueError(f"{message}: {token}")
+
+    def _merged_buckets(self):
+        count = len(self._delta)
+        his = np.fromiter((value >> 64 for value in self._delta), dtype=np.uint8, count=count)
+        los = np.fromiter((value & LOW_MASK for value in self._delta), dtype=np.uint64, count=count)
+
+        # Unchanged buckets are copied too, so nothing returned is still a
+        # view of the memory-mapped file that save() replaces
+        merged = []
+        for hi, bucket in enumerate(self._buckets):
+            new = los[his == hi]
+            if len(new):
+                merged.append(np.union1d(np.asarray(bucket), new).astype(np.uint64, copy=False))
+            else:
+                merged.append(np.array(bucket, dtype=np.uint64))
+        return merged
+
+    def save(self, path=None):
+        """
+        Merge pending additions and write the index atomically.
+
+        Args:
+            path (str): Destination (defaults to the path the index was opened with)
+
+        Returns:
+            str: The path written
+        """
+        path = path or self.path
+        if path is None:
+            raise ValueError("No path to save the token index to")
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+        buckets = self._merged_buckets()
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, VERSION, BUCKETS, *(len(bucket) for bucket in buckets)))
+            for bucket in buckets:
+                f.write(bucket.astype("<u8", copy=False).tobytes())
+        # Unmap the old file before replacing it: Windows cannot replace a
+        # file that is still mapped
+        self._buckets = buckets
+        os.replace(tmp_path, path)
+
+        self.path = path
+        self._delta.clear()
+        self._load(path)
+        return path
@@ -0,0 +1,396 @@
+"""
+Local HTTP/JSON token vending service.
+
+An asyncio server exposing token generation, decoder key derivation and
+token decryption so point-of-sale terminals can vend without the GUI.
+Connections are kept alive between requests (HTTP/1.1), and the CPU-bound
+work runs on a process pool in batches so the event loop only parses and
+routes requests.
+
+Endpoints (all POST bodies are JSON; send a list to batch many items):
+    GET  /health
+    POST /token        {"meter_number": "...", "amount": 100}
+    POST /decoder-key  {"decoder_reference_number": "...", "key_type": "2",
+                        "supply_group_code": "123456", "tariff_index": "7",
+                        "key_revision_number": "1"}
+    POST /decrypt      {"meter_number": "...", "token": "...", ...key parameters,
+                        "algorithm": "EA07" or "EA11"}
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from src.DKGA02 import load_vending_key
+from src.decrypt_coalescer import KEY_PARAMETER_DEFAULTS, DecryptCoalescer, decrypt_requests, prewarm_worker
+from src.process_pool import pool_size
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8087
+
+MAX_HEADERS = 100
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           413: "Payload Too Large", 414: "URI Too Long", 431: "Request Header Fields Too Large", 500: "Internal Server Error"}
+
+class RequestError(Exception):
+    """A client error that maps to an HTTP status code."""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+# ---------------------------
+# Process pool workers
+# ---------------------------
+def _error(e):
+    return {"error": str(e)}
+
+def vend_tokens(items):
+    """
+    Generate a token for each {"meter_number", "amount"} item.
+
+    Args:
+        items (list): Request dicts
+
+    Returns:
+        list: {"meter_number", "amount", "token"} or {"error"} per item
+    """
+    from src.Token import generate_token, generate_tokens
+
+    results = [None] * len(items)
+    valid = []
+    for i, item in enumerate(items):
+        try:
+            meter_number, amount = str(item["meter_number"]), float(item["amount"])
+            if not math.isfinite(amount):
+                raise ValueError(f"Amount must be a finite number: {item['amount']}")
+            if amount < 5:
+                raise ValueError("Amount must be at least KSh 5")
+            valid.append((i, meter_number, amount))
+        except (KeyError, TypeError, ValueError) as e:
+            results[i] = _error(e if not isinstance(e, KeyError) else f"Missing field: {e.args[0]}")
+
+    # Tokens are encoded one batch per meter; a meter whose batch fails (e.g.
+    # an invalid meter number) falls back to its items one by one
+    groups = {}
+    for entry in valid:
+        groups.setdefault(entry[1], []).append(entry)
+    for meter_number, entries in groups.items():
+        try:
+            tokens = generate_tokens([meter_number] * len(entries), [amount for _, _, amount in entries])
+        except Exception:
+            tokens = []
+            for _, _, amount in entries:
+                try:
+                    tokens.append(generate_token(meter_number, amount))
+                except Exception as e:
+                    tokens.append(e)
+        for (i, _, amount), token in zip(entries, tokens):
+            if isinstance(token, Exception):
+                results[i] = _error(token)
+            else:
+                results[i] = {"meter_number": meter_number, "amount": amount, "token": token}
+    return results
+
+def derive_decoder_keys(items):
+    """
+    Derive a DKGA02 decoder key for each item.
+
+    Items are grouped by key parameters and each group is derived with one
+    bulk call; a group holding an invalid decoder reference number falls back
+    to deriving its items one by one, so only that item gets an error.
+
+    Args:
+        items (list): Request dicts with decoder_reference_number and optional key parameters
+
+    Returns:
+        list: {"decoder_reference_number", "decoder_key"} or {"error"} per item
+    """
+    from src.DKGA02 import derive_decoder_key, derive_many
+
+    results = [None] * len(items)
+    groups = {}
+    for i, item in enumerate(items):
+        try:
+            drn = str(item["decoder_reference_number"])
+        except KeyError as e:
+            results[i] = _error(f"Missing field: {e.args[0]}")
+            continue
+        params = tuple(str(item.get(name, KEY_PARAMETER_DEFAULTS[name]))
+                       for name in ("key_type", "supply_group_code", "tariff_index", "key_revision_number"))
+        groups.setdefault(params, []).append((i, drn))
+
+    for params, entries in groups.items():
+        try:
+            keys = derive_many(*params, [drn for _, drn in entries])
+        except Exception:
+            keys = []
+            for _, drn in entries:
+                try:
+                    keys.append(derive_decoder_key(*params, drn))
+                except Exception as e:
+                    keys.append(e)
+        for (i, drn), key_hex in zip(entries, keys):
+            if isinstance(key_hex, Exception):
+                results[i] = _error(key_hex)
+            else:
+                results[i] = {"decoder_reference_number": drn, "decoder_key": key_hex}
+    return results
+
+ROUTES = {
+    "/token": vend_tokens,
+    "/decoder-key": derive_decoder_keys,
+    "/decrypt": decrypt_requests,
+}
+
+# ---------------------------
+# HTTP server
+# ---------------------------
+class TokenService:
+    """
+    asyncio HTTP/1.1 server with keep-alive connections and a process pool.
+    """
+
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, workers=None, batch_size=256,
+                 keep_alive_timeout=15.0, max_body_size=10 * 1024 * 1024,
+                 coalesce_batch_size=64, coalesce_wait_ms=2.0, prewarm_meters=None, request_timeout=15.0):
+        """
+        Args:
+            host (str): Interface to bind
+            port (int): Port to listen on
+            workers (int): Process pool size (defaults to the CPU count)
+            batch_size (int): Items per pool task when a request carries a list
+            keep_alive_timeout (float): Seconds an idle connection is kept open
+            max_body_size (int): Largest accepted request body in bytes
+            coalesce_batch_size (int): Most single /decrypt requests merged into one batch
+            coalesce_wait_ms (float): Longest a single /decrypt request waits for a batch
+            prewarm_meters (list): Meters whose decrypters every worker builds at startup;
+                their decoder keys are derived once, into a SharedKeyTable the workers attach to
+            request_timeout (float): Seconds allowed for a request's headers and body
+                once its request line has arrived
+        """
+        self.host = host
+        self.port = port
+        self.workers = pool_size(workers)
+        self.batch_size = batch_size
+        self.keep_alive_timeout = keep_alive_timeout
+        self.max_body_size = max_body_size
+        self.request_timeout = request_timeout
+        self.coalesce_batch_size = coalesce_batch_size
+        self.coalesce_wait_ms = coalesce_wait_ms
+        self.prewarm_meters = list(prewarm_meters or [])
+        self.key_table = None
+        self.executor = None
+        self.coalescer = None
+        self.server = None
+
+    async def start(self):
+        """Create the process pool and start listening."""
+        # Make sure a vending key exists before workers start reading it,
+        # otherwise each worker could generate a different one
+        load_vending_key()
+
+        if self.prewarm_meters:
+            from src.shared_key_table import SharedKeyTable
+            self.key_table = SharedKeyTable.build(self.prewarm_meters)
+            self.executor = ProcessPoolExecutor(max_workers=self.workers, initializer=prewarm_worker,
+                                                initargs=(self.prewarm_meters, self.key_table.name))
+        else:
+            self.executor = ProcessPoolExecutor(max_workers=self.workers)
+        self.coalescer = DecryptCoalescer(self.coalesce_batch_size, self.coalesce_wait_ms, self.executor)
+        self.server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self
+
+    async def serve_forever(self):
+        """Start (if needed) and serve until cancelled."""
+        if self.server is None:
+            await self.start()
+        async with self.server:
+            await self.server.serve_forever()
+
+    async def close(self):
+        """Stop listening and shut the process pool down."""
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        if self.executor is not None:
+            self.executor.shutdown(wait=True, cancel_futures=True)
+        if self.key_table is not None:
+            self.key_table.close()
+            self.key_table = None
+
+    async def run_batched(self, func, items):
+        """
+        Run a worker function over items on the process pool in batches.
+
+        Args:
+            func (callable): One of the ROUTES worker functions
+            items (list): Request items
+
+        Returns:
+            list: Results in the same order as items
+        """
+        loop = asyncio.get_running_loop()
+        chunks = [items[i:i + self.batch_size] for i in range(0, len(items), self.batch_size)]
+        results = await asyncio.gather(*(loop.run_in_executor(self.executor, func, chunk) for chunk in chunks))
+        return [result for chunk in results for result in chunk]
+
+    async def dispatch(self, method, path, body):
+        """
+        Route a request and return (status, payload).
+
+        Args:
+            method (str): HTTP method
+            path (str): Request path (query string ignored)
+            body (bytes): Request body
+
+        Returns:
+            tuple: (status code, JSON-serialisable payload)
+        """
+        path = path.split("?", 1)[0].rstrip("/") or "/"
+        if path == "/health":
+            return 200, {"status": "ok"}
+
+        func = ROUTES.get(path)
+        if func is None:
+            raise RequestError(404, f"Unknown endpoint: {path}")
+        if method != "POST":
+            raise RequestError(405, f"{path} only accepts POST")
+
+        try:
+            payload = json.loads(body or b"null")
+        except ValueError:
+            raise RequestError(400, "Request body is not valid JSON")
+
+        if isinstance(payload, dict) and path == "/decrypt":
+            # Single validations are merged with concurrent ones into one batch
+            return 200, await self.coalescer.submit(payload)
+        if isinstance(payload, dict):
+            return 200, (await self.run_batched(func, [payload]))[0]
+        if isinstance(payload, list) and all(isinstance(item, dict) for item in payload):
+            return 200, await self.run_batched(func, payload)
+        raise RequestError(400, "Expected a JSON object or a list of objects")
+
+    async def _read_request(self, reader):
+        try:
+            request_line = await asyncio.wait_for(reader.readline(), self.keep_alive_timeout)
+        except ValueError:
+            # The line is longer than the stream reader's limit
+            raise RequestError(414, "Request line too long")
+        if not request_line:
+            return None
+        try:
+            method, path, version = request_line.decode("latin-1").split()
+        except ValueError:
+            raise RequestError(400, "Malformed request line")
+
+        # A slow or stalled client cannot hold the connection past request_timeout
+        headers, body = await asyncio.wait_for(self._read_headers_and_body(reader), self.request_timeout)
+        connection = headers.get("connection", "").lower()
+        keep_alive = connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+        return method.upper(), path, body, keep_alive
+
+    async def _read_headers_and_body(self, reader):
+        headers = {}
+        while True:
+            try:
+                line = await reader.readline()
+            except ValueError:
+                # The line is longer than the stream reader's limit
+                raise RequestError(431, "Header line too long")
+            if line in (b"\r\n", b"\n", b""):
+                break
+            if len(headers) >= MAX_HEADERS:
+                raise RequestError(431, f"More than {MAX_HEADERS} headers")
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        length = headers.get("content-length") or "0"
+        if not (length.isascii() and length.isdigit()):
+            raise RequestError(400, f"Invalid Content-Length: {length}")
+        length = int(length)
+        if length > self.max_body_size:
+            raise RequestError(413, "Request body too large")
+        body = await reader.readexactly(length) if length else b""
+        return headers, body
+
+    async def _handle_connection(self, reader, writer):
+        try:
+            while True:
+                keep_alive = False
+                try:
+                    request = await self._read_request(reader)
+                    if request is None:
+                        break
+                    method, path, body, keep_alive = request
+                    status, payload = await self.dispatch(method, path, body)
+                except RequestError as e:
+                    status, payload = e.status, {"error": str(e)}
+                except (asyncio.TimeoutError, asyncio.IncompleteReadError):
+                    break
+                except Exception as e:
+                    status, payload = 500, {"error": str(e)}
+
+                data = json.dumps(payload).encode("utf-8")
+                head = (f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+                        "Content-Type: application/json\r\n"
+                        f"Content-Length: {len(data)}\r\n"
+                        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+                writer.write(head.encode("latin-1") + data)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+def main(argv=None):
+    """Main function to run the token vending service."""
+    parser = argparse.ArgumentParser(prog="main.py serve", description="Local HTTP token vending service")
+    parser.add_argument("--host", default=DEFAULT_HOST, help=f"Interface to bind (default: {DEFAULT_HOST})")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"Port to listen on (default: {DEFAULT_PORT})")
+    parser.add_argument("--workers", type=int, default=None, help="Process pool size (default: CPU count)")
+    parser.add_argument("--batch-size", type=int, default=256, help="Items per pool task for list requests")
+    parser.add_argument("--coalesce-batch", type=int, default=64,
+                        help="Most single /decrypt requests merged into one batch (default: 64)")
+    parser.add_argument("--coalesce-wait-ms", type=float, default=2.0,
+                        help="Longest a single /decrypt request waits to be batched (default: 2.0)")
+    parser.add_argument("--prewarm", nargs="?", const="", default=None, metavar="CSV",
+                        help="Pre-build decrypters for every meter in a cleaned data CSV "
+                             "(default: resources/data/cleaned_meter_data.csv)")
+    args = parser.parse_args(argv)
+
+    prewarm_meters = None
+    if args.prewarm is not None:
+        import pandas as pd
+
+        csv_path = args.prewarm or os.path.join(os.path.dirname(os.path.dirname(__file__)),
+                                                "resources", "data", "cleaned_meter_data.csv")
+        prewarm_meters = pd.read_csv(csv_path, usecols=["Mtr"], dtype={"Mtr": str})["Mtr"].dropna().unique().tolist()
+        print(f"Pre-warming decrypters for {len(prewarm_meters)} meters")
+
+    async def run():
+        service = await TokenService(args.host, args.port, args.workers, args.batch_size,
+                                     coalesce_batch_size=args.coalesce_batch,
+                                     coalesce_wait_ms=args.coalesce_wait_ms,
+                                     prewarm_meters=prewarm_meters).start()
+        print(f"Token service listening on http://{service.host}:{service.port} "
+              f"({service.workers} workers)")
+        try:
+            await service.serve_forever()
+        finally:
+            await service.close()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        print("\nToken service stopped.")
+
+if __name__ == "__main__":
+    main()
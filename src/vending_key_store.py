@@ -0,0 +1,240 @@
+"""
+Vending key store for many supply groups and key revisions.
+
+VendingKey.key holds a single vending key. Utilities that run several supply
+groups, each rolling through key revisions, need one key per (supply group
+code, key revision number). The store keeps them all in one JSON file:
+
+    {"version": 1, "keys": {"123456:1": "<base64 key>", "123456:2": "...", ...}}
+
+The file is read once into a dict, so DecoderKeyGenerator gets the key for a
+derivation with one dict lookup instead of a file read. Every change (adding
+a key or rotating to a new revision) holds an exclusive lock on a
+"<store>.lock" file, re-reads the store, applies the change and rewrites the
+whole file to a temporary file swapped in with os.replace. Readers never see
+a partial store, and a process holding an older copy cannot drop keys that
+another process added in the meantime.
+"""
+
+import base64
+import json
+import os
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+from Crypto.Random import get_random_bytes
+
+VERSION = 1
+KEY_SIZE = 8  # DES vending keys
+
+def default_store_path():
+    """
+    Return the default location of the key store under resources/data.
+
+    Returns:
+        str: Path to VendingKeys.json
+    """
+    base_dir = os.path.dirname(os.path.dirname(__file__))
+    return os.path.join(base_dir, "resources", "data", "VendingKeys.json")
+
+@contextmanager
+def _exclusive_lock(lock_path):
+    # Blocks until no other process holds the lock
+    with open(lock_path, "a+b") as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+def _store_key(supply_group_code, key_revision_number):
+    return f"{str(supply_group_code).strip()}:{int(key_revision_number)}"
+
+class VendingKeyStore:
+    """
+    Vending keys indexed by (supply group code, key revision number).
+    """
+
+    def __init__(self, path=None):
+        """
+        Args:
+            path (str): Store file; loaded if it exists, and written on every
+                change (default: resources/data/VendingKeys.json)
+        """
+        self.path = path or default_store_path()
+        self._keys = {}
+        self.reload()
+
+    def reload(self):
+        """Re-read the store file, picking up rotations made by other processes."""
+        if not os.path.exists(self.path):
+            self._keys = {}
+            return
+        with open(self.path, encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != VERSION:
+            raise ValueError(f"Unsupported vending key store version in {self.path}: {data.get('version')}")
+        self._keys = {name: base64.b64decode(key) for name, key in data["keys"].items()}
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __contains__(self, item):
+        supply_group_code, key_revision_number = item
+        return _store_key(supply_group_code, key_revision_number) in self._keys
+
+    def get(self, supply_group_code, key_revision_number):
+        """
+        Return the vending key for a supply group and key revision.
+
+        Args:
+            supply_group_code (str): The supply group code
+            key_revision_number (str | int): The key revision number
+
+        Returns:
+            bytes: The vending key
+
+        Raises:
+            KeyError: If the store has no key for them
+        """
+        try:
+            return self._keys[_store_key(supply_group_code, key_revision_number)]
+        except KeyError:
+            raise KeyError(f"No vending key for supply group {supply_group_code}, "
+                           f"key revision {key_revision_number}") from None
+
+    def entries(self):
+        """
+        List the stored keys' indexes.
+
+        Returns:
+            list: Sorted (supply_group_code, key_revision_number) tuples
+        """
+        entries = []
+        for name in self._keys:
+            supply_group_code, key_revision_number = name.rsplit(":", 1)
+            entries.append((supply_group_code, int(key_revision_number)))
+        return sorted(entries)
+
+    def latest_revision(self, supply_group_code):
+        """
+        Return the highest key revision stored for a supply group.
+
+        Args:
+            supply_group_code (str): The supply group code
+
+        Returns:
+            int: The key revision number, or None if the group has no keys
+        """
+        revisions = [krn for sgc, krn in self.entries() if sgc == str(supply_group_code).strip()]
+        return max(revisions) if revisions else None
+
+    def add(self, supply_group_code, key_revision_number, key=None):
+        """
+        Store a vending key and save the store.
+
+        Args:
+            supply_group_code (str): The supply group code
+            key_revision_number (str | int): The key revision number
+            key (bytes): The vending key (default: a new random key)
+
+        Returns:
+            bytes: The stored key
+
+        Raises:
+            ValueError: If the key is not 8 bytes, or the index already has a key
+        """
+        with self._locked():
+            return self._add(supply_group_code, key_revision_number, key)
+
+    def _add(self, supply_group_code, key_revision_number, key):
+        # Called with the lock held and the store freshly reloaded
+        name = _store_key(supply_group_code, key_revision_number)
+        if name in self._keys:
+            raise ValueError(f"Vending key already stored for supply group {supply_group_code}, "
+                             f"key revision {key_revision_number}")
+        key = key if key is not None else get_random_bytes(KEY_SIZE)
+        if len(key) != KEY_SIZE:
+            raise ValueError(f"Vending keys must be {KEY_SIZE} bytes")
+        self._keys[name] = bytes(key)
+        self._write()
+        return self._keys[name]
+
+    def rotate(self, supply_group_code, key=None):
+        """
+        Add a key under the supply group's next key revision.
+
+        Keys for earlier revisions stay in the store, so meters that have not
+        received their key-change tokens yet can still be served.
+
+        Args:
+            supply_group_code (str): The supply group code
+            key (bytes): The new vending key (default: a new random key)
+
+        Returns:
+            tuple: (new key revision number, new key)
+        """
+        with self._locked():
+            key_revision_number = (self.latest_revision(supply_group_code) or 0) + 1
+            return key_revision_number, self._add(supply_group_code, key_revision_number, key)
+
+    def import_legacy_key(self, supply_group_code, key_revision_number):
+        """
+        Copy the single VendingKey.key into the store under a supply group and revision.
+
+        Args:
+            supply_group_code (str): The supply group code
+            key_revision_number (str | int): The key revision number
+
+        Returns:
+            bytes: The imported key
+        """
+        from src.DKGA02 import read_vending_key
+        return self.add(supply_group_code, key_revision_number, read_vending_key())
+
+    @contextmanager
+    def _locked(self):
+        # Hold the store's lock and start from what is on disk now
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with _exclusive_lock(f"{self.path}.lock"):
+            self.reload()
+            yield
+
+    def save(self):
+        """
+        Write the store atomically, merged with keys other processes saved since it was loaded.
+
+        Raises:
+            ValueError: If another process stored a different key under one of this store's indexes
+        """
+        keys = self._keys
+        with self._locked():
+            for name, key in keys.items():
+                if self._keys.setdefault(name, key) != key:
+                    raise ValueError(f"Vending key {name} was changed by another process")
+            self._write()
+
+    def _write(self):
+        data = {
+            "version": VERSION,
+            "keys": {name: base64.b64encode(key).decode("ascii") for name, key in sorted(self._keys.items())},
+        }
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+"""
+Tests for batch token vending
+"""
+
+import csv
+import os
+import sys
+
+# Add the project root to the Python path
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src.TokenDecrypter import TokenDecrypter
+from src.batch_vending import count_rows, read_vend_requests, vend_batch
+
+def test_vend_batch_streams_tokens_and_progress(tmp_path):
+    """Every row is vended in chunks, invalid amounts are reported per row"""
+    input_path = tmp_path / "requests.csv"
+    output_path = tmp_path / "out" / "tokens.csv"
+    rows = [("37194275246", str(10 + i)) for i in range(25)] + [("37194275246", "2")]
+    with open(input_path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["meter_number", "amount"])
+        writer.writerows(rows)
+    
+    updates = []
+    summary = vend_batch(str(input_path), str(output_path), chunk_size=10,
+                         progress=lambda done, total, rate, eta: updates.append((done, total)))
+    
+    assert summary["rows"] == 26 and summary["errors"] == 1
+    assert updates == [(10, 26), (20, 26), (26, 26)]
+    
+    with open(output_path, newline="") as f:
+        results = list(csv.DictReader(f))
+    assert len(results) == 26
+    assert TokenDecrypter("37194275246").decrypt_token(results[0]["token"])["units"] == 10.0
+    assert results[-1]["token"] == "" and "at least" in results[-1]["error"]
+
+def test_read_vend_requests_without_header(tmp_path):
+    """Headerless files use the first two columns"""
+    input_path = tmp_path / "requests.csv"
+    input_path.write_text("14106481758,100\n\n37194275246,50\n")
+    
+    assert count_rows(str(input_path)) == 2
+    assert list(read_vend_requests(str(input_path))) == [("14106481758", "100"), ("37194275246", "50")]
+
+def test_malformed_rows_are_per_row_errors(tmp_path):
+    """A row without an amount, or with a non-finite one, fails alone"""
+    input_path = tmp_path / "requests.csv"
+    output_path = tmp_path / "tokens.csv"
+    input_path.write_text("meter_number,amount\n37194275247\n37194275246,50\n37194275246,inf\n")
+    
+    summary = vend_batch(str(input_path), str(output_path))
+    
+    with open(output_path, newline="") as f:
+        results = list(csv.DictReader(f))
+    assert summary["rows"] == 3 and summary["errors"] == 2
+    assert results[0]["error"] == "Missing amount"
+    assert TokenDecrypter("37194275246").decrypt_token(results[1]["token"])["units"] == 50.0
+    assert "finite" in results[2]["error"]
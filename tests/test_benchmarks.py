@@ -0,0 +1,57 @@
+#!/usr/bin/env python
+"""
+Tests for the benchmark suite and its synthetic data
+"""
+
+import os
+import sys
+
+import pytest
+
+# Add the project root to the Python path
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from benchmarks import synthetic
+from benchmarks.suite import Benchmark, compare, parse_size, run_benchmarks
+from src.data_cleaning import iter_cleaned_records
+
+def test_synthetic_export_is_seeded_and_parseable(tmp_path):
+    """The same seed writes the same export, and every other line is a token line"""
+    first = synthetic.write_raw_sms(str(tmp_path / "a.txt"), 1001, seed=3, chunk_size=100)
+    second = synthetic.write_raw_sms(str(tmp_path / "b.txt"), 1001, seed=3, chunk_size=100)
+
+    with open(first, encoding="utf-8") as a, open(second, encoding="utf-8") as b:
+        assert a.read() == b.read()
+    records = list(iter_cleaned_records(first))
+    assert len(records) == 500
+    assert all(len(record["Token"]) == 24 and record["Amt"] in synthetic.AMOUNTS for record in records)
+
+def test_run_and_compare_flag_regressions():
+    """A throughput drop beyond the threshold is flagged, smaller changes are not"""
+    benchmarks = [Benchmark("noop", "ops", lambda: (10, lambda: None), None),
+                  Benchmark("capped", "ops", lambda: (10, lambda: None), 1)]
+    report = run_benchmarks(benchmarks, repeat=2)
+    assert report["results"]["noop"]["runs"] == 2 and report["results"]["capped"]["runs"] == 1
+
+    report["results"]["noop"]["per_second"] = 80.0
+    report["results"]["capped"]["per_second"] = 95.0
+    baseline = {"results": {"noop": {"per_second": 100.0}, "capped": {"per_second": 100.0}}}
+    rows = {row["name"]: row for row in compare(report, baseline, threshold=0.1)}
+    assert rows["noop"]["regression"] and not rows["capped"]["regression"]
+    assert parse_size("1k") == 1000 and parse_size("10m") == 10000000
+
+def test_teardown_runs_after_the_benchmark():
+    """A setup's teardown runs once the timed runs are done, even if a run fails"""
+    calls = []
+    benchmarks = [Benchmark("tidy", "ops", lambda: (1, lambda: calls.append("run"), lambda: calls.append("teardown")), None)]
+    run_benchmarks(benchmarks, repeat=2)
+    assert calls == ["run", "run", "teardown"]
+
+    def fail():
+        raise RuntimeError("boom")
+    with pytest.raises(RuntimeError):
+        run_benchmarks([Benchmark("broken", "ops", lambda: (1, fail, lambda: calls.append("cleaned")), None)])
+    assert calls[-1] == "cleaned"
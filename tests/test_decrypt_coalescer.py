@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+"""
+Tests for bulk decryption and the decrypt request coalescer
+"""
+
+import asyncio
+import os
+import sys
+
+# Add the project root to the Python path
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src.decrypt_coalescer import DecryptCoalescer, decrypt_requests
+from src.TokenDecrypter import TokenDecrypter
+from src.TokenEncoder import TokenEncoder
+
+METERS = ("37194275246", "12345678901")
+TIDS = (1, 4242, 99999)
+
+def tokens_for(meter):
+    encoder = TokenEncoder(meter)
+    return [encoder.encode_token(10, tid=tid) for tid in TIDS]
+
+def test_bulk_decrypt_matches_single_decrypt():
+    """decrypt_tokens returns what decrypt_token does, with per-token errors for bad tokens"""
+    decrypter = TokenDecrypter("37194275246")
+    tokens = tokens_for("37194275246")
+    results = decrypter.decrypt_tokens(tokens + ["not-a-token", "1865-3776-4842-2132-9404"], return_exceptions=True)
+
+    assert results[:3] == [decrypter.decrypt_token(token) for token in tokens]
+    assert [result["tid"] for result in results[:3]] == list(TIDS)
+    assert isinstance(results[3], ValueError)
+    assert "CRC" in str(results[4])
+
+def test_coalescer_batches_concurrent_requests_and_preserves_order():
+    """Concurrent requests are decrypted in one batch and each caller gets its own result"""
+    calls = []
+
+    def recording_batch(items):
+        calls.append(len(items))
+        return decrypt_requests(items)
+
+    async def scenario():
+        coalescer = DecryptCoalescer(max_batch_size=100, max_wait_ms=20, batch_func=recording_batch)
+        requests = [(meter, token) for meter in METERS for token in tokens_for(meter)]
+        results = await asyncio.gather(*(coalescer.decrypt(meter, token) for meter, token in requests))
+        missing = await coalescer.submit({"token": "1865-3776-4842-2132-9404"})
+        return requests, results, missing
+
+    requests, results, missing = asyncio.run(scenario())
+
+    assert calls == [6, 1]
+    for (meter, token), result, tid in zip(requests, results, TIDS * 2):
+        assert result["meter_number"] == meter
+        assert result["tid"] == tid
+    assert missing == {"error": "Missing field: meter_number"}
+
+def test_coalescer_dispatches_full_batches_immediately():
+    """A full batch is dispatched without waiting for max_wait_ms"""
+    async def scenario():
+        coalescer = DecryptCoalescer(max_batch_size=2, max_wait_ms=10000)
+        tokens = tokens_for("37194275246")
+        await asyncio.wait_for(asyncio.gather(coalescer.decrypt("37194275246", tokens[0]),
+                                              coalescer.decrypt("37194275246", tokens[1])), timeout=5)
+        return coalescer.batches
+
+    assert asyncio.run(scenario()) == 1
@@ -0,0 +1,52 @@
+#!/usr/bin/env python
+"""
+Tests for the pre-warmed TokenDecrypter registry
+"""
+
+import os
+import sys
+import time
+
+import pandas as pd
+
+# Add the project root to the Python path
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src.DKGA02 import DecoderKeyGenerator
+from src.TokenDecrypter import DecrypterRegistry
+
+VENDING_KEY = bytes.fromhex("0123456789ABCDEF")
+
+def test_prewarm_and_reuse_with_shared_vending_key():
+    """Prewarmed decrypters are reused and carry the same decoder key as DKGA02"""
+    registry = DecrypterRegistry(vending_key=VENDING_KEY)
+    df = pd.DataFrame({"Mtr": ["37194275246", "37194275246", "12345678901", None]})
+
+    assert registry.prewarm_from_frame(df) == 2
+    assert "37194275246" in registry and len(registry) == 2
+
+    decrypter = registry.get("37194275246")
+    assert registry.get("37194275246") is decrypter
+    assert (registry.hits, registry.misses) == (2, 2)
+
+    dkg = DecoderKeyGenerator("2", "123456", "7", "1", "37194275246", vending_key=VENDING_KEY)
+    dkg.generate_decoder_key()
+    assert decrypter.decoder_key_hex == dkg.get_decoder_key_hex()
+
+def test_lru_cap_and_idle_eviction():
+    """The registry evicts its least recently used decrypter at the cap and idle ones on evict_idle"""
+    registry = DecrypterRegistry(max_entries=2, idle_seconds=0.05, vending_key=VENDING_KEY)
+    registry.prewarm(["10000000001", "10000000002"])
+    registry.get("10000000001")          # Most recently used now
+    registry.get("10000000003")          # Evicts 10000000002
+
+    assert "10000000002" not in registry
+    assert "10000000001" in registry and "10000000003" in registry
+
+    time.sleep(0.1)
+    registry.evict_idle()
+    assert len(registry) == 0
+    assert registry.evictions == 3
@@ -0,0 +1,57 @@
+#!/usr/bin/env python
+"""
+Tests for the EA11 (MISTY1) token cipher
+"""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# Add the project root to the Python path
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src.EA11 import EA11Cipher
+from src.TokenDecrypter import TokenDecrypter
+from src.TokenEncoder import TokenEncoder
+
+# Test vectors from RFC 2994
+RFC_KEY = "00112233445566778899aabbccddeeff"
+RFC_VECTORS = [(0x0123456789ABCDEF, 0x8B1DA5F56AB3D07C), (0xFEDCBA9876543210, 0x04B68240B13BE95D)]
+
+def test_rfc_2994_vectors_scalar_and_batch():
+    """EA11 reproduces the RFC 2994 MISTY1 vectors, scalar and batched"""
+    cipher = EA11Cipher(RFC_KEY)
+    for plaintext, ciphertext in RFC_VECTORS:
+        assert cipher.encrypt_block(plaintext) == ciphertext
+        assert cipher.decrypt_block(ciphertext) == plaintext
+
+    plaintexts = np.array([p for p, _ in RFC_VECTORS], dtype=np.uint64)
+    assert cipher.encrypt_blocks(plaintexts).tolist() == [c for _, c in RFC_VECTORS]
+
+    blocks = np.random.default_rng(3).integers(0, 2 ** 63, size=500, dtype=np.uint64)
+    encrypted = cipher.encrypt_blocks(blocks)
+    assert encrypted.tolist() == [cipher.encrypt_block(int(block)) for block in blocks]
+    assert (cipher.decrypt_blocks(encrypted) == blocks).all()
+
+def test_64_bit_keys_are_repeated_to_128_bits():
+    """A 64-bit key is doubled to 128 bits and other lengths are rejected"""
+    assert EA11Cipher(bytes.fromhex("0123456789ABCDEF")).key == bytes.fromhex("0123456789ABCDEF" * 2)
+    with pytest.raises(ValueError):
+        EA11Cipher(b"short")
+
+def test_decrypter_algorithm_selector():
+    """The decrypter uses the selected algorithm and rejects unknown ones"""
+    ea11 = TokenDecrypter("37194275246", algorithm="ea11")
+    token = TokenEncoder("37194275246", algorithm="EA11").encode_token(10, tid=2024)
+    assert ea11.decrypt_token(token)["tid"] == 2024
+    assert ea11.decrypt_tokens([token])[0]["tid"] == 2024
+
+    with pytest.raises(ValueError, match="CRC"):
+        TokenDecrypter("37194275246", algorithm="EA07").decrypt_token(token)
+    with pytest.raises(ValueError, match="Unknown encryption algorithm"):
+        TokenDecrypter("37194275246", algorithm="EA99")
@@ -0,0 +1,51 @@
+#!/usr/bin/env python
+"""
+Tests for the per-meter fleet analytics in TokenVisualizer
+"""
+
+import os
+import sys
+
+import pandas as pd
+
+# Add the project root to the Python path
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src.TokenVisualizer import compute_fleet_statistics, flag_fleet_meters, select_fleet_meters
+
+def make_fleet_frame():
+    """Build a small fleet history with one overpriced meter."""
+    rows = []
+    for offset, meter in enumerate(range(1001, 1009)):
+        for purchase in range(10):
+            rows.append({
+                "Mtr": meter,
+                "Amt": 100.0,
+                "Units": 5.0 + offset * 0.1,
+                "Datetime": pd.Timestamp(2023, 1, 1) + pd.Timedelta(days=purchase * (offset + 2)),
+            })
+    for purchase in range(3):
+        rows.append({"Mtr": 1009, "Amt": 100.0, "Units": 0.5,
+                     "Datetime": pd.Timestamp(2023, 3, 1) + pd.Timedelta(days=purchase * 7)})
+    return pd.DataFrame(rows)
+
+def test_compute_fleet_statistics():
+    """Per-meter totals, cost per unit and cadence are computed in one pass"""
+    stats = compute_fleet_statistics(make_fleet_frame())
+    
+    assert list(stats.index) == list(range(1001, 1010))
+    assert stats.loc[1001, "Transactions"] == 10
+    assert stats.loc[1001, "TotalAmt"] == 1000.0
+    assert stats.loc[1001, "CostPerUnit"] == 20.0
+    assert stats.loc[1001, "AvgDaysBetweenPurchases"] == 2.0
+    assert stats.loc[1009, "AvgDaysBetweenPurchases"] == 7.0
+
+def test_flag_and_select_fleet_meters():
+    """Outlier meters are flagged and always selected for charting"""
+    stats = flag_fleet_meters(compute_fleet_statistics(make_fleet_frame()))
+    
+    assert list(stats.index[stats["Flagged"]]) == [1009]
+    assert select_fleet_meters(stats, top_n=1, by="TotalUnits") == [1008, 1009]
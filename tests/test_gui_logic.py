@@ -0,0 +1,132 @@
+#!/usr/bin/env python
+"""
+Tests for the display-independent parts of the GUI: the image panel's
+viewport and cache bookkeeping, output trimming and figure rendering
+"""
+
+import os
+import queue
+import sys
+from collections import OrderedDict
+
+# Add the project root to the Python path
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src.UtilityTokenGUI import LazyImagePanel, RedirectText, visible_range
+
+class FakeText:
+    """Just enough of a tkinter Text widget for RedirectText"""
+    def __init__(self):
+        self.text = ""
+
+    def configure(self, **kwargs):
+        pass
+
+    def insert(self, index, text):
+        self.text += text
+
+    def index(self, index):
+        return f"{self.text.count(chr(10)) + 1}.0"
+
+    def delete(self, start, end):
+        if start == "1.0" and end.endswith(".0"):
+            self.text = "".join(self.text.splitlines(True)[int(end.split(".")[0]) - 1:])
+        else:
+            self.text = ""
+
+    def see(self, index):
+        pass
+
+class FakeCanvas:
+    """Records the canvas calls made by LazyImagePanel"""
+    def __init__(self):
+        self.items = {}
+        self.next_id = 1
+
+    def create_text(self, *args, **kwargs):
+        item, self.next_id = self.next_id, self.next_id + 1
+        self.items[item] = ("text", kwargs)
+        return item
+
+    def delete(self, item):
+        self.items.pop(item, None)
+
+    def after(self, ms, func):
+        return "job"
+
+def make_panel(count=0, cache_size=16):
+    """A LazyImagePanel with its state set up but no Tk widgets"""
+    panel = LazyImagePanel.__new__(LazyImagePanel)
+    panel.canvas = FakeCanvas()
+    panel.cache_size = cache_size
+    panel.thumb_width = 800
+    panel.tops = [LazyImagePanel.MARGIN + i * 250 for i in range(count)]
+    panel.heights = [200] * count
+    panel.drawn = {}
+    panel.cache = OrderedDict()
+    panel.failed = {}
+    panel.pending = set()
+    panel.generation = 0
+    panel._poll_job = None
+    panel.results = queue.Queue()
+    return panel
+
+def test_visible_range_bisects_item_tops():
+    """Items overlapping the span are found, including one starting above it"""
+    tops = [10, 260, 510, 760, 1010]
+    assert visible_range(tops, 0, 100) == (0, 1)
+    assert visible_range(tops, 300, 800) == (1, 4)
+    assert visible_range(tops, 2000, 2500) == (4, 5)
+    assert visible_range([], 0, 100) == (0, 0)
+
+def test_cache_evicts_oldest_but_keeps_drawn_items():
+    """The LRU drops the least recently used images that are no longer on screen"""
+    panel = make_panel(cache_size=2)
+    panel.drawn = {0: []}
+    for index in range(4):
+        panel._cache_put((index, 800), f"photo{index}")
+
+    assert list(panel.cache) == [(0, 800), (3, 800)]
+
+def test_decode_error_draws_a_caption():
+    """A thumbnail that fails to decode gets an error caption in place of its placeholder"""
+    panel = make_panel(count=2)
+    placeholder = panel.canvas.create_text()
+    panel.drawn = {1: ["title", placeholder]}
+    panel.pending = {(1, 800)}
+    panel.results.put((0, 1, 800, OSError("truncated file")))
+
+    panel._poll_results()
+
+    assert placeholder not in panel.canvas.items
+    kind, options = panel.canvas.items[panel.drawn[1][1]]
+    assert kind == "text" and options["text"] == "Could not render image: truncated file"
+    assert panel.failed == {(1, 800): "Could not render image: truncated file"}
+    assert not panel.cache and not panel.pending
+
+def test_redirect_text_trims_to_scrollback():
+    """Only the last max_lines lines (counting Tk's empty last line) are kept, however much output arrives"""
+    widget = FakeText()
+    sink = RedirectText(widget, max_lines=5, max_pending_chars=100)
+    for i in range(40):
+        sink.write(f"line {i}\n")
+
+    assert sink.pending_chars <= 100
+    assert sink.flush_pending()
+    assert widget.text.splitlines() == [f"line {i}" for i in range(36, 40)]
+    sink.write("last\n")
+    sink.flush_pending()
+    assert widget.text.splitlines() == [f"line {i}" for i in range(37, 40)] + ["last"]
+    assert not sink.flush_pending()
+
+def test_render_figure_width():
+    """A figure rendered at a target width keeps its aspect ratio"""
+    from src.TokenVisualizer import new_figure, render_figure
+
+    fig, ax = new_figure((12, 6))
+    ax.plot([0, 1], [0, 1])
+    assert render_figure(fig, width=800).size == (800, 400)
+    assert render_figure(fig, width=300).size == (300, 150)
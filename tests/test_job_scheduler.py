@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+"""
+Tests for the bounded GUI job scheduler
+"""
+
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+# Add the project root to the Python path
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src.job_scheduler import JobScheduler, SchedulerBusy, current_job
+
+def wait_for(condition, scheduler, timeout=5.0):
+    """Poll the scheduler like the Tk loop would until condition() holds."""
+    deadline = time.time() + timeout
+    while not condition():
+        assert time.time() < deadline, "timed out"
+        scheduler.poll()
+        time.sleep(0.01)
+
+def test_callbacks_run_only_when_polled():
+    """Completion and progress callbacks are delivered on the polling thread"""
+    scheduler = JobScheduler(max_workers=1)
+    events = []
+    
+    def work():
+        current_job().report_progress(0.5, "half way")
+        return 42
+    
+    job = scheduler.submit(
+        "work", work,
+        on_done=lambda job: events.append(("done", job.result, threading.current_thread())),
+        on_progress=lambda job, fraction, message: events.append(("progress", fraction, message)),
+    )
+    job.future.result(timeout=5)
+    assert events == []
+    
+    wait_for(lambda: any(event[0] == "done" for event in events), scheduler)
+    assert events[0] == ("progress", 0.5, "half way")
+    assert events[1] == ("done", 42, threading.current_thread())
+    assert job.state == "done" and job.elapsed >= 0
+    scheduler.shutdown()
+
+def test_duplicate_keys_and_bounded_queue():
+    """Repeated submissions reuse the active job and the queue is bounded"""
+    scheduler = JobScheduler(max_workers=1, max_pending=2)
+    release = threading.Event()
+    
+    first = scheduler.submit("slow", release.wait)
+    assert scheduler.submit("slow", release.wait) is first
+    second = scheduler.submit("other", release.wait)
+    with pytest.raises(SchedulerBusy):
+        scheduler.submit("third", release.wait)
+    
+    release.set()
+    wait_for(lambda: not scheduler.active_jobs, scheduler)
+    assert first.state == second.state == "done"
+    scheduler.shutdown()
+
+def test_cancel_running_and_queued_jobs():
+    """Cancelled jobs stop at their next checkpoint and queued ones never start"""
+    scheduler = JobScheduler(max_workers=1)
+    started = threading.Event()
+    done = []
+    
+    def loop():
+        started.set()
+        while True:
+            current_job().report_progress()
+            time.sleep(0.01)
+    
+    running = scheduler.submit("loop", loop, on_done=done.append)
+    queued = scheduler.submit("queued", lambda: done.append("ran"))
+    started.wait(5)
+    scheduler.cancel_all()
+    
+    wait_for(lambda: not scheduler.active_jobs, scheduler)
+    assert running.state == "cancelled"
+    assert queued.state == "cancelled"
+    assert done == []
+    scheduler.shutdown()
@@ -0,0 +1,50 @@
+#!/usr/bin/env python
+"""
+Tests for DKGA02/DKGA04 decoder key derivation and bulk mode
+"""
+
+import os
+import sys
+
+import pytest
+
+# Add the project root to the Python path
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src.key_derivation import create_key_generator, derive_decoder_key, derive_many
+
+VENDING_KEY = bytes.fromhex("0011223344556677")
+PARAMS = ("2", "123456", "7", "1")
+METERS = ["37194275246", "012345678901", "10000000001", "10000000002"]
+
+@pytest.mark.parametrize("algorithm", ["DKGA02", "DKGA04"])
+def test_bulk_matches_single_derivation(algorithm):
+    """Bulk derivation gives the same distinct 16-digit keys as deriving one meter at a time"""
+    singles = []
+    for meter in METERS:
+        generator = create_key_generator(algorithm, *PARAMS, meter, vending_key=VENDING_KEY)
+        generator.generate_decoder_key()
+        singles.append(generator.get_decoder_key_hex())
+
+    assert derive_many(algorithm, *PARAMS, METERS, vending_key=VENDING_KEY) == singles
+    assert derive_decoder_key(algorithm, *PARAMS, METERS[0], vending_key=VENDING_KEY) == singles[0]
+    assert len(set(singles)) == len(METERS)
+    assert all(len(key) == 16 for key in singles)
+
+def test_dkga04_binds_every_parameter():
+    """Changing any DKGA04 input changes the key, and bad algorithms or meters are rejected"""
+    base = derive_decoder_key("DKGA04", *PARAMS, METERS[0], vending_key=VENDING_KEY)
+    assert base != derive_decoder_key("DKGA02", *PARAMS, METERS[0], vending_key=VENDING_KEY)
+    for i in range(4):
+        changed = list(PARAMS)
+        changed[i] = changed[i] + "9"
+        assert derive_decoder_key("DKGA04", *changed, METERS[0], vending_key=VENDING_KEY) != base
+    assert derive_decoder_key("DKGA04", *PARAMS, METERS[0], vending_key=b"\x01" * 8) != base
+
+    with pytest.raises(ValueError, match="Unknown key derivation algorithm"):
+        derive_many("DKGA99", *PARAMS, METERS)
+    with pytest.raises(ValueError, match="Invalid decoder reference number"):
+        derive_many("DKGA02", *PARAMS, ["123"], vending_key=VENDING_KEY)
@@ -0,0 +1,111 @@
+#!/usr/bin/env python
+"""
+Tests for bulk key-change (rollover) token generation
+"""
+
+import csv
+import os
+import sys
+
+import pytest
+
+# Add the project root to the Python path
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src.DKGA02 import derive_decoder_key
+from src.key_rollover import run_rollover
+from src.TokenDecrypter import TokenDecrypter
+
+VENDING_KEY = bytes.fromhex("0011223344556677")
+OLD = ("123456", "7", "1")
+NEW = ("123456", "8", "2")
+
+def write_meters(path, meters):
+    with open(path, "w", newline="") as f:
+        f.write("Mtr\n" + "\n".join(meters) + "\n")
+
+def read_rows(path):
+    with open(path, newline="") as f:
+        return list(csv.DictReader(f))
+
+@pytest.mark.parametrize("algorithm", ["EA07", "EA11"])
+def test_key_change_tokens_carry_new_key_under_old_key(tmp_path, algorithm):
+    """The old decoder key decrypts both tokens, which together hold the new key"""
+    meters = ["37194275246", "10000000001", "bad"]
+    write_meters(tmp_path / "meters.csv", meters)
+    summary = run_rollover(str(tmp_path / "meters.csv"), str(tmp_path / "out.csv"), OLD, NEW,
+                           vending_key=VENDING_KEY, algorithm=algorithm, chunk_size=2, workers=0)
+    
+    rows = read_rows(tmp_path / "out.csv")
+    assert summary["meters"] == 3 and summary["errors"] == 1
+    assert [row["meter_number"] for row in rows] == meters
+    assert rows[2]["key_change_token_1"] == "" and "bad" in rows[2]["error"]
+    assert not os.path.exists(str(tmp_path / "out.csv") + ".checkpoint.json")
+    
+    for row in rows[:2]:
+        decrypter = TokenDecrypter(row["meter_number"], "2", *OLD, vending_key=VENDING_KEY, algorithm=algorithm)
+        first = decrypter.decrypt_token(row["key_change_token_1"])
+        second = decrypter.decrypt_token(row["key_change_token_2"])
+        assert (first["token_class"], first["subclass"], second["subclass"]) == (2, 3, 4)
+        
+        first_block = int(first["raw_decrypted_data"], 2)
+        second_block = int(second["raw_decrypted_data"], 2)
+        assert first_block >> 52 & 0xF == 2 and second_block >> 48 & 0xFF == 8  # new KRN and TI
+        new_key = (first_block >> 16 & 0xFFFFFFFF) << 32 | second_block >> 16 & 0xFFFFFFFF
+        assert "%016X" % new_key == derive_decoder_key("2", *NEW, row["meter_number"], vending_key=VENDING_KEY)
+
+def test_interrupted_rollover_resumes_from_checkpoint(tmp_path):
+    """A rerun after a failure skips completed chunks and matches an uninterrupted run"""
+    meters = [str(10000000000 + i) for i in range(25)]
+    write_meters(tmp_path / "meters.csv", meters)
+    run_rollover(str(tmp_path / "meters.csv"), str(tmp_path / "full.csv"), OLD, NEW,
+                 vending_key=VENDING_KEY, chunk_size=10, workers=0)
+    
+    def fail_after_first_chunk(done, rate):
+        raise KeyboardInterrupt
+    
+    output_path = str(tmp_path / "resumed.csv")
+    with pytest.raises(KeyboardInterrupt):
+        run_rollover(str(tmp_path / "meters.csv"), output_path, OLD, NEW,
+                     vending_key=VENDING_KEY, chunk_size=10, workers=0, progress=fail_after_first_chunk)
+    assert os.path.exists(output_path + ".checkpoint.json")
+    
+    with pytest.raises(ValueError, match="different rollover"):
+        run_rollover(str(tmp_path / "meters.csv"), output_path, OLD, ("123456", "7", "3"),
+                     vending_key=VENDING_KEY, chunk_size=10, workers=0)
+    
+    done = []
+    summary = run_rollover(str(tmp_path / "meters.csv"), output_path, OLD, NEW, vending_key=VENDING_KEY,
+                           chunk_size=10, workers=0, progress=lambda count, rate: done.append(count))
+    assert done == [20, 25] and summary["meters"] == 25
+    assert read_rows(output_path) == read_rows(tmp_path / "full.csv")
+
+def test_rollover_takes_old_and_new_vending_keys_from_a_key_store(tmp_path):
+    """Key-change tokens from a key store carry the key derived with the rotated vending key"""
+    from src.vending_key_store import VendingKeyStore
+    
+    store = VendingKeyStore(str(tmp_path / "VendingKeys.json"))
+    store.add("123456", 1, VENDING_KEY)
+    _, new_vending_key = store.rotate("123456")
+    write_meters(tmp_path / "meters.csv", ["37194275246"])
+    run_rollover(str(tmp_path / "meters.csv"), str(tmp_path / "out.csv"), OLD, NEW, workers=0, key_store=store)
+    
+    row = read_rows(tmp_path / "out.csv")[0]
+    decrypter = TokenDecrypter(row["meter_number"], "2", *OLD, vending_key=VENDING_KEY)
+    first = int(decrypter.decrypt_token(row["key_change_token_1"])["raw_decrypted_data"], 2)
+    second = int(decrypter.decrypt_token(row["key_change_token_2"])["raw_decrypted_data"], 2)
+    new_key = (first >> 16 & 0xFFFFFFFF) << 32 | second >> 16 & 0xFFFFFFFF
+    assert "%016X" % new_key == derive_decoder_key("2", *NEW, row["meter_number"], vending_key=new_vending_key)
+
+def test_empty_meter_list(tmp_path):
+    """A meter list with no rows writes just the header and leaves no checkpoint"""
+    with open(tmp_path / "meters.csv", "w", newline="") as f:
+        f.write("Mtr\n")
+    summary = run_rollover(str(tmp_path / "meters.csv"), str(tmp_path / "out.csv"), OLD, NEW,
+                           vending_key=VENDING_KEY, workers=0)
+    
+    assert summary["meters"] == 0 and read_rows(tmp_path / "out.csv") == []
+    assert not os.path.exists(str(tmp_path / "out.csv") + ".checkpoint.json")
@@ -0,0 +1,39 @@
+#!/usr/bin/env python
+"""
+Tests for the thread-local output capture used by the GUI
+"""
+
+import io
+import os
+import sys
+import threading
+
+# Add the project root to the Python path
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src.UtilityTokenGUI import capture_output
+
+def test_concurrent_captures_stay_separate():
+    """Output printed by overlapping tasks lands only in each task's own buffer"""
+    buffers = [io.StringIO() for _ in range(4)]
+    barrier = threading.Barrier(len(buffers))
+    
+    def task(index):
+        with capture_output(buffers[index]):
+            barrier.wait()
+            for line in range(50):
+                print(f"task {index} line {line}")
+    
+    threads = [threading.Thread(target=task, args=(i,)) for i in range(len(buffers))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    for index, buffer in enumerate(buffers):
+        lines = buffer.getvalue().splitlines()
+        assert len(lines) == 50
+        assert all(line.startswith(f"task {index} ") for line in lines)
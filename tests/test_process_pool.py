@@ -0,0 +1,39 @@
+#!/usr/bin/env python
+"""
+Tests for the ordered, bounded process pool helpers
+"""
+
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+# Add the project root to the Python path
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src.process_pool import ordered_results, pool_size
+
+def test_results_keep_input_order_with_bounded_submission():
+    """Tasks are consumed lazily, never more than max_pending ahead of the results"""
+    consumed = []
+    
+    def tasks():
+        for i in range(20):
+            consumed.append(i)
+            yield i
+    
+    with ThreadPoolExecutor(4) as executor:
+        for i, result in enumerate(ordered_results(executor, lambda x: x * x, tasks(), max_pending=3)):
+            assert result == i * i
+            assert len(consumed) <= i + 3
+    assert list(ordered_results(None, str, range(3), 1)) == ["0", "1", "2"]
+
+def test_pool_size():
+    """None means one worker per CPU, 0 runs inline and negative counts are rejected"""
+    assert pool_size(0) == 0 and pool_size(3) == 3 and pool_size(None) >= 1
+    with pytest.raises(ValueError):
+        pool_size(-1)
@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+"""
+Tests for reconciling SMS records against their decrypted tokens
+"""
+
+import csv
+import os
+import sys
+
+import pytest
+
+# Add the project root to the Python path
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src.reconciliation import reconcile
+from src.TokenEncoder import TokenEncoder
+
+VENDING_KEY = bytes.fromhex("0011223344556677")
+
+def make_records():
+    """Two meters' records: matches, one Units mismatch and one corrupted token"""
+    records = []
+    for meter in ["37194275246", "10000000001"]:
+        encoder = TokenEncoder(meter, vending_key=VENDING_KEY)
+        for i, units in enumerate([12.5, 30.0, 250.0]):
+            records.append((meter, encoder.encode_token(units, tid=1000 + i), units))
+    records.append((records[0][0], records[0][1], 12.5))  # Same token sent twice
+    records[1] = (records[1][0], records[1][1], 31.0)
+    token = records[4][1]
+    records[4] = (records[4][0], token[:-1] + str((int(token[-1]) + 1) % 10), 30.0)
+    return records
+
+def read_rows(path):
+    with open(path, newline="") as f:
+        return list(csv.DictReader(f))
+
+@pytest.mark.parametrize("workers", [0, 2])
+def test_only_mismatches_are_written(tmp_path, workers):
+    """Units mismatches and tokens that fail to decrypt are reported, matches are not"""
+    records = make_records()
+    with open(tmp_path / "cleaned.csv", "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Mtr", "Token", "Units", "Amt", "TknAmt", "OtherCharges", "Datetime"])
+        for meter, token, units in records:
+            writer.writerow([meter, token, units, 100.0, 80.0, 20.0, "2023-05-06 16:49:00"])
+
+    summary = reconcile(str(tmp_path / "cleaned.csv"), str(tmp_path / "out.csv"), chunk_size=3,
+                        workers=workers, vending_key=VENDING_KEY)
+
+    assert summary["records"] == len(records)
+    assert (summary["matched"], summary["mismatched"], summary["errors"]) == (5, 1, 1)
+    rows = read_rows(tmp_path / "out.csv")
+    assert [(row["Token"], row["Reason"]) for row in rows][0] == (records[1][1], "Units mismatch")
+    assert float(rows[0]["DecryptedUnits"]) == pytest.approx(30.0)
+    assert rows[1]["Token"] == records[4][1] and rows[1]["Reason"].startswith("Decrypt failed")
+
+def test_raw_sms_export(tmp_path):
+    """A raw .txt export is parsed by the cleaning parser before the join"""
+    records = make_records()
+    with open(tmp_path / "raw.txt", "w") as f:
+        f.write("Header line without a token\n")
+        for meter, token, units in records:
+            f.write(f"Mtr:{meter} Token:{token} Date:20230506 16:49 Units:{units} "
+                    f"Amt:100.00 TknAmt:80.00 OtherCharges:20.00\n")
+
+    summary = reconcile(str(tmp_path / "raw.txt"), str(tmp_path / "out.csv"), workers=0,
+                        vending_key=VENDING_KEY)
+
+    assert (summary["matched"], summary["mismatched"], summary["errors"]) == (5, 1, 1)
+    assert len(read_rows(tmp_path / "out.csv")) == 2
+
+def test_missing_units_are_not_matches():
+    """A record without a usable Units value is reported, not counted as matched"""
+    from src.reconciliation import reconcile_chunk
+
+    token = TokenEncoder("37194275246", vending_key=VENDING_KEY).encode_token(12.5, tid=1000)
+    records = [("37194275246", token, units, "") for units in (float("nan"), "abc", None, 12.5)]
+
+    mismatches, counts = reconcile_chunk(records, vending_key=VENDING_KEY)
+
+    assert counts == {"matched": 1, "mismatched": 3, "errors": 0}
+    assert {row[5] for row in mismatches} == {"Missing or invalid Units"}
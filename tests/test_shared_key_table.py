@@ -0,0 +1,53 @@
+#!/usr/bin/env python
+"""
+Tests for the shared-memory decoder key table
+"""
+
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+# Add the project root to the Python path
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src.decrypt_coalescer import decrypt_requests, prewarm_worker
+from src.DKGA02 import derive_decoder_key
+from src.shared_key_table import SharedKeyTable
+from src.TokenDecrypter import DecrypterRegistry
+from src.TokenEncoder import TokenEncoder
+
+VENDING_KEY = bytes.fromhex("0123456789ABCDEF")
+METERS = ["37194275246", "12345678901", "012345678901", "10000000001", "37194275246"]
+
+def test_lookups_match_dkga02_and_attach_shares_the_block():
+    """Table lookups match DKGA02, an attached table reads the same block, and the registry uses it"""
+    with SharedKeyTable.build(METERS + ["bad", "123"], vending_key=VENDING_KEY) as table:
+        assert len(table) == 4 and table.key_parameters == ("2", "123456", "7", "1")
+        expected = [derive_decoder_key("2", "123456", "7", "1", meter, vending_key=VENDING_KEY) for meter in METERS]
+        assert [table.lookup(meter) for meter in METERS] == expected
+        assert expected[1] != expected[2]  # Leading zeros give a different PAN block
+        assert table.lookup_many(METERS + ["bad", "99999999999"]) == expected + [None, None]
+        assert "123" not in table
+        
+        attached = SharedKeyTable.attach(table.name)
+        assert attached.lookup_many(METERS) == expected and not attached.owner
+        attached.close()
+        
+        # Meters in the table are served without reading any vending key
+        registry = DecrypterRegistry(key_table=table)
+        assert registry.get(METERS[0]).decoder_key_hex == expected[0]
+        assert registry.vending_key is None
+
+def test_pool_workers_decrypt_with_keys_from_the_parent():
+    """Workers attach to the parent's table and decrypt tokens built with its vending key"""
+    encoder = TokenEncoder(METERS[0], vending_key=VENDING_KEY)
+    tokens = [encoder.encode_token(10, tid=tid) for tid in (11, 12)]
+    
+    with SharedKeyTable.build(METERS, vending_key=VENDING_KEY) as table:
+        with ProcessPoolExecutor(1, initializer=prewarm_worker, initargs=(METERS[:2], table.name)) as executor:
+            results = executor.submit(decrypt_requests, [{"meter_number": METERS[0], "token": token}
+                                                         for token in tokens]).result()
+    assert [result["tid"] for result in results] == [11, 12]
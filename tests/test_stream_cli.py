@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+"""
+Tests for the streaming stdin/stdout mode of the token, key and decrypt components
+"""
+
+import io
+import json
+import os
+import sys
+
+# Add the project root to the Python path
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src.DKGA02 import derive_decoder_key
+from src.TokenDecrypter import TokenDecrypter
+from src.stream_cli import run_stream
+from src.TokenEncoder import TokenEncoder
+
+def test_ndjson_results_keep_input_order_across_batches():
+    """Every request gets one result in order, including lines that fail to parse"""
+    lines = [json.dumps({"meter_number": "37194275246", "amount": amount}) for amount in (10, 20, 2)]
+    lines.insert(1, "not json")
+    output = io.StringIO()
+
+    summary = run_stream("token", io.StringIO("\n".join(lines) + "\n"), output, batch_size=2)
+
+    results = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert summary == {"requests": 4, "errors": 2}
+    decrypter = TokenDecrypter("37194275246")
+    assert decrypter.decrypt_token(results[0]["token"])["units"] == 10.0
+    assert results[1]["error"].startswith("Invalid JSON")
+    assert decrypter.decrypt_token(results[2]["token"])["units"] == 20.0
+    assert "error" in results[3]
+
+def test_bad_amount_fails_only_its_own_request():
+    """A non-finite amount or invalid meter gets an error result and the requests around it still get tokens"""
+    requests = [{"meter_number": "1", "amount": "nan"}, {"meter_number": "37194275246", "amount": 10},
+                {"meter_number": "1", "amount": "inf"}, {"meter_number": "abc", "amount": 10}]
+    output = io.StringIO()
+
+    summary = run_stream("token", io.StringIO("".join(json.dumps(r) + "\n" for r in requests)), output)
+
+    results = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert summary == {"requests": 4, "errors": 3}
+    assert "finite" in results[0]["error"] and "finite" in results[2]["error"] and "error" in results[3]
+    assert TokenDecrypter("37194275246").decrypt_token(results[1]["token"])["units"] == 10.0
+
+def test_csv_in_csv_out_with_defaults_for_empty_cells():
+    """CSV requests are detected from the header and empty cells use the default key parameters"""
+    output = io.StringIO()
+    run_stream("key", io.StringIO("decoder_reference_number,tariff_index\n37194275246,\n12345678901,8\n"), output)
+
+    rows = output.getvalue().splitlines()
+    assert rows[0] == "decoder_reference_number,decoder_key,error"
+    assert rows[1] == f"37194275246,{derive_decoder_key('2', '123456', '7', '1', '37194275246')},"
+    assert rows[2] == f"12345678901,{derive_decoder_key('2', '123456', '8', '1', '12345678901')},"
+
+def test_decrypt_stream():
+    """Decrypt requests return the token's units"""
+    encoder = TokenEncoder("37194275246")
+    requests = "".join(json.dumps({"meter_number": "37194275246", "token": encoder.encode_token(units, tid=7)}) + "\n"
+                       for units in (10, 20.5))
+    output = io.StringIO()
+
+    run_stream("decrypt", io.StringIO(requests), output, output_format="ndjson", batch_size=1)
+
+    assert [json.loads(line)["units"] for line in output.getvalue().splitlines()] == [10.0, 20.5]
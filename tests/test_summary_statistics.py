@@ -0,0 +1,53 @@
+#!/usr/bin/env python
+"""
+Tests for the streaming summary statistics accumulator
+"""
+
+import os
+import sys
+from datetime import datetime
+
+import pandas as pd
+
+# Add the project root to the Python path
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src.summary_statistics import SummaryAccumulator
+
+def make_records():
+    """Build a small cleaned history spanning two months."""
+    return [
+        {"Amt": 20.0 + i * 5, "Units": 1.0 + i * 0.25, "TknAmt": 12.0 + i, "OtherCharges": 8.0,
+         "Datetime": datetime(2023, 5 + i // 6, 1 + i)}
+        for i in range(12)
+    ]
+
+def test_record_and_frame_feeds_agree():
+    """Feeding record by record or as a DataFrame gives the same summary"""
+    records = make_records()
+    by_record = SummaryAccumulator().add_records(records)
+    by_frame = SummaryAccumulator().add_frame(pd.DataFrame(records))
+    
+    assert by_record.statistics() == by_frame.statistics()
+    assert abs(by_record.fields["Amt"].variance - by_frame.fields["Amt"].variance) < 1e-9
+    assert by_record.monthly_totals() == by_frame.monthly_totals()
+
+def test_merged_partials_match_single_pass():
+    """Partial results from separate workers merge into the single-pass result"""
+    records = make_records()
+    df = pd.DataFrame(records)
+    whole = SummaryAccumulator().add_frame(df)
+    
+    merged = SummaryAccumulator()
+    for part in (records[:5], records[5:9], records[9:]):
+        merged.merge(SummaryAccumulator().add_records(part))
+    
+    assert merged.count == 12
+    assert merged.statistics() == whole.statistics()
+    assert abs(merged.fields["Units"].variance - df["Units"].var(ddof=0)) < 1e-9
+    assert merged.fields["Amt"].minimum == 20.0
+    assert merged.fields["Amt"].maximum == 75.0
+    assert merged.statistics()["First Transaction Date"] == "2023-05-01"
@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+"""
+Tests for token generation
+"""
+
+import hashlib
+import os
+import sys
+
+import pytest
+
+# Add the project root to the Python path
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src.Token import generate_demo_token, generate_demo_tokens, generate_token, generate_tokens
+from src.TokenDecrypter import TokenDecrypter
+
+VENDING_KEY = bytes.fromhex("0011223344556677")
+
+def test_tokens_always_have_20_digits_and_legacy_output_is_kept():
+    """Demo tokens always have 20 digits and legacy mode reproduces the original digits"""
+    meters = [str(37194275246 + i) for i in range(500)]
+    for meter in meters:
+        digits = generate_demo_token(meter, 100).replace("-", "")
+        assert len(digits) == 20 and digits.isdigit()
+    
+    seed = "37194275246-10000-demo-key"
+    expected = "".join(filter(str.isdigit, hashlib.sha256(seed.encode()).hexdigest()))[:20]
+    assert generate_demo_token("37194275246", 100, legacy=True).replace("-", "") == expected
+    assert generate_demo_token("37194275246", 100) != generate_demo_token("37194275246", 100, legacy=True)
+
+def test_batch_matches_single_and_repeat_purchases_get_the_same_token():
+    """Batch demo tokens match single ones and a repeat purchase gets the same token"""
+    meters = ["37194275246", "14106481758", "12345678901"]
+    amounts = [50, 100.5, 5]
+    for legacy in (False, True):
+        assert generate_demo_tokens(meters, amounts, legacy=legacy) == \
+            [generate_demo_token(meter, amount, legacy=legacy) for meter, amount in zip(meters, amounts)]
+    
+    # Demo tokens are a hash of meter and amount, so a repeat purchase is not an error
+    assert generate_demo_tokens(meters[:1] * 2, [50, 50]) == [generate_demo_token(meters[0], 50)] * 2
+    with pytest.raises(ValueError, match="at least"):
+        generate_demo_tokens(meters, [50, 4, 5])
+
+def test_generated_tokens_decrypt_to_their_amounts():
+    """Vended tokens, single or batched across meters, decrypt to the amount paid"""
+    meters = ["37194275246", "14106481758", "37194275246"]
+    amounts = [50, 100.5, 5]
+    tokens = generate_tokens(meters, amounts, vending_key=VENDING_KEY)
+    tokens.append(generate_token("12345678901", 20, vending_key=VENDING_KEY))
+    meters.append("12345678901")
+
+    assert [TokenDecrypter(meter, vending_key=VENDING_KEY).decrypt_token(token)["units"]
+            for meter, token in zip(meters, tokens)] == [50.0, 100.5, 5.0, 20.0]
+    assert generate_tokens([], [], vending_key=VENDING_KEY) == []
+    with pytest.raises(ValueError, match="finite"):
+        generate_token("37194275246", float("nan"), vending_key=VENDING_KEY)
@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+"""
+Tests for the STS token encoder
+"""
+
+import os
+import random
+import sys
+
+import numpy as np
+import pytest
+
+# Add the project root to the Python path
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src.TokenDecrypter import TokenDecrypter
+from src.TokenEncoder import (TokenEncoder, benchmark, detranspose_class_bits, encode_amount, encode_amounts,
+                              transpose_class_bits, transpose_class_bits_many)
+
+VENDING_KEY = bytes.fromhex("0011223344556677")
+METER = "37194275246"
+
+@pytest.mark.parametrize("algorithm", ["EA07", "EA11"])
+def test_decrypter_inverts_single_and_batch_encoding(algorithm):
+    """The decrypter recovers every field of single and batch encoded tokens"""
+    encoder = TokenEncoder(METER, vending_key=VENDING_KEY, algorithm=algorithm)
+    decrypter = TokenDecrypter(METER, vending_key=VENDING_KEY, algorithm=algorithm)
+    
+    for token_class, units, tid in [(0, 12.5, 123456), (1, 1500.0, 1), (3, 0.0, (1 << 24) - 1)]:
+        token = encoder.encode_token(units, tid=tid, subclass=2, random_number=9, token_class=token_class)
+        data = decrypter.decrypt_token(token)
+        assert (data["token_class"], data["subclass"], data["random_number"], data["tid"], data["units"]) == \
+            (token_class, 2, 9, tid, units)
+    
+    amounts = [5, 12.3, 1638.3, 1638.4, 16384.0, 24994.0]
+    tokens = encoder.encode_tokens(amounts, tids=[1000 + i for i in range(len(amounts))], random_numbers=7)
+    assert tokens[1] == encoder.encode_token(12.3, tid=1001, random_number=7)
+    results = decrypter.decrypt_tokens(tokens)
+    assert [result["units"] for result in results] == amounts
+    assert [result["tid"] for result in results] == [1000 + i for i in range(len(amounts))]
+
+def test_class_transposition_and_amount_encoding_are_exact():
+    """Class bit transposition round-trips and amounts encode to what the decrypter decodes"""
+    rng = random.Random(0)
+    for _ in range(1000):
+        token_class, block = rng.getrandbits(2), rng.getrandbits(64)
+        value = transpose_class_bits(token_class, block)
+        assert value < 2 ** 66 and detranspose_class_bits(value) == (token_class, block)
+    
+    classes = np.array([0, 1, 2, 3], dtype=np.uint8)
+    blocks = np.array([rng.getrandbits(64) for _ in range(4)], dtype=np.uint64)
+    his, los = transpose_class_bits_many(classes, blocks)
+    assert [int(hi) << 64 | int(lo) for hi, lo in zip(his, los)] == \
+        [transpose_class_bits(int(c), int(b)) for c, b in zip(classes, blocks)]
+    
+    # Unrepresentable amounts round down to the next token amount
+    decrypter = TokenDecrypter(METER, vending_key=VENDING_KEY)
+    amounts = [0.1, 99.9, 1638.3, 1638.45, 2000.07, 18022.1, 170000.9, 1802239.9]
+    fields = encode_amounts(amounts).tolist()
+    assert fields == [encode_amount(amount) for amount in amounts]
+    decoded = [decrypter._calculate_amount(format(field, "016b")) for field in fields]
+    assert decoded[:3] == amounts[:3] and decoded[3] == 1638.4 and decoded[-1] == 1802140.0
+    assert all(amount - 100 < value <= amount for amount, value in zip(amounts, decoded))
+    with pytest.raises(ValueError, match="out of range"):
+        encode_amount(1802240.0)
+
+def test_empty_batch():
+    """An empty batch encodes to no tokens and records nothing"""
+    from src.token_index import TokenIndex
+
+    encoder = TokenEncoder(METER, vending_key=VENDING_KEY)
+    assert encoder.encode_tokens([]) == []
+    assert encoder.encode_tokens([], tids=5, random_numbers=3) == []
+    index = TokenIndex()
+    assert encoder.encode_tokens([], issued_index=index) == []
+    assert len(index) == 0
+
+def test_benchmark_reports_both_apis():
+    """The encoder benchmark returns a positive rate for the single and batch APIs"""
+    rates = benchmark(n_tokens=200)
+    assert set(rates) == {"single", "batch"} and all(rate > 0 for rate in rates.values())
@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+"""
+Tests for the token replay detection index
+"""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# Add the project root to the Python path
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src.token_index import TokenIndex, token_to_int
+from src.TokenDecrypter import TokenDecrypter
+from src.TokenEncoder import TokenEncoder
+
+def test_index_persists_and_memory_maps(tmp_path):
+    """Tokens survive a save and reload, and saving never keeps a mapping of the replaced file"""
+    path = str(tmp_path / "issued_tokens.idx")
+    tokens = ["1865-3776-4842-2132-9404", "99999999999999999999", "00000000000000000001", 2 ** 65 + 7]
+
+    index = TokenIndex(path)
+    assert index.add_many(tokens) == 4
+    assert not index.add(tokens[0])
+    index.save()
+
+    reloaded = TokenIndex(path)
+    assert len(reloaded) == 4
+    assert all(token in reloaded for token in tokens)
+    assert reloaded.contains_many(tokens + ["18653776484221329405"]).tolist() == [True] * 4 + [False]
+
+    reloaded.add("12345678901234567890")
+    # Nothing that outlives the save may still map the file it replaces
+    assert not any(isinstance(bucket, np.memmap) or isinstance(bucket.base, np.memmap)
+                   for bucket in reloaded._merged_buckets())
+    reloaded.save()
+    assert TokenIndex(path).contains("1234-5678-9012-3456-7890")
+    assert len(TokenIndex(path)) == 5
+
+    with pytest.raises(ValueError):
+        token_to_int("123456789012345678901")
+
+def test_generator_and_decrypter_reject_replays():
+    """Issuing a token twice or redeeming it twice is rejected"""
+    issued = TokenIndex()
+    encoder = TokenEncoder("37194275246")
+    encoder.encode_token(100, tid=5, random_number=3, issued_index=issued)
+    encoder.encode_token(100, tid=6, random_number=3, issued_index=issued)  # Same amount, later TID
+    with pytest.raises(ValueError, match="already issued"):
+        encoder.encode_token(100, tid=5, random_number=3, issued_index=issued)
+    with pytest.raises(ValueError, match="already issued"):
+        encoder.encode_tokens([20, 20], tids=9, random_numbers=1, issued_index=issued)
+    assert len(issued) == 2
+
+    redeemed = TokenIndex()
+    decrypter = TokenDecrypter("37194275246", redeemed_index=redeemed)
+    token = encoder.encode_token(10, tid=77)
+    decrypter.decrypt_token(token)
+    with pytest.raises(ValueError, match="already redeemed"):
+        decrypter.decrypt_token(token.replace("-", ""))
+
+    other = encoder.encode_token(10, tid=78)
+    results = decrypter.decrypt_tokens([other, token, other], return_exceptions=True)
+    assert isinstance(results[0], dict)
+    assert isinstance(results[1], ValueError) and isinstance(results[2], ValueError)
+    assert other in redeemed
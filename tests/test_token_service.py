@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+"""
+Tests for the local HTTP token vending service
+"""
+
+import asyncio
+import os
+import sys
+
+# Add the project root to the Python path
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src.load_test import Connection, percentile
+from src.TokenDecrypter import TokenDecrypter
+from src.token_service import TokenService
+
+def test_service_routes_and_batches_over_one_connection():
+    """Health, single and batched /token, /decoder-key and routing errors are served over one kept-alive connection"""
+    async def scenario():
+        service = await TokenService(port=0, workers=1, batch_size=2).start()
+        connection = Connection(service.host, service.port)
+        try:
+            assert await connection.request("GET", "/health") == (200, {"status": "ok"})
+
+            status, single = await connection.request("POST", "/token", {"meter_number": "12345678901", "amount": 100})
+            assert status == 200
+            assert TokenDecrypter("12345678901").decrypt_token(single["token"])["units"] == 100.0
+
+            items = [{"meter_number": str(10000000000 + i), "amount": 50} for i in range(5)]
+            status, batch = await connection.request("POST", "/token", items + [{"amount": 10}])
+            assert status == 200
+            assert [r["meter_number"] for r in batch[:5]] == [i["meter_number"] for i in items]
+            assert "error" in batch[5]
+
+            status, keys = await connection.request("POST", "/decoder-key", {"decoder_reference_number": "12345678901"})
+            assert status == 200 and len(keys["decoder_key"]) == 16
+
+            assert (await connection.request("POST", "/nope", {}))[0] == 404
+            assert (await connection.request("GET", "/token"))[0] == 405
+        finally:
+            connection.close()
+            await service.close()
+
+    asyncio.run(scenario())
+
+def test_malformed_and_stalled_requests():
+    """Bad request lines and headers get 4xx responses, and a client that stops mid-request is disconnected"""
+    async def raw_request(service, data):
+        reader, writer = await asyncio.open_connection(service.host, service.port)
+        try:
+            writer.write(data)
+            await writer.drain()
+            return await asyncio.wait_for(reader.read(), 5)
+        finally:
+            writer.close()
+
+    async def scenario():
+        service = await TokenService(port=0, workers=1, request_timeout=0.2).start()
+        try:
+            for length in (b"abc", b"-5"):
+                response = await raw_request(service, b"POST /token HTTP/1.1\r\nContent-Length: " + length + b"\r\n\r\n")
+                assert response.startswith(b"HTTP/1.1 400") and b"Invalid Content-Length" in response
+            headers = b"".join(b"X-%d: 1\r\n" % i for i in range(200))
+            response = await raw_request(service, b"GET /health HTTP/1.1\r\n" + headers + b"\r\n")
+            assert response.startswith(b"HTTP/1.1 431")
+            response = await raw_request(service, b"GET /health HTTP/1.1\r\nX-Long: " + b"a" * 100000 + b"\r\n\r\n")
+            assert response.startswith(b"HTTP/1.1 431")
+            response = await raw_request(service, b"GET /" + b"a" * 100000 + b" HTTP/1.1\r\n\r\n")
+            assert response.startswith(b"HTTP/1.1 414") and b"Request line too long" in response
+            # Headers never finished: closed without a response once request_timeout passes
+            assert await raw_request(service, b"GET /health HTTP/1.1\r\nHost: x\r\n") == b""
+        finally:
+            await service.close()
+
+    asyncio.run(scenario())
+
+def test_percentile_nearest_rank():
+    """Percentiles use the nearest-rank method and an empty sample gives 0"""
+    values = list(range(1, 101))
+    assert percentile(values, 0.50) == 50
+    assert percentile(values, 0.99) == 99
+    assert percentile([], 0.5) == 0.0
@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+"""
+Tests for the multi-supply-group vending key store
+"""
+
+import json
+import os
+import sys
+
+import pytest
+
+# Add the project root to the Python path
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src.DKGA02 import DecoderKeyGenerator, derive_decoder_key, derive_many
+from src.key_derivation import derive_decoder_key as derive_with
+from src.TokenDecrypter import DecrypterRegistry
+from src.vending_key_store import VendingKeyStore
+
+KEY_A1 = bytes.fromhex("0011223344556677")
+KEY_B1 = bytes.fromhex("8899AABBCCDDEEFF")
+
+def test_keys_are_indexed_by_supply_group_and_revision(tmp_path):
+    """Keys are stored per supply group and revision, rotated, and saved atomically"""
+    path = str(tmp_path / "keys" / "VendingKeys.json")
+    store = VendingKeyStore(path)
+    store.add("123456", 1, KEY_A1)
+    store.add("654321", "1", KEY_B1)
+    revision, key_a2 = store.rotate("123456")
+    
+    assert revision == 2 and len(key_a2) == 8 and key_a2 != KEY_A1
+    assert store.entries() == [("123456", 1), ("123456", 2), ("654321", 1)]
+    assert ("123456", "2") in store and ("654321", 2) not in store
+    with pytest.raises(KeyError, match="supply group 654321, key revision 2"):
+        store.get("654321", 2)
+    with pytest.raises(ValueError, match="already stored"):
+        store.add("123456", 2)
+    
+    # Saved atomically, and a fresh load sees every key
+    assert not os.path.exists(path + ".tmp")
+    with open(path) as f:
+        assert sorted(json.load(f)["keys"]) == ["123456:1", "123456:2", "654321:1"]
+    reloaded = VendingKeyStore(path)
+    assert reloaded.get("123456", 2) == key_a2 and reloaded.get("654321", 1) == KEY_B1
+
+def test_derivations_pick_the_key_for_their_supply_group(tmp_path):
+    """Key derivations and the decrypter registry use the store's key for their supply group"""
+    store = VendingKeyStore(str(tmp_path / "VendingKeys.json"))
+    store.add("123456", 1, KEY_A1)
+    store.add("654321", 1, KEY_B1)
+    meter = "37194275246"
+    
+    dkg = DecoderKeyGenerator("2", "654321", "7", "1", meter, key_store=store)
+    dkg.generate_decoder_key()
+    assert dkg.get_decoder_key_hex() == derive_decoder_key("2", "654321", "7", "1", meter, vending_key=KEY_B1)
+    assert derive_many("2", "123456", "7", "1", [meter], key_store=store) == \
+        [derive_decoder_key("2", "123456", "7", "1", meter, vending_key=KEY_A1)]
+    assert derive_with("DKGA04", "2", "654321", "7", "1", meter, key_store=store) == \
+        derive_with("DKGA04", "2", "654321", "7", "1", meter, vending_key=KEY_B1)
+    
+    registry = DecrypterRegistry(key_store=store)
+    assert registry.get(meter, supply_group_code="654321").decoder_key_hex == dkg.get_decoder_key_hex()
+    with pytest.raises(KeyError):
+        registry.get(meter, supply_group_code="999999")
+
+def _rotate_in_process(path, queue):
+    queue.put(VendingKeyStore(path).rotate("123456")[0])
+
+def test_changes_from_stale_copies_and_other_processes_are_not_lost(tmp_path):
+    """Each change starts from the file under a lock, so no process overwrites another's keys"""
+    import multiprocessing
+    
+    path = str(tmp_path / "VendingKeys.json")
+    first, stale = VendingKeyStore(path), VendingKeyStore(path)
+    first.add("123456", 1, KEY_A1)
+    assert stale.rotate("123456")[0] == 2  # Sees revision 1 although it was loaded before it
+    
+    queue = multiprocessing.Queue()
+    processes = [multiprocessing.Process(target=_rotate_in_process, args=(path, queue)) for _ in range(4)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    
+    assert sorted(queue.get() for _ in processes) == [3, 4, 5, 6]
+    first.reload()
+    assert first.entries() == [("123456", revision) for revision in range(1, 7)]
+    assert first.get("123456", 1) == KEY_A1